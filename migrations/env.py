@@ -2,7 +2,7 @@ import os
 import sys
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import Column, engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
@@ -10,6 +10,9 @@ from alembic import context
 # This line makes the 'src' directory (one level up from this migrations/ directory) importable
 sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
 from src.db.models.base import metadata_obj  # pylint: disable=wrong-import-position
+from src.db.partitions import (  # pylint: disable=wrong-import-position
+    is_grade_partition,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -28,6 +31,28 @@ target_metadata = metadata_obj
 database_url = os.getenv("ALEMBIC_DATABASE_URL")
 config.set_main_option("sqlalchemy.url", database_url)
 
+
+def include_name(name, type_, parent_names) -> bool:
+    # The monthly partitions of grades are created at runtime
+    # (src/db/partitions.py), not by migrations
+    return not (type_ == "table" and is_grade_partition(name))
+
+
+# Postgres reports index expressions normalised (grade_sum::numeric for
+# CAST(grade_sum AS NUMERIC)), so autogenerate would flag expression indexes
+# as changed on every run. Their migrations are written by hand.
+EXPRESSION_INDEXES = {
+    index.name
+    for table in target_metadata.tables.values()
+    for index in table.indexes
+    if not all(isinstance(expression, Column) for expression in index.expressions)
+}
+
+
+def include_object(object_, name, type_, reflected, compare_to) -> bool:
+    return not (type_ == "index" and name in EXPRESSION_INDEXES)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,6 +75,8 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -72,7 +99,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
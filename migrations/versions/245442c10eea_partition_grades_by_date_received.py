@@ -0,0 +1,157 @@
+"""partition_grades_by_date_received
+
+Revision ID: 245442c10eea
+Revises: 40530764082d
+Create Date: 2026-10-18 08:41:57.193949
+
+"""
+
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# grade_aggregates triggers (see 27c21eb6a41c), recreated on the new table
+TRIGGERS = {
+    "grades_aggregates_insert": ("INSERT", "NEW TABLE AS new_rows"),
+    "grades_aggregates_update": (
+        "UPDATE",
+        "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    ),
+    "grades_aggregates_delete": ("DELETE", "OLD TABLE AS old_rows"),
+}
+INDEXES = {
+    "ix_grades_subject_id_student_id_grade": ["subject_id", "student_id", "grade"],
+    "ix_grades_subject_id_date_received": ["subject_id", "date_received"],
+}
+NATURAL_KEY = "uq_grades_student_id_subject_id_date_received"
+# Monthly partitions created past the latest grade (or today)
+MONTHS_AHEAD = 3
+
+
+# revision identifiers, used by Alembic.
+revision: str = "245442c10eea"
+down_revision: Union[str, None] = "40530764082d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _create_monthly_partitions():
+    first, last = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT min(date_received), max(date_received) FROM grades_old")
+        )
+        .one()
+    )
+    today = datetime.date.today()
+    month = (first.date() if first else today).replace(day=1)
+    end = _add_months(
+        max(last.date() if last else today, today).replace(day=1), MONTHS_AHEAD
+    )
+    while month <= end:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE grades_{month:%Y_%m} PARTITION OF grades "
+            f"FOR VALUES FROM ('{month}') TO ('{upper}')"
+        )
+        month = upper
+
+
+def _rebuild_grades(partitioned: bool):
+    """Copy grades into a new table, range partitioned by month or plain.
+
+    Keys, indexes and triggers are added after the copy, so rows are neither
+    indexed one by one nor counted twice in grade_aggregates.
+    """
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON grades")
+    op.rename_table("grades", "grades_old")
+    op.execute("ALTER SEQUENCE grades_id_seq RENAME TO grades_old_id_seq")
+    # Index names are unique per schema; the new table reuses them
+    for name in INDEXES:
+        op.drop_index(name, table_name="grades_old")
+    op.drop_constraint(NATURAL_KEY, "grades_old", type_="unique")
+    op.drop_constraint("grades_pkey", "grades_old", type_="primary")
+
+    op.create_table(
+        "grades",
+        # Identity on the partitioned table; serial (the original) otherwise
+        sa.Column(
+            "id",
+            sa.Integer(),
+            *([sa.Identity()] if partitioned else []),
+            nullable=False,
+        ),
+        sa.Column("student_id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column("grade", sa.Integer(), nullable=False),
+        sa.Column("date_received", sa.DateTime(), nullable=False),
+        **({"postgresql_partition_by": "RANGE (date_received)"} if partitioned else {}),
+    )
+    if partitioned:
+        op.execute("CREATE TABLE grades_default PARTITION OF grades DEFAULT")
+        _create_monthly_partitions()
+    else:
+        op.execute("CREATE SEQUENCE grades_id_seq OWNED BY grades.id")
+        op.execute(
+            "ALTER TABLE grades ALTER COLUMN id SET DEFAULT nextval('grades_id_seq')"
+        )
+
+    op.execute(
+        "INSERT INTO grades (id, student_id, subject_id, grade, date_received) "
+        "SELECT id, student_id, subject_id, grade, date_received FROM grades_old"
+    )
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('grades', 'id'), "
+        "coalesce(max(id), 0) + 1, false) FROM grades"
+    )
+    op.drop_table("grades_old")
+
+    op.create_primary_key(
+        "grades_pkey", "grades", ["id", "date_received"] if partitioned else ["id"]
+    )
+    op.create_unique_constraint(
+        NATURAL_KEY, "grades", ["student_id", "subject_id", "date_received"]
+    )
+    for name, columns in INDEXES.items():
+        op.create_index(name, "grades", columns, unique=False)
+    op.create_foreign_key(
+        "grades_student_id_fkey",
+        "grades",
+        "students",
+        ["student_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "grades_subject_id_fkey",
+        "grades",
+        "subjects",
+        ["subject_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    for name, (operation, referencing) in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {operation} ON grades "
+            f"REFERENCING {referencing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION grade_aggregates_sync()"
+        )
+    op.execute("ANALYZE grades")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rebuild_grades(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild_grades(partitioned=False)
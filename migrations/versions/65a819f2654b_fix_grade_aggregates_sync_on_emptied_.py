@@ -0,0 +1,89 @@
+"""fix grade aggregates sync on emptied rows
+
+Revision ID: 65a819f2654b
+Revises: 54f63fc51253
+Create Date: 2026-10-18 09:24:57.006823
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# Removing the last grades of a (student, subject) pair briefly left its
+# aggregate row with grade_count = 0, which the average expression of
+# ix_grade_aggregates_subject_id_avg_grade (54f63fc51253) divides by. Emptied
+# rows are now deleted before the others are decremented.
+SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION grade_aggregates_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM grade_aggregates AS ga
+         USING (SELECT student_id, subject_id, COUNT(*) AS grade_count
+                  FROM old_rows GROUP BY student_id, subject_id) AS d
+         WHERE ga.student_id = d.student_id AND ga.subject_id = d.subject_id
+           AND ga.grade_count <= d.grade_count;
+        UPDATE grade_aggregates AS ga
+           SET grade_sum = ga.grade_sum - d.grade_sum,
+               grade_count = ga.grade_count - d.grade_count
+          FROM (SELECT student_id, subject_id, SUM(grade) AS grade_sum, COUNT(*) AS grade_count
+                  FROM old_rows GROUP BY student_id, subject_id) AS d
+         WHERE ga.student_id = d.student_id AND ga.subject_id = d.subject_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO grade_aggregates AS ga (student_id, subject_id, grade_sum, grade_count)
+        SELECT student_id, subject_id, SUM(grade), COUNT(*)
+          FROM new_rows GROUP BY student_id, subject_id
+        ON CONFLICT (student_id, subject_id) DO UPDATE
+           SET grade_sum = ga.grade_sum + EXCLUDED.grade_sum,
+               grade_count = ga.grade_count + EXCLUDED.grade_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+# The function as created by 27c21eb6a41c
+PREVIOUS_SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION grade_aggregates_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE grade_aggregates AS ga
+           SET grade_sum = ga.grade_sum - d.grade_sum,
+               grade_count = ga.grade_count - d.grade_count
+          FROM (SELECT student_id, subject_id, SUM(grade) AS grade_sum, COUNT(*) AS grade_count
+                  FROM old_rows GROUP BY student_id, subject_id) AS d
+         WHERE ga.student_id = d.student_id AND ga.subject_id = d.subject_id;
+        DELETE FROM grade_aggregates AS ga
+         USING (SELECT DISTINCT student_id, subject_id FROM old_rows) AS d
+         WHERE ga.student_id = d.student_id AND ga.subject_id = d.subject_id
+           AND ga.grade_count <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO grade_aggregates AS ga (student_id, subject_id, grade_sum, grade_count)
+        SELECT student_id, subject_id, SUM(grade), COUNT(*)
+          FROM new_rows GROUP BY student_id, subject_id
+        ON CONFLICT (student_id, subject_id) DO UPDATE
+           SET grade_sum = ga.grade_sum + EXCLUDED.grade_sum,
+               grade_count = ga.grade_count + EXCLUDED.grade_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+# revision identifiers, used by Alembic.
+revision: str = "65a819f2654b"
+down_revision: Union[str, None] = "54f63fc51253"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(SYNC_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_SYNC_FUNCTION)
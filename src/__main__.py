@@ -0,0 +1,79 @@
+"""Single entry point of the command-line tools.
+
+    python -m src select --metrics
+    python -m src seed --mode bulk --students 100000
+    python -m src benchmark startup
+    python -m src <command> --help
+
+A command runs the module listed in COMMANDS as `python -m <module>` would,
+with the arguments that follow it. Nothing else is imported, so e.g.
+`select` does not load the seeding code, and `--help` works without
+DATABASE_URL.
+"""
+
+import argparse
+import runpy
+import sys
+
+COMMANDS = {
+    "select": ("src.my_select", "Run the demo select queries."),
+    "seed": ("src.seed", "Populate the database with fake data."),
+    "ingest": ("src.ingest", "Load grades from a CSV file."),
+    "export": ("src.export", "Export grades to Parquet or CSV."),
+    "explain": ("src.explain_queries", "Check the query plans for sequential scans."),
+    "partitions": ("src.db.partitions", "Create the upcoming grades partitions."),
+    "replicas": ("src.db.routing", "Check that every read replica answers."),
+}
+# python -m src benchmark <name>, see src/benchmarks/
+BENCHMARKS = (
+    "analytics",
+    "batching",
+    "loading",
+    "pagination",
+    "pool_settings",
+    "queries",
+    "startup",
+    "statements",
+)
+
+
+def parse_args(argv: list[str]) -> tuple[str, list[str]]:
+    """The module to run and its arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Run one of the command-line tools.",
+        epilog="commands:\n"
+        + "\n".join(
+            f"  {name:<12}{help_text}" for name, (_, help_text) in COMMANDS.items()
+        )
+        + f"\n  {'benchmark':<12}Run src/benchmarks/<name>: {', '.join(BENCHMARKS)}.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "command",
+        choices=[*COMMANDS, "benchmark"],
+        metavar="command",
+        help="One of the commands below.",
+    )
+    parser.add_argument(
+        "args",
+        nargs=argparse.REMAINDER,
+        help="Its arguments, see python -m src <command> --help.",
+    )
+    args = parser.parse_args(argv)
+    if args.command != "benchmark":
+        return COMMANDS[args.command][0], args.args
+    if not args.args or args.args[0] not in BENCHMARKS:
+        parser.error(f"benchmark needs one of: {', '.join(BENCHMARKS)}")
+    return f"src.benchmarks.{args.args[0]}", args.args[1:]
+
+
+def main(argv: list[str]):
+    module, args = parse_args(argv)
+    # The module's own argument parser reads sys.argv
+    sys.argv = [f"python -m {module}", *args]
+    runpy.run_module(module, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
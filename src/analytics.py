@@ -0,0 +1,653 @@
+"""In-memory columnar snapshot of the grades, for repeated what-if analytics.
+
+`GradeSnapshot.load()` reads grades (id, student_id, subject_id, grade,
+date_received) and the students, subjects, groups and teachers once, in one
+transaction, into NumPy arrays of about 18 bytes per grade. Its fetch_N_*
+methods answer the questions of the src/queries.py functions of the same
+names with vectorised group-bys (np.bincount over integer positions), with
+no round trip to the database, and return the same rows:
+
+- averages are computed from exact integer sums and rounded half up to two
+  decimals, as Postgres rounds numeric (grades are never negative);
+- the dimension tables are read ORDER BY name, id, so sorting by position
+  follows the database's collation;
+- where the SQL leaves the order open (ties in queries 1 and 2, query 5),
+  rows come in id order.
+
+grade_distribution() and grade_percentiles() add the distributions the
+queries do not cover. A snapshot does not see later writes by itself: on
+Postgres, `sync()` applies the grades written and deleted since it was read
+(src/db/changes.py), at a cost that follows the number of changes rather
+than the size of the table; elsewhere it reloads everything.
+`python -m src.benchmarks.analytics` checks every answer against the SQL
+and times both.
+"""
+
+import datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.changes import (
+    fetch_grade_changes,
+    grade_watermark,
+    tracks_grade_changes,
+)
+from src.db.models import Grade, Group, Student, Subject, Teacher
+from src.queries import (
+    DEFAULT_BATCH_SIZE,
+    GroupRank,
+    StudentAverage,
+    StudentGrade,
+    SubjectRank,
+)
+
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+# Position of a NULL group_id / teacher_id (groups and teachers are deleted
+# with ON DELETE SET NULL). It picks the extra False entry of
+# _nullable_flags(), so such rows never match a group or teacher, as with
+# the inner joins of the SQL.
+NO_POSITION = -1
+
+# The per-grade arrays of a snapshot; student and subject hold positions in
+# the dimension arrays rather than ids
+GRADE_COLUMNS = {
+    "id": np.int32,
+    "student": np.int32,
+    "subject": np.int32,
+    "grade": np.int16,
+    "date_received": "datetime64[us]",
+}
+
+
+class Percentiles(NamedTuple):
+    name: str
+    grades: int
+    # One value per requested fraction, as percentile_cont() computes them
+    values: list[float]
+
+
+class SyncStats(NamedTuple):
+    # True when the snapshot was read again in full (no change capture)
+    full_reload: bool
+    # Grades added or replaced, and grades removed
+    written: int
+    deleted: int
+
+
+class _Dimension:
+    """Ids and names of one table, in ORDER BY name, id order."""
+
+    def __init__(self, rows: Sequence[tuple]):
+        """`rows` start with (id, name)."""
+        self.ids = np.fromiter((row[0] for row in rows), np.int64, len(rows))
+        self.names = np.array([row[1] for row in rows], dtype=object)
+        self._by_id = np.argsort(self.ids)
+        self._positions: dict[str, list[int]] = {}
+        for position, row in enumerate(rows):
+            self._positions.setdefault(row[1], []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, ids: np.ndarray) -> np.ndarray:
+        """Positions of the rows with `ids`, which must all exist."""
+        found = np.searchsorted(self.ids, ids, sorter=self._by_id)
+        return self._by_id[found].astype(np.int32)
+
+    def nullable_positions(self, ids: Sequence[Optional[int]]) -> np.ndarray:
+        """Positions of `ids`, NO_POSITION for None."""
+        known = np.array([id_ is not None for id_ in ids], dtype=bool)
+        positions = np.full(len(ids), NO_POSITION, dtype=np.int32)
+        positions[known] = self.positions(
+            np.array([id_ for id_ in ids if id_ is not None], np.int64)
+        )
+        return positions
+
+    def named(self, name: str) -> np.ndarray:
+        """Positions of the rows called `name` (names are not unique)."""
+        return np.array(self._positions.get(name, ()), dtype=np.int32)
+
+
+async def _rows_by_name(session: AsyncSession, id_, name, *columns) -> list:
+    """(id, name, *columns) of a table ORDER BY name, id."""
+    stmt = select(id_, name, *columns).order_by(name, id_)
+    return list((await session.execute(stmt)).tuples())
+
+
+async def _load_dimensions(session: AsyncSession) -> tuple:
+    """Students, the position of each student's group, subjects, the
+    position of each subject's teacher (NO_POSITION for none), groups and
+    teachers."""
+    groups = _Dimension(await _rows_by_name(session, Group.id, Group.name))
+    teachers = _Dimension(await _rows_by_name(session, Teacher.id, Teacher.fullname))
+    student_rows = await _rows_by_name(
+        session, Student.id, Student.fullname, Student.group_id
+    )
+    subject_rows = await _rows_by_name(
+        session, Subject.id, Subject.name, Subject.teacher_id
+    )
+    return (
+        _Dimension(student_rows),
+        groups.nullable_positions([row[2] for row in student_rows]),
+        _Dimension(subject_rows),
+        teachers.nullable_positions([row[2] for row in subject_rows]),
+        groups,
+        teachers,
+    )
+
+
+def _grade_arrays(
+    rows: Sequence[tuple], students: _Dimension, subjects: _Dimension
+) -> dict[str, np.ndarray]:
+    """GRADE_COLUMNS of (id, student_id, subject_id, grade, date_received)
+    rows."""
+    if not rows:
+        return {name: np.array([], dtype) for name, dtype in GRADE_COLUMNS.items()}
+    ids, student_ids, subject_ids, grades, dates = zip(*rows)
+    return {
+        "id": np.array(ids, GRADE_COLUMNS["id"]),
+        "student": students.positions(np.array(student_ids)),
+        "subject": subjects.positions(np.array(subject_ids)),
+        "grade": np.array(grades, GRADE_COLUMNS["grade"]),
+        "date_received": np.array(dates, GRADE_COLUMNS["date_received"]),
+    }
+
+
+def _flags(positions: np.ndarray, size: int) -> np.ndarray:
+    flags = np.zeros(size, dtype=bool)
+    flags[positions] = True
+    return flags
+
+
+def _nullable_flags(positions: np.ndarray, size: int) -> np.ndarray:
+    """_flags() to look up nullable positions with: NO_POSITION is False."""
+    return np.append(_flags(positions, size), False)
+
+
+def _totals(keys: np.ndarray, grades: np.ndarray, size: int):
+    """Sums and counts of `grades` per key in range(size)."""
+    counts = np.bincount(keys, minlength=size)
+    # float64 sums of integers are exact far beyond any realistic total
+    sums = np.bincount(keys, weights=grades, minlength=size).astype(np.int64)
+    return sums, counts
+
+
+def _hundredths(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """round(sums / counts, 2) * 100, rounding half up, in integer arithmetic."""
+    return (200 * sums + counts) // (2 * counts)
+
+
+def _decimal(hundredths) -> Decimal:
+    return Decimal(int(hundredths)).scaleb(-2)
+
+
+def _average(grades: np.ndarray) -> Optional[Decimal]:
+    if not len(grades):
+        return None
+    total = np.int64(grades.sum(dtype=np.int64))
+    return _decimal(_hundredths(total, np.int64(len(grades))))
+
+
+def _sort_order(partition, averages, tie_breaker) -> np.ndarray:
+    """Order by partition, average descending, tie_breaker (all >= 0)."""
+    if not len(averages):
+        return np.arange(0)
+    top, span = int(averages.max()), int(tie_breaker.max()) + 1
+    if (int(partition.max()) + 1) * (top + 1) * span >= 2**63:
+        return np.lexsort((tie_breaker, -averages, partition))
+    # One int64 key sorts several times faster than lexsort over three
+    key = partition.astype(np.int64) * (top + 1) + (top - averages)
+    return np.argsort(key * span + tie_breaker)
+
+
+def _ranks(partition: np.ndarray, averages: np.ndarray, tie_breaker, ties: bool):
+    """(order, ranks): the rows sorted by partition then best average, and
+    RANK() (or ROW_NUMBER() without `ties`) of each sorted row."""
+    order = _sort_order(partition, averages, tie_breaker)
+    partition, averages = partition[order], averages[order]
+    index = np.arange(len(order))
+    new_partition = np.ones(len(order), dtype=bool)
+    new_partition[1:] = partition[1:] != partition[:-1]
+    start = np.maximum.accumulate(np.where(new_partition, index, 0))
+    if not ties:
+        return order, index - start + 1
+    new_value = new_partition.copy()
+    new_value[1:] |= averages[1:] != averages[:-1]
+    return order, np.maximum.accumulate(np.where(new_value, index, 0)) - start + 1
+
+
+async def _repeatable_read(session: AsyncSession) -> None:
+    """One snapshot for all the statements of the transaction, unless the
+    caller already began it: its isolation level can no longer change."""
+    if not session.in_transaction():
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+
+
+class GradeSnapshot:
+    """The grades as parallel arrays, dimension columns as positions.
+
+    Usage:
+        async with read_session() as session:
+            snapshot = await GradeSnapshot.load(session)
+        snapshot.fetch_1_top_students(10, date_from=datetime.date(2025, 9, 1))
+    """
+
+    def __init__(
+        self,
+        students: _Dimension,
+        student_group: np.ndarray,
+        subjects: _Dimension,
+        subject_teacher: np.ndarray,
+        groups: _Dimension,
+        teachers: _Dimension,
+        grades: dict[str, np.ndarray],
+        watermark: Optional[int] = None,
+    ):
+        self.students = students
+        self.subjects = subjects
+        self.groups = groups
+        self.teachers = teachers
+        # Position of each student's group / each subject's teacher, or
+        # NO_POSITION
+        self.student_group = student_group
+        self.subject_teacher = subject_teacher
+        # One entry per grade
+        self.id = grades["id"]
+        self.student = grades["student"]
+        self.subject = grades["subject"]
+        self.grade = grades["grade"]
+        self.date_received = grades["date_received"]
+        # Where sync() resumes; None without change capture
+        self.watermark = watermark
+
+    def __len__(self) -> int:
+        return len(self.grade)
+
+    @classmethod
+    async def load(
+        cls, session: AsyncSession, batch_size: int = 10 * DEFAULT_BATCH_SIZE
+    ) -> "GradeSnapshot":
+        """Read a consistent snapshot; grades are streamed in batches."""
+        watermark = None
+        if tracks_grade_changes(session):
+            await _repeatable_read(session)
+            watermark = await grade_watermark(session)
+        dimensions = await _load_dimensions(session)
+        students, _, subjects, *_ = dimensions
+
+        columns: dict[str, list[np.ndarray]] = {name: [] for name in GRADE_COLUMNS}
+        result = await session.stream(
+            select(
+                Grade.id,
+                Grade.student_id,
+                Grade.subject_id,
+                Grade.grade,
+                Grade.date_received,
+            ).execution_options(yield_per=batch_size)
+        )
+        async for batch in result.partitions():
+            for name, values in _grade_arrays(batch, students, subjects).items():
+                columns[name].append(values)
+        return cls(
+            *dimensions,
+            {
+                name: np.concatenate(chunks or [np.array([], GRADE_COLUMNS[name])])
+                for name, chunks in columns.items()
+            },
+            watermark,
+        )
+
+    async def sync(
+        self, session: AsyncSession, batch_size: int = 10 * DEFAULT_BATCH_SIZE
+    ) -> SyncStats:
+        """Bring the snapshot up to date in place.
+
+        Reads the grades written or deleted since the last load or sync and
+        the (small) dimension tables, drops the grades that changed and
+        appends their new versions. Without change capture, loads the
+        whole snapshot again.
+        """
+        if self.watermark is None:
+            fresh = await self.load(session, batch_size)
+            self.__dict__.update(fresh.__dict__)
+            return SyncStats(True, len(fresh), 0)
+        await _repeatable_read(session)
+        changes = await fetch_grade_changes(session, self.watermark)
+        dimensions = await _load_dimensions(session)
+        students, _, subjects, *_ = dimensions
+
+        changed_ids = [row[0] for row in changes.rows] + changes.deleted_ids
+        kept = ~np.isin(self.id, np.array(changed_ids, np.int64))
+        grades = {name: getattr(self, name)[kept] for name in GRADE_COLUMNS}
+        # Positions follow name order, which inserts and renames shift. The
+        # grades of deleted students and subjects were deleted with them.
+        if not np.array_equal(students.ids, self.students.ids):
+            grades["student"] = students.positions(self.students.ids[grades["student"]])
+        if not np.array_equal(subjects.ids, self.subjects.ids):
+            grades["subject"] = subjects.positions(self.subjects.ids[grades["subject"]])
+        written = _grade_arrays(changes.rows, students, subjects)
+        fresh = type(self)(
+            *dimensions,
+            {name: np.concatenate((grades[name], written[name])) for name in grades},
+            changes.watermark,
+        )
+        removed = self.id[~kept]
+        deleted = len(removed) - int(np.isin(written["id"], removed).sum())
+        self.__dict__.update(fresh.__dict__)
+        return SyncStats(False, len(changes.rows), deleted)
+
+    def memory_bytes(self) -> dict[str, int]:
+        """Bytes of each grade column; the dimension names come on top."""
+        return {name: getattr(self, name).nbytes for name in GRADE_COLUMNS}
+
+    def _rows(
+        self,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+        subjects: Optional[np.ndarray] = None,
+        groups: Optional[np.ndarray] = None,
+        students: Optional[np.ndarray] = None,
+        teachers: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Mask of the grades received in [date_from, date_to) that match
+        every given set of positions."""
+        mask = np.ones(len(self), dtype=bool)
+        if date_from is not None:
+            mask &= self.date_received >= np.datetime64(date_from, "us")
+        if date_to is not None:
+            mask &= self.date_received < np.datetime64(date_to, "us")
+        # Conditions on a dimension become a flag per row of that dimension,
+        # looked up with one gather over the grades
+        if subjects is not None or teachers is not None:
+            wanted = np.ones(len(self.subjects), dtype=bool)
+            if subjects is not None:
+                wanted &= _flags(subjects, len(self.subjects))
+            if teachers is not None:
+                wanted &= _nullable_flags(teachers, len(self.teachers))[
+                    self.subject_teacher
+                ]
+            mask &= wanted[self.subject]
+        if students is not None or groups is not None:
+            wanted = np.ones(len(self.students), dtype=bool)
+            if students is not None:
+                wanted &= _flags(students, len(self.students))
+            if groups is not None:
+                wanted &= _nullable_flags(groups, len(self.groups))[self.student_group]
+            mask &= wanted[self.student]
+        return mask
+
+    def _top_students(self, rows: np.ndarray, limit: int) -> list[StudentAverage]:
+        sums, counts = _totals(self.student[rows], self.grade[rows], len(self.students))
+        graded = np.flatnonzero(counts)
+        averages = _hundredths(sums[graded], counts[graded])
+        order = np.lexsort((self.students.ids[graded], -averages))[:limit]
+        return [
+            StudentAverage(self.students.names[student], _decimal(average))
+            for student, average in zip(graded[order], averages[order])
+        ]
+
+    def _subject_names(self, rows: np.ndarray) -> list[str]:
+        # Positions are in name order; subjects may share a name
+        names = self.subjects.names[np.unique(self.subject[rows])]
+        return list(dict.fromkeys(names))
+
+    def fetch_1_top_students(
+        self,
+        limit: int = 5,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> list[StudentAverage]:
+        return self._top_students(self._rows(date_from, date_to), limit)
+
+    def fetch_2_student_top_grade_for_subject(
+        self,
+        subject_name: str,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> Optional[StudentAverage]:
+        rows = self._rows(
+            date_from, date_to, subjects=self.subjects.named(subject_name)
+        )
+        top = self._top_students(rows, 1)
+        return top[0] if top else None
+
+    def fetch_3_avg_grade_in_group_for_subject(
+        self,
+        subject_name: str,
+        group_name: str,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> Optional[Decimal]:
+        rows = self._rows(
+            date_from,
+            date_to,
+            subjects=self.subjects.named(subject_name),
+            groups=self.groups.named(group_name),
+        )
+        return _average(self.grade[rows])
+
+    def fetch_4_overall_avg_grade(
+        self,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> Optional[Decimal]:
+        return _average(self.grade[self._rows(date_from, date_to)])
+
+    def fetch_5_courses_by_teacher(self, teacher_fullname: str) -> list[str]:
+        teachers = _nullable_flags(
+            self.teachers.named(teacher_fullname), len(self.teachers)
+        )
+        subjects = np.flatnonzero(teachers[self.subject_teacher])
+        order = np.argsort(self.subjects.ids[subjects])
+        return list(self.subjects.names[subjects[order]])
+
+    def fetch_6_students_in_group(self, group_name: str) -> list[str]:
+        groups = _nullable_flags(self.groups.named(group_name), len(self.groups))
+        students = groups[self.student_group]
+        return list(self.students.names[students])
+
+    def fetch_7_grades_in_group_for_subject(
+        self,
+        group_name: str,
+        subject_name: str,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> list[StudentGrade]:
+        rows = np.flatnonzero(
+            self._rows(
+                date_from,
+                date_to,
+                subjects=self.subjects.named(subject_name),
+                groups=self.groups.named(group_name),
+            )
+        )
+        # (student, subject, date_received) is unique, so with one subject
+        # name the grade id only breaks ties between same-named subjects
+        rows = rows[
+            np.lexsort((self.id[rows], self.date_received[rows], self.student[rows]))
+        ]
+        return list(
+            map(
+                StudentGrade._make,
+                zip(
+                    self.students.names[self.student[rows]],
+                    self.grade[rows].tolist(),
+                    self.date_received[rows].tolist(),
+                ),
+            )
+        )
+
+    def fetch_8_avg_grade_by_teacher(
+        self,
+        teacher_fullname: str,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> Optional[Decimal]:
+        rows = self._rows(
+            date_from, date_to, teachers=self.teachers.named(teacher_fullname)
+        )
+        return _average(self.grade[rows])
+
+    def fetch_9_courses_for_student(
+        self,
+        student_fullname: str,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> list[str]:
+        rows = self._rows(
+            date_from, date_to, students=self.students.named(student_fullname)
+        )
+        return self._subject_names(rows)
+
+    def fetch_10_courses_for_student_by_teacher(
+        self,
+        student_fullname: str,
+        teacher_fullname: str,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> list[str]:
+        rows = self._rows(
+            date_from,
+            date_to,
+            students=self.students.named(student_fullname),
+            teachers=self.teachers.named(teacher_fullname),
+        )
+        return self._subject_names(rows)
+
+    def fetch_11_top_students_per_subject(
+        self, limit: int = 3, ties: bool = True
+    ) -> list[SubjectRank]:
+        keys = self.subject.astype(np.int64) * len(self.students) + self.student
+        size = len(self.subjects) * len(self.students)
+        if size <= 4 * len(keys):
+            # Few enough (subject, student) pairs to count them all, which
+            # is much cheaper than sorting the grades
+            sums, counts = _totals(keys, self.grade, size)
+            pairs = np.flatnonzero(counts)
+            sums, counts = sums[pairs], counts[pairs]
+        else:
+            pairs, inverse = np.unique(keys, return_inverse=True)
+            sums, counts = _totals(inverse, self.grade, len(pairs))
+        subject, student = np.divmod(pairs, len(self.students))
+        averages = _hundredths(sums, counts)
+        order, ranks = _ranks(subject, averages, self.students.ids[student], ties)
+        kept = ranks <= limit
+        order, ranks = order[kept], ranks[kept]
+        # ORDER BY subject name, subject id, rank, student name
+        final = np.lexsort((student[order], ranks, subject[order]))
+        order, ranks = order[final], ranks[final]
+        return [
+            SubjectRank(
+                self.subjects.names[subject_],
+                int(rank),
+                self.students.names[student_],
+                _decimal(average),
+            )
+            for subject_, rank, student_, average in zip(
+                subject[order], ranks, student[order], averages[order]
+            )
+        ]
+
+    def fetch_12_top_students_per_group(
+        self, limit: int = 3, ties: bool = True
+    ) -> list[GroupRank]:
+        sums, counts = _totals(self.student, self.grade, len(self.students))
+        student = np.flatnonzero(counts)
+        student = student[self.student_group[student] != NO_POSITION]
+        averages = _hundredths(sums[student], counts[student])
+        group = self.student_group[student]
+        order, ranks = _ranks(group, averages, self.students.ids[student], ties)
+        kept = ranks <= limit
+        order, ranks = order[kept], ranks[kept]
+        # ORDER BY group name, rank, student name
+        final = np.lexsort((student[order], ranks, group[order]))
+        order, ranks = order[final], ranks[final]
+        return [
+            GroupRank(
+                self.groups.names[group_],
+                int(rank),
+                self.students.names[student_],
+                _decimal(average),
+            )
+            for group_, rank, student_, average in zip(
+                group[order], ranks, student[order], averages[order]
+            )
+        ]
+
+    def grade_distribution(
+        self,
+        subject_name: Optional[str] = None,
+        group_name: Optional[str] = None,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> dict[int, int]:
+        """Number of grades per grade value, optionally of one subject and
+        group."""
+        rows = self._rows(
+            date_from,
+            date_to,
+            subjects=(
+                None if subject_name is None else self.subjects.named(subject_name)
+            ),
+            groups=None if group_name is None else self.groups.named(group_name),
+        )
+        counts = np.bincount(self.grade[rows])
+        return {int(grade): int(counts[grade]) for grade in np.flatnonzero(counts)}
+
+    def grade_percentiles(
+        self,
+        fractions: Sequence[float] = DEFAULT_PERCENTILES,
+        by: str = "subject",
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ) -> list[Percentiles]:
+        """percentile_cont(fraction) of the grades of every subject or group
+        (`by`), in name order; linear interpolation between the two closest
+        grades, computed the way Postgres does."""
+        if by == "subject":
+            keys, dimension = self.subject, self.subjects
+        elif by == "group":
+            keys, dimension = self.student_group[self.student], self.groups
+        else:
+            raise ValueError(f"Percentiles by 'subject' or 'group', not {by!r}")
+        rows = self._rows(date_from, date_to) & (keys != NO_POSITION)
+        keys, grades = keys[rows], self.grade[rows]
+        # Sorting one combined int64 key is much cheaper than a lexsort
+        span = int(grades.max()) + 1 if len(grades) else 1
+        keys, grades = np.divmod(np.sort(keys.astype(np.int64) * span + grades), span)
+        grades = grades.astype(np.float64)
+        new_key = np.ones(len(keys), dtype=bool)
+        new_key[1:] = keys[1:] != keys[:-1]
+        starts = np.flatnonzero(new_key)
+        sizes = np.diff(np.r_[starts, len(keys)])
+        values = []
+        for fraction in fractions:
+            position = fraction * (sizes - 1)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            first, second = grades[starts + lower], grades[starts + upper]
+            values.append(first + (second - first) * (position - lower))
+        return [
+            Percentiles(
+                dimension.names[keys[start]],
+                int(size),
+                [float(column[index]) for column in values],
+            )
+            for index, (start, size) in enumerate(zip(starts, sizes))
+        ]
@@ -0,0 +1,234 @@
+"""Answers of the in-memory grade snapshot (src/analytics.py) versus SQL.
+
+Loads a GradeSnapshot, then runs every demo query, parameterised as
+src.my_select does, both as SQL (bypassing the query cache) and on the
+snapshot. Checks that the answers match and prints the median time of each
+over --repeat runs. On Postgres, the per-subject grade percentiles are also
+checked against percentile_cont(). Unless --no-unassigned, the comparison
+is repeated with a student without a group and a subject without a teacher,
+added in a transaction that is rolled back.
+
+    python -m src.benchmarks.analytics --repeat 20 --date-from 2025-09-01
+
+Exits with status 1 when an answer differs.
+"""
+
+import argparse
+import asyncio
+import datetime
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+from sqlalchemy import func, select
+
+from src.analytics import DEFAULT_PERCENTILES, GradeSnapshot
+from src.db.aggregates import rebuild_grade_aggregates
+from src.db.models import Grade, Student, Subject
+from src.db.session import dispose_engines, get_session_factory, read_session
+from src.my_select import build_query_runs
+from src.queries import fetch_example_row
+
+
+def _plain(value):
+    """Rows as tuples and lists, with averages as floats (SQLite returns
+    floats where Postgres returns Decimals)."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, list):
+        return list(map(_plain, value))
+    if isinstance(value, tuple):
+        return tuple(map(_plain, value))
+    return value
+
+
+def same_answer(number: int, sql, snapshot) -> bool:
+    sql, snapshot = _plain(sql), _plain(snapshot)
+    if number == 5:
+        # No ORDER BY
+        return sorted(sql) == sorted(snapshot)
+    if number == 2:
+        # Any of the students tied for the best average may be returned
+        return (sql and sql[1]) == (snapshot and snapshot[1])
+    if number == 1:
+        # Ordered by average only: tied students come in any order, and the
+        # limit may cut the last tie anywhere
+        averages = [row[1] for row in sql]
+        if averages != [row[1] for row in snapshot]:
+            return False
+        last = averages[-1] if averages else None
+        return {row for row in sql if row[1] != last} == {
+            row for row in snapshot if row[1] != last
+        }
+    return sql == snapshot
+
+
+async def median_ms(call, repeat: int) -> tuple[float, object]:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        if asyncio.iscoroutine(result):
+            result = await result
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, result
+
+
+async def check_percentiles(session, snapshot: GradeSnapshot, repeat: int) -> bool:
+    stmt = (
+        select(
+            Subject.name,
+            func.count(),
+            *(
+                func.percentile_cont(fraction).within_group(Grade.grade)
+                for fraction in DEFAULT_PERCENTILES
+            ),
+        )
+        .join(Subject)
+        .group_by(Subject.id)
+        .order_by(Subject.name, Subject.id)
+    )
+
+    async def sql():
+        return [
+            (name, count, list(values))
+            for name, count, *values in await session.execute(stmt)
+        ]
+
+    sql_ms, expected = await median_ms(sql, repeat)
+    snapshot_ms, answer = await median_ms(snapshot.grade_percentiles, repeat)
+    same = expected == [tuple(row) for row in answer]
+    print(
+        f"{'Percentiles':<12}{sql_ms:>10.2f}{snapshot_ms:>12.3f}"
+        f"{sql_ms / snapshot_ms:>10.0f}x  {'ok' if same else 'DIFFERENT'}"
+    )
+    return same
+
+
+async def add_unassigned_rows(session) -> dict | None:
+    """Add a student without a group and a subject without a teacher, graded
+    like the others, for the caller to roll back. Returns example values
+    that name them, or None when there are no grades."""
+    examples = (await fetch_example_row.uncached(session))._asdict()
+    date = await session.scalar(select(func.max(Grade.date_received)))
+    if date is None:
+        return None
+    student = Student(fullname="Student without a group", group_id=None)
+    subject = Subject(name="Subject without a teacher", teacher_id=None)
+    session.add_all([student, subject])
+    await session.flush()
+    graded_student = await session.scalar(
+        select(Student.id)
+        .filter_by(fullname=examples["student_fullname"])
+        .order_by(Student.id)
+        .limit(1)
+    )
+    subject_ids = await session.scalars(select(Subject.id))
+    session.add_all(
+        [
+            Grade(student_id=student.id, subject_id=id_, grade=90, date_received=date)
+            for id_ in subject_ids
+        ]
+    )
+    session.add(
+        Grade(
+            student_id=graded_student,
+            subject_id=subject.id,
+            grade=60,
+            date_received=date,
+        )
+    )
+    await session.flush()
+    if session.get_bind().dialect.name != "postgresql":
+        # No triggers keep grade_aggregates current
+        await rebuild_grade_aggregates(await session.connection())
+    return {
+        **examples,
+        "student_fullname": student.fullname,
+        "subject_name": subject.name,
+    }
+
+
+async def compare(
+    session, snapshot: GradeSnapshot, examples: dict, repeat: int, date_from, date_to
+) -> bool:
+    print(f"{'':<12}{'SQL ms':>10}{'snapshot ms':>12}{'speedup':>11}")
+    all_same = True
+    for run in build_query_runs(examples, date_from, date_to):
+        if run.skip_reason:
+            print(run.skip_reason)
+            continue
+        fetch = getattr(run.fetch, "uncached", run.fetch)
+        method = getattr(snapshot, fetch.__name__)
+        sql_ms, expected = await median_ms(
+            lambda: fetch(session, *run.args, **run.kwargs), repeat
+        )
+        snapshot_ms, answer = await median_ms(
+            lambda: method(*run.args, **run.kwargs), repeat
+        )
+        same = same_answer(run.number, expected, answer)
+        all_same &= same
+        print(
+            f"{run.label:<12}{sql_ms:>10.2f}{snapshot_ms:>12.3f}"
+            f"{sql_ms / snapshot_ms:>10.0f}x  {'ok' if same else 'DIFFERENT'}"
+        )
+    if session.get_bind().dialect.name == "postgresql":
+        all_same &= await check_percentiles(session, snapshot, repeat)
+    return all_same
+
+
+async def main(repeat: int, date_from, date_to, unassigned: bool) -> bool:
+    try:
+        async with read_session() as session:
+            started = time.perf_counter()
+            snapshot = await GradeSnapshot.load(session)
+            load_seconds = time.perf_counter() - started
+        print(
+            f"Snapshot of {len(snapshot)} grades loaded in {load_seconds:.2f} s, "
+            f"{sum(snapshot.memory_bytes().values()) / 2**20:.1f} MiB\n"
+        )
+        async with read_session() as session:
+            examples = (await fetch_example_row.uncached(session))._asdict()
+            all_same = await compare(
+                session, snapshot, examples, repeat, date_from, date_to
+            )
+
+        if unassigned:
+            # On the primary, in a transaction that is rolled back
+            async with get_session_factory()() as session:
+                examples = await add_unassigned_rows(session)
+                if examples is not None:
+                    print(
+                        "\nWith a student without a group and a subject without "
+                        "a teacher:"
+                    )
+                    snapshot = await GradeSnapshot.load(session)
+                    all_same &= await compare(
+                        session, snapshot, examples, repeat, date_from, date_to
+                    )
+                await session.rollback()
+    finally:
+        await dispose_engines()
+    return all_same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check and time the in-memory grade snapshot against SQL."
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--date-from", type=datetime.date.fromisoformat)
+    parser.add_argument("--date-to", type=datetime.date.fromisoformat)
+    parser.add_argument(
+        "--unassigned",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="also compare with a student without a group and a subject "
+        "without a teacher, added in a rolled back transaction",
+    )
+    args = parser.parse_args()
+    if not asyncio.run(
+        main(args.repeat, args.date_from, args.date_to, args.unassigned)
+    ):
+        sys.exit(1)
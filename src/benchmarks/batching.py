@@ -0,0 +1,95 @@
+"""Round trips and time of per-name calls versus the batched queries.
+
+For every teacher (queries 5 and 8) and for the first --students students
+(query 9), loads the results three ways: one fetch_N_* call per name in a
+loop, one batched fetch_N_*s call, and concurrent single-name loads through
+src/loaders.py. Prints the statements sent and the wall time of each.
+
+    python -m src.benchmarks.batching --students 500
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+
+from src import queries
+from src.db.instrumentation import count_statements
+from src.db.models import Student, Teacher
+from src.db.session import dispose_engines, get_engine, get_session_factory
+from src.loaders import QueryLoaders
+
+
+async def measure(title: str, load):
+    with count_statements(get_engine()) as counter:
+        started = time.perf_counter()
+        await load()
+        elapsed = time.perf_counter() - started
+    print(f"{title:<10}{counter.count:>12}{elapsed * 1000:>12.1f}")
+
+
+async def main(students: int):
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        teacher_names = list(
+            (await session.execute(select(Teacher.fullname).order_by(Teacher.id)))
+            .scalars()
+            .unique()
+        )
+        student_names = list(
+            (
+                await session.execute(
+                    select(Student.fullname).order_by(Student.id).limit(students)
+                )
+            )
+            .scalars()
+            .unique()
+        )
+        cases = [
+            (
+                f"Query 5 ({len(teacher_names)} teachers)",
+                teacher_names,
+                queries.fetch_5_courses_by_teacher.uncached,
+                queries.fetch_5_courses_by_teachers,
+                lambda loaders: loaders.courses_by_teacher,
+            ),
+            (
+                f"Query 8 ({len(teacher_names)} teachers)",
+                teacher_names,
+                queries.fetch_8_avg_grade_by_teacher.uncached,
+                queries.fetch_8_avg_grade_by_teachers,
+                lambda loaders: loaders.avg_grade_by_teacher,
+            ),
+            (
+                f"Query 9 ({len(student_names)} students)",
+                student_names,
+                queries.fetch_9_courses_for_student.uncached,
+                queries.fetch_9_courses_for_students,
+                lambda loaders: loaders.courses_for_student,
+            ),
+        ]
+        for title, names, single, batched, loader in cases:
+
+            async def loop():
+                return {name: await single(session, name) for name in names}
+
+            async def load():
+                values = await loader(QueryLoaders(session)).load_many(names)
+                return dict(zip(names, values))
+
+            await batched(session, names)  # warm-up: statement caches
+            print(f"\n{title}\n{'':<10}{'statements':>12}{'ms':>12}")
+            await measure("loop", loop)
+            await measure("batched", lambda: batched(session, names))
+            await measure("loader", load)
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare per-name query loops with the batched queries."
+    )
+    parser.add_argument("--students", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.students))
@@ -0,0 +1,216 @@
+"""Statements emitted by the object-graph loaders of the loading profiles.
+
+Each profile of src/db/loading.py loads its graph with a fixed number of
+statements, whatever the number of related rows: one for the root objects
+plus one per selectinload (a joinedload adds none). Every load_* function
+of src/queries.py is called on example rows of the database and the
+statements it emits are counted. Then its whole graph is walked, which must
+emit none: a relationship the profile did not load raises instead.
+
+    python -m src.benchmarks.loading --repeat 20
+
+Exits with status 1 when a load emits another number of statements than
+expected, or its graph is incomplete.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import sys
+import time
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import queries
+from src.db.instrumentation import count_statements
+from src.db.loading import (
+    GRADE_DETAILS,
+    GROUP_ROSTER,
+    STUDENT_REPORT,
+    SUBJECT_GRADEBOOK,
+    TEACHER_SUBJECTS,
+    LoadProfile,
+)
+from src.db.models import Grade, Group, Student, Subject, Teacher
+from src.db.session import dispose_engines, get_engine, get_session_factory
+
+GRADE_DETAILS_ROWS = 100
+
+
+class Examples(NamedTuple):
+    """A grade whose student has a group and whose subject has a teacher,
+    and the ids of the first grades."""
+
+    group_name: str
+    student_id: int
+    teacher_id: int
+    subject_id: int
+    grade_ids: list[int]
+
+
+@dataclasses.dataclass(frozen=True)
+class ProfileCheck:
+    profile: LoadProfile
+    # Statements a load should emit
+    statements: int
+    load: Callable[[AsyncSession, Examples], Awaitable[Any]]
+    # Touches every object of the loaded graph, returns how many there are
+    walk: Callable[[Any], int]
+
+
+def walk_group_roster(group: Group) -> int:
+    return 1 + len(group.students)
+
+
+def walk_student_report(student: Student) -> int:
+    objects = [student, student.group]
+    for grade in student.grades:
+        objects += [grade, grade.subject]
+    return len(objects)
+
+
+def walk_teacher_subjects(teacher: Teacher) -> int:
+    return 1 + len(teacher.subjects)
+
+
+def walk_subject_gradebook(subject: Subject) -> int:
+    objects = [subject, subject.teacher]
+    for grade in subject.grades:
+        objects += [grade, grade.student]
+    return len(objects)
+
+
+def walk_grade_details(grades: list[Grade]) -> int:
+    return sum(len((grade, grade.student, grade.subject)) for grade in grades)
+
+
+CHECKS = (
+    ProfileCheck(
+        GROUP_ROSTER,
+        2,
+        lambda session, ex: queries.load_group_roster(session, ex.group_name),
+        walk_group_roster,
+    ),
+    ProfileCheck(
+        STUDENT_REPORT,
+        2,
+        lambda session, ex: queries.load_student_report(session, ex.student_id),
+        walk_student_report,
+    ),
+    ProfileCheck(
+        TEACHER_SUBJECTS,
+        2,
+        lambda session, ex: queries.load_teacher_subjects(session, ex.teacher_id),
+        walk_teacher_subjects,
+    ),
+    ProfileCheck(
+        SUBJECT_GRADEBOOK,
+        2,
+        lambda session, ex: queries.load_subject_gradebook(session, ex.subject_id),
+        walk_subject_gradebook,
+    ),
+    ProfileCheck(
+        GRADE_DETAILS,
+        1,
+        lambda session, ex: queries.load_grade_details(session, ex.grade_ids),
+        walk_grade_details,
+    ),
+)
+
+
+@dataclasses.dataclass
+class CheckResult:
+    profile: str
+    expected: int
+    statements: int
+    # Statements emitted while walking the graph; None if it was incomplete
+    walk_statements: int | None
+    objects: int
+    load_ms: float
+
+    @property
+    def ok(self) -> bool:
+        return self.statements == self.expected and self.walk_statements == 0
+
+
+async def fetch_examples(session: AsyncSession) -> Examples | None:
+    row = (
+        await session.execute(
+            select(Group.name, Student.id, Subject.teacher_id, Subject.id)
+            .select_from(Grade)
+            .join(Student)
+            .join(Group)
+            .join(Subject)
+            .filter(Subject.teacher_id.is_not(None))
+            .order_by(Grade.id)
+            .limit(1)
+        )
+    ).first()
+    if row is None:
+        return None
+    grade_ids = await session.scalars(
+        select(Grade.id).order_by(Grade.id).limit(GRADE_DETAILS_ROWS)
+    )
+    return Examples(*row, grade_ids=list(grade_ids))
+
+
+async def run_check(
+    check: ProfileCheck, examples: Examples, repeat: int
+) -> CheckResult:
+    engine = get_engine()
+    session_factory = get_session_factory()
+    result = CheckResult(check.profile.name, check.statements, 0, 0, 0, 0.0)
+    seconds = []
+    for _ in range(repeat):
+        # A new session each time, so nothing comes from the identity map
+        async with session_factory() as session:
+            started = time.perf_counter()
+            with count_statements(engine) as load_counter:
+                graph = await check.load(session, examples)
+            seconds.append(time.perf_counter() - started)
+            result.statements = max(result.statements, load_counter.count)
+            with count_statements(engine) as walk_counter:
+                try:
+                    result.objects = check.walk(graph)
+                except exc.InvalidRequestError:
+                    # lazy="raise_on_sql": the profile missed a relationship
+                    result.walk_statements = None
+                    break
+            result.walk_statements = max(result.walk_statements, walk_counter.count)
+    result.load_ms = sorted(seconds)[len(seconds) // 2] * 1000
+    return result
+
+
+async def main(repeat: int) -> bool:
+    try:
+        async with get_session_factory()() as session:
+            examples = await fetch_examples(session)
+        if examples is None:
+            print("No graded student with a group and a teacher, seed the database.")
+            return False
+        results = [await run_check(check, examples, repeat) for check in CHECKS]
+    finally:
+        await dispose_engines()
+
+    print(
+        f"\n{'profile':<20}{'expected':>9}{'stmts':>7}{'walk':>8}"
+        f"{'objects':>9}{'p50 ms':>9}"
+    )
+    for result in results:
+        walk = "raised" if result.walk_statements is None else result.walk_statements
+        print(
+            f"{result.profile:<20}{result.expected:>9}{result.statements:>7}"
+            f"{walk:>8}{result.objects:>9}{result.load_ms:>9.2f}"
+            f"  {'ok' if result.ok else 'FAILED'}"
+        )
+    return all(result.ok for result in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if not asyncio.run(main(args.repeat)):
+        sys.exit(1)
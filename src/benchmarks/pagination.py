@@ -0,0 +1,98 @@
+"""Latency of keyset pages versus OFFSET pages deeper and deeper into a list.
+
+Walks queries 6 and 7 for the example group and subject with the page_N_*
+functions (keyset cursors) and, for comparison, with LIMIT/OFFSET on the
+same ordering, and prints the median time of the pages at a few depths.
+Keyset pages should cost the same at every depth; OFFSET pages get slower.
+
+    python -m src.benchmarks.pagination --page-size 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from src import queries
+from src.db.lookup import dimensions
+from src.db.models import Group, Subject
+from src.db.session import dispose_engines, get_session_factory
+from src.pagination import DEFAULT_PAGE_SIZE
+
+# Page positions reported, as fractions of the list
+DEPTHS = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+async def keyset_page_times(session, page, args, page_size: int) -> list[float]:
+    """Seconds per page of walking a whole list through its cursors."""
+    times = []
+    cursor = None
+    while True:
+        started = time.perf_counter()
+        result = await page(session, *args, page_size, cursor)
+        times.append(time.perf_counter() - started)
+        cursor = result.next_cursor
+        if cursor is None:
+            return times
+
+
+async def offset_page_times(session, stmt, pages: int, page_size: int) -> list[float]:
+    times = []
+    for number in range(pages):
+        started = time.perf_counter()
+        await session.execute(stmt.limit(page_size).offset(number * page_size))
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def at_depths(times: list[float]) -> list[str]:
+    """Median ms of the 5 pages around each of DEPTHS."""
+    cells = []
+    for depth in DEPTHS:
+        index = round(depth * (len(times) - 1))
+        window = times[max(0, index - 2) : index + 3]
+        cells.append(f"{statistics.median(window) * 1000:>8.2f}")
+    return cells
+
+
+async def main(page_size: int):
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        examples = await queries.fetch_example_row.uncached(session)
+        group, subject = examples.group_name, examples.subject_name
+        group_ids = await dimensions.ids(session, Group.name, group)
+        subject_ids = await dimensions.ids(session, Subject.name, subject)
+        lists = [
+            (
+                f"Query 6 (group '{group}')",
+                queries.page_6_students_in_group,
+                (group,),
+                queries.students_in_group_stmt(group_ids),
+            ),
+            (
+                f"Query 7 (group '{group}', subject '{subject}')",
+                queries.page_7_grades_in_group_for_subject,
+                (group, subject),
+                queries.grades_in_group_for_subject_stmt(group_ids, subject_ids),
+            ),
+        ]
+        header = "".join(f"{f'{depth:.0%}':>9}" for depth in DEPTHS)
+        for title, page, args, stmt in lists:
+            await page(session, *args, page_size)  # warm-up: statement caches
+            await session.execute(stmt.limit(page_size))
+            keyset = await keyset_page_times(session, page, args, page_size)
+            offset = await offset_page_times(session, stmt, len(keyset), page_size)
+            print(f"\n{title}: {len(keyset)} pages of {page_size}, ms per page at")
+            print(f"{'':<8}{header}")
+            print(f"{'keyset':<8}" + " ".join(at_depths(keyset)))
+            print(f"{'OFFSET':<8}" + " ".join(at_depths(offset)))
+    await dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare keyset and OFFSET page latency by page depth."
+    )
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    args = parser.parse_args()
+    asyncio.run(main(args.page_size))
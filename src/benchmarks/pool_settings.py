@@ -0,0 +1,120 @@
+"""Queries/sec of the select_N queries under concurrent load for several engine settings.
+
+Every preset gets a fresh engine built from the environment settings with
+the preset's overrides applied. `--concurrency` workers then run the ten
+queries round-robin (bypassing the result cache), each query on a session
+checked out for that query only, for `--duration` seconds.
+
+    python -m src.benchmarks.pool_settings --concurrency 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src import my_select
+from src.db.session import dispose_engines, get_session_factory, get_settings
+
+PRESETS = {
+    "pool 1": dict(pool_size=1, max_overflow=0),
+    "pool 5": dict(pool_size=5, max_overflow=0),
+    "pool 5 + overflow 10": dict(pool_size=5, max_overflow=10),
+    "pool 20": dict(pool_size=20, max_overflow=0),
+    "pool 20, no pre-ping": dict(pool_size=20, max_overflow=0, pool_pre_ping=False),
+    "pool 20, no statement caches": dict(
+        pool_size=20,
+        max_overflow=0,
+        statement_cache_size=0,
+        prepared_statement_cache_size=0,
+    ),
+}
+
+
+@dataclasses.dataclass
+class PresetResult:
+    name: str
+    queries: int
+    errors: int
+    seconds: float
+
+    @property
+    def queries_per_second(self) -> float:
+        return self.queries / self.seconds if self.seconds else 0.0
+
+
+async def run_preset(
+    name: str, overrides: dict, calls: list, concurrency: int, duration: float
+) -> PresetResult:
+    preset_settings = dataclasses.replace(get_settings(), **overrides)
+    preset_engine = create_async_engine(
+        preset_settings.url, **preset_settings.engine_kwargs()
+    )
+    session_factory = async_sessionmaker(
+        bind=preset_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    queries = errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset: int):
+        nonlocal queries, errors
+        index = offset
+        while time.perf_counter() < deadline:
+            fetch, args = calls[index % len(calls)]
+            index += 1
+            try:
+                async with session_factory() as session:
+                    await fetch(session, *args)
+                queries += 1
+            except Exception:  # pool timeouts count against the preset
+                errors += 1
+
+    started = time.perf_counter()
+    try:
+        async with asyncio.TaskGroup() as group:
+            for offset in range(concurrency):
+                group.create_task(worker(offset))
+    finally:
+        await preset_engine.dispose()
+    return PresetResult(name, queries, errors, time.perf_counter() - started)
+
+
+async def main(concurrency: int, duration: float, presets: list[str]):
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        examples = await my_select.fetch_example_data(session)
+    await dispose_engines()
+
+    calls = [
+        (run.fetch.uncached, run.args)
+        for run in my_select.build_query_runs(examples)
+        if run.skip_reason is None
+    ]
+
+    print(f"\n--- {concurrency} concurrent workers, {duration:.0f}s per preset ---")
+    for name in presets:
+        result = await run_preset(name, PRESETS[name], calls, concurrency, duration)
+        print(
+            f"{result.name:<32} {result.queries_per_second:>9,.1f} queries/sec "
+            f"({result.queries} queries, {result.errors} errors)"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument(
+        "--preset",
+        action="append",
+        choices=list(PRESETS),
+        help="Run only these presets (repeatable). Default: all.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(main(args.concurrency, args.duration, args.preset or list(PRESETS)))
@@ -0,0 +1,267 @@
+"""Latency of every select_N query at several data scales.
+
+For each scale the target database is wiped, recreated from the models and
+seeded with a fixed random seed; then every query runs `--repeat` times
+(after one warm-up call) with the result cache bypassed. p50/p95/p99
+latency, rows returned and statements per call are written to a JSON or
+CSV report that can be compared with a previous one:
+
+    python -m src.benchmarks.queries --database-url sqlite+aiosqlite:///bench.db \\
+        --scales 1k,100k --output before.json
+    python -m src.benchmarks.queries --database-url ... --output after.json --compare before.json
+
+The target database is DROPPED, never point it at data you want to keep.
+"""
+
+import argparse
+import asyncio
+import csv
+import dataclasses
+import json
+import math
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src import my_select, queries
+from src.db.aggregates import rebuild_grade_aggregates
+from src.db.instrumentation import count_statements
+from src.db.lookup import dimensions
+from src.db.models import metadata_obj
+from src.db.partitions import ensure_grade_partitions
+from src.db.query_cache import query_cache
+from src.db.settings import DatabaseSettings
+from src.seeding import SeedConfig, seed_data_bulk, seed_data_parallel
+
+# Named scales by approximate number of grades: students x average grades each
+SCALES = {
+    "1k": SeedConfig(
+        students=100, groups=5, subjects=10, teachers=5, max_grades_per_student=19
+    ),
+    "100k": SeedConfig(
+        students=5_000, groups=20, subjects=20, teachers=10, max_grades_per_student=39
+    ),
+    "10m": SeedConfig(
+        students=100_000,
+        groups=200,
+        subjects=40,
+        teachers=25,
+        max_grades_per_student=199,
+    ),
+}
+SEED = 2025
+
+
+@dataclasses.dataclass
+class QueryResult:
+    scale: str
+    query: str
+    calls: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    rows: int
+    statements: float
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Nearest-rank percentile of `samples`."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def row_count(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+async def reset_and_seed(engine, scale: str, workers: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata_obj.drop_all)
+        await conn.run_sync(metadata_obj.create_all)
+    # Ids of the previous scale: neither the DDL nor the seeding processes
+    # are seen by the watchers
+    dimensions.clear()
+
+    config = dataclasses.replace(SCALES[scale], seed=SEED)
+    async with engine.begin() as conn:
+        await ensure_grade_partitions(conn, config.start_date, config.end_date)
+    started = time.perf_counter()
+    if engine.dialect.name == "postgresql" and workers > 1:
+        stats = await seed_data_parallel(engine, config, workers)
+    else:
+        stats = await seed_data_bulk(engine, config)
+
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            await conn.execute(text("ANALYZE"))
+        else:
+            await rebuild_grade_aggregates(conn)
+    grades = next(s.rows for s in stats if s.table == "grades")
+    print(
+        f"Seeded scale {scale}: {grades:,} grades in {time.perf_counter() - started:.1f}s"
+    )
+
+
+async def benchmark_scale(engine, scale: str, repeat: int) -> list[QueryResult]:
+    session_factory = async_sessionmaker(
+        bind=engine, class_=AsyncSession, expire_on_commit=False
+    )
+    async with session_factory() as session:
+        examples = (await queries.fetch_example_row.uncached(session))._asdict()
+
+    results = []
+    for run in my_select.build_query_runs(examples):
+        if run.skip_reason:
+            continue
+        fetch = run.fetch.uncached
+        async with session_factory() as session:
+            await fetch(session, *run.args)  # warm-up: connection, caches
+            samples = []
+            with count_statements(engine) as counter:
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    value = await fetch(session, *run.args)
+                    samples.append((time.perf_counter() - started) * 1000)
+        results.append(
+            QueryResult(
+                scale=scale,
+                query=fetch.__name__,
+                calls=repeat,
+                p50_ms=round(percentile(samples, 50), 3),
+                p95_ms=round(percentile(samples, 95), 3),
+                p99_ms=round(percentile(samples, 99), 3),
+                mean_ms=round(sum(samples) / len(samples), 3),
+                rows=row_count(value),
+                statements=counter.count / repeat,
+            )
+        )
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(path: Path, meta: dict, results: list[QueryResult]):
+    rows = [dataclasses.asdict(result) for result in results]
+    if path.suffix == ".csv":
+        with path.open("w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        path.write_text(json.dumps({"meta": meta, "results": rows}, indent=2) + "\n")
+
+
+def read_report(path: Path) -> list[dict]:
+    if path.suffix == ".csv":
+        with path.open(newline="") as file:
+            return [
+                {
+                    key: value if key in ("scale", "query") else float(value)
+                    for key, value in row.items()
+                }
+                for row in csv.DictReader(file)
+            ]
+    return json.loads(path.read_text())["results"]
+
+
+def print_results(results: list[QueryResult], baseline: list[dict] | None = None):
+    previous = {(row["scale"], row["query"]): row for row in baseline or []}
+    print(
+        f"\n{'scale':<6} {'query':<42} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'rows':>6} {'stmts':>5}"
+    )
+    for result in results:
+        line = (
+            f"{result.scale:<6} {result.query:<42} {result.p50_ms:>9.2f} "
+            f"{result.p95_ms:>9.2f} {result.p99_ms:>9.2f} {result.rows:>6} "
+            f"{result.statements:>5.1f}"
+        )
+        old = previous.get((result.scale, result.query))
+        if old and old["p50_ms"]:
+            change = (result.p50_ms - old["p50_ms"]) / old["p50_ms"] * 100
+            line += f"  p50 {change:+.0f}% vs baseline"
+        print(line)
+
+
+async def main(args: argparse.Namespace):
+    settings = dataclasses.replace(
+        DatabaseSettings.from_env(), url=args.database_url, echo=False
+    )
+    engine = create_async_engine(settings.url, **settings.engine_kwargs())
+    query_cache.watch(engine)
+    dimensions.watch(engine)
+    results = []
+    try:
+        for scale in args.scales:
+            await reset_and_seed(engine, scale, args.workers)
+            results.extend(await benchmark_scale(engine, scale, args.repeat))
+    finally:
+        await engine.dispose()
+
+    baseline = read_report(args.compare) if args.compare else None
+    print_results(results, baseline)
+
+    if args.output:
+        meta = {
+            "commit": git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "database": engine.dialect.name,
+            "repeat": args.repeat,
+            "scales": args.scales,
+        }
+        write_report(args.output, meta, results)
+        print(f"\nReport written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCH_DATABASE_URL"),
+        required=os.getenv("BENCH_DATABASE_URL") is None,
+        help="Database to wipe and seed (default: $BENCH_DATABASE_URL).",
+    )
+    parser.add_argument(
+        "--scales",
+        type=lambda value: value.split(","),
+        default=list(SCALES),
+        help=f"Comma-separated subset of {', '.join(SCALES)}.",
+    )
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Seeding processes on PostgreSQL.",
+    )
+    parser.add_argument("--output", type=Path, help="Report file, .json or .csv.")
+    parser.add_argument("--compare", type=Path, help="Previous report to compare with.")
+    args = parser.parse_args()
+    unknown = set(args.scales) - set(SCALES)
+    if unknown:
+        parser.error(f"unknown scales: {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
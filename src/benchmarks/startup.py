@@ -0,0 +1,161 @@
+"""Import time of the command-line entry points.
+
+Short-lived invocations (cron jobs, readiness probes) spend most of their
+time importing. Every entry point is imported `--repeat` times in a fresh
+interpreter with `python -X importtime`; the report shows the median import
+time (without what the bare interpreter imports anyway), the median wall
+time of the process, the heavy packages it pulled in and, with `--top`, the
+packages that cost the most:
+
+    python -m src.benchmarks.startup --top 5 --output startup.json
+    python -m src.benchmarks.startup --compare startup.json
+
+Nothing connects to the database, DATABASE_URL is not needed.
+"""
+
+import argparse
+import collections
+import dataclasses
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.benchmarks.queries import git_commit
+
+ENTRY_POINTS = (
+    "src",
+    "src.my_select",
+    "src.seed",
+    "src.ingest",
+    "src.export",
+    "src.explain_queries",
+    "src.db.partitions",
+    "src.db.routing",
+)
+# Packages worth importing only by the commands that need them
+HEAVY_PACKAGES = ("faker", "numpy", "pyarrow")
+
+
+@dataclasses.dataclass
+class StartupResult:
+    entry_point: str
+    import_ms: float
+    wall_ms: float
+    heavy: list[str]
+    # Self time per top-level package of the median run, ms
+    packages: dict[str, float]
+
+
+def import_times(module: str | None) -> tuple[dict[str, tuple[int, int]], float]:
+    """{module: (self µs, cumulative µs)} of the modules imported by a fresh
+    interpreter running `import module` (nothing if None), and its wall
+    time in seconds. Top-level imports come first, in the order imported."""
+    started = time.perf_counter()
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {module}" if module else "pass",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times, wall
+
+
+def measure(module: str, repeat: int, interpreter: set[str]) -> StartupResult:
+    runs = []
+    for _ in range(repeat):
+        times, wall = import_times(module)
+        # Leave out what the interpreter imports before running the code
+        times = {
+            name: value for name, value in times.items() if name not in interpreter
+        }
+        runs.append((sum(self_us for self_us, _ in times.values()), wall, times))
+    runs.sort(key=lambda run: run[0])
+    total_us, _, times = runs[len(runs) // 2]
+    packages = collections.Counter()
+    for name, (self_us, _) in times.items():
+        packages[name.partition(".")[0]] += self_us / 1000
+    return StartupResult(
+        entry_point=module,
+        import_ms=total_us / 1000,
+        wall_ms=statistics.median(wall for _, wall, _ in runs) * 1000,
+        heavy=[package for package in HEAVY_PACKAGES if package in times],
+        packages=dict(packages.most_common()),
+    )
+
+
+def print_results(
+    results: list[StartupResult], top: int, baseline: list[dict] | None = None
+):
+    previous = {row["entry_point"]: row for row in baseline or []}
+    print(f"\n{'entry point':<22} {'import ms':>10} {'wall ms':>9}  heavy packages")
+    for result in results:
+        line = (
+            f"{result.entry_point:<22} {result.import_ms:>10.1f} "
+            f"{result.wall_ms:>9.1f}  {', '.join(result.heavy) or '-'}"
+        )
+        old = previous.get(result.entry_point)
+        if old and old["import_ms"]:
+            change = (result.import_ms - old["import_ms"]) / old["import_ms"] * 100
+            line += f"  import {change:+.0f}% vs baseline"
+        print(line)
+        for package, ms in list(result.packages.items())[:top]:
+            print(f"    {package:<18} {ms:>10.1f}")
+
+
+def main(args: argparse.Namespace):
+    interpreter = set(import_times(None)[0])
+    results = [
+        measure(module, args.repeat, interpreter) for module in args.entry_points
+    ]
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else None
+    print_results(results, args.top, baseline)
+
+    if args.output:
+        meta = {
+            "commit": git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "repeat": args.repeat,
+        }
+        rows = [dataclasses.asdict(result) for result in results]
+        args.output.write_text(
+            json.dumps({"meta": meta, "results": rows}, indent=2) + "\n"
+        )
+        print(f"\nReport written to {args.output}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "entry_points",
+        nargs="*",
+        default=list(ENTRY_POINTS),
+        help="Modules to import (default: every command-line entry point).",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=0, help="Show the N costliest packages of each."
+    )
+    parser.add_argument("--output", type=Path, help="JSON report file.")
+    parser.add_argument("--compare", type=Path, help="Previous report to compare with.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,162 @@
+"""Statement reuse and Python overhead per call of the demo queries.
+
+Every demo query, parameterised as src.my_select does, is called once to
+warm up and then `--repeat` times on one connection, bypassing the result
+cache. A repeated call should find its SQL in SQLAlchemy's compiled cache
+and, on Postgres with asyncpg, execute the server-side prepared statement
+the warm-up created on the connection instead of preparing a new one. The
+report shows, per query, the statements compiled and prepared during the
+repeated calls (both should be 0), the time per call and the part of it
+spent outside the driver: building, compiling and binding the statement
+and turning the rows into results.
+
+    python -m src.benchmarks.statements --repeat 1000 --date-from 2025-09-01
+
+Exits with status 1 when a repeated call compiles or prepares a statement.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event, text
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.db.session import dispose_engines, get_engine, get_session_factory
+from src.my_select import build_query_runs
+from src.queries import fetch_example_row
+
+PREPARED_STATEMENTS = text("SELECT count(*) FROM pg_prepared_statements")
+
+
+class StatementRecorder:
+    """Statements executed on a connection, the time spent in the driver and
+    how many of them missed the compiled cache."""
+
+    def __init__(self):
+        self.statements = 0
+        self.compiled = 0
+        self.driver_seconds = 0.0
+        self._started = 0.0
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self._started = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.driver_seconds += time.perf_counter() - self._started
+        self.statements += 1
+        if context.cache_hit is not CacheStats.CACHE_HIT:
+            self.compiled += 1
+
+
+@contextmanager
+def record_statements(conn: AsyncConnection) -> Iterator[StatementRecorder]:
+    recorder = StatementRecorder()
+    sync_conn = conn.sync_connection
+    listeners = {
+        "before_cursor_execute": recorder._before_cursor_execute,
+        "after_cursor_execute": recorder._after_cursor_execute,
+    }
+    for name, listener in listeners.items():
+        event.listen(sync_conn, name, listener)
+    try:
+        yield recorder
+    finally:
+        for name, listener in listeners.items():
+            event.remove(sync_conn, name, listener)
+
+
+@dataclasses.dataclass
+class QueryStats:
+    label: str
+    statements: float
+    compiled: int
+    # None when the driver does not prepare statements on the server
+    prepared: int | None
+    call_us: float
+    overhead_us: float
+
+    @property
+    def reused(self) -> bool:
+        return not self.compiled and not self.prepared
+
+
+async def prepared_statements(conn: AsyncConnection) -> int | None:
+    if conn.dialect.name != "postgresql" or conn.dialect.driver != "asyncpg":
+        return None
+    return (await conn.execute(PREPARED_STATEMENTS)).scalar_one()
+
+
+async def measure(conn: AsyncConnection, session, run, repeat: int) -> QueryStats:
+    fetch = run.fetch.uncached
+    await fetch(session, *run.args, **run.kwargs)
+    prepared_before = await prepared_statements(conn)
+    with record_statements(conn) as recorder:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await fetch(session, *run.args, **run.kwargs)
+        seconds = time.perf_counter() - started
+    prepared_after = await prepared_statements(conn)
+    return QueryStats(
+        label=run.label,
+        statements=recorder.statements / repeat,
+        compiled=recorder.compiled,
+        prepared=(
+            None if prepared_before is None else prepared_after - prepared_before
+        ),
+        call_us=seconds / repeat * 1e6,
+        overhead_us=(seconds - recorder.driver_seconds) / repeat * 1e6,
+    )
+
+
+async def main(repeat: int, date_from, date_to) -> bool:
+    engine = get_engine()
+    session_factory = get_session_factory()
+    results = []
+    try:
+        async with engine.connect() as conn:
+            async with session_factory(bind=conn) as session:
+                examples = (await fetch_example_row.uncached(session))._asdict()
+                for run in build_query_runs(examples, date_from, date_to):
+                    if run.skip_reason:
+                        print(run.skip_reason)
+                        continue
+                    results.append(await measure(conn, session, run, repeat))
+    finally:
+        await dispose_engines()
+
+    print(f"\n{engine.dialect.name}+{engine.dialect.driver}, {repeat} calls per query")
+    print(
+        f"{'':<12}{'stmts':>7}{'compiled':>10}{'prepared':>10}"
+        f"{'µs/call':>10}{'overhead µs':>13}"
+    )
+    for result in results:
+        prepared = "-" if result.prepared is None else result.prepared
+        print(
+            f"{result.label:<12}{result.statements:>7.1f}{result.compiled:>10}"
+            f"{prepared:>10}{result.call_us:>10.0f}{result.overhead_us:>13.0f}"
+            f"  {'ok' if result.reused else 'NOT REUSED'}"
+        )
+    return all(result.reused for result in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check statement reuse and time the Python overhead per query call."
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--date-from", type=datetime.date.fromisoformat)
+    parser.add_argument("--date-to", type=datetime.date.fromisoformat)
+    args = parser.parse_args()
+    if not asyncio.run(main(args.repeat, args.date_from, args.date_to)):
+        sys.exit(1)
@@ -0,0 +1,40 @@
+from sqlalchemy import Numeric, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .models import Grade, GradeAggregate
+from .models.grade_aggregate_model import (  # pylint: disable=unused-import
+    student_subject_average,  # the per-row average, defined with its index
+)
+
+
+def average_grade():
+    """AVG(grade) over the aggregate rows of the current GROUP BY, to 2 decimals.
+
+    Equal to `round(avg(grades.grade), 2)` over the same grades; the cast
+    keeps Postgres from doing integer division.
+    """
+    return func.round(
+        cast(func.sum(GradeAggregate.grade_sum), Numeric)
+        / func.sum(GradeAggregate.grade_count),
+        2,
+    )
+
+
+async def rebuild_grade_aggregates(conn: AsyncConnection) -> None:
+    """Recompute `grade_aggregates` from scratch.
+
+    The Postgres triggers keep the table current, so this is only needed on
+    databases without them (e.g. SQLite) or after loading with triggers off.
+    """
+    await conn.execute(delete(GradeAggregate))
+    await conn.execute(
+        insert(GradeAggregate).from_select(
+            ["student_id", "subject_id", "grade_sum", "grade_count"],
+            select(
+                Grade.student_id,
+                Grade.subject_id,
+                func.sum(Grade.grade),
+                func.count(),
+            ).group_by(Grade.student_id, Grade.subject_id),
+        )
+    )
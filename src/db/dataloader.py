@@ -0,0 +1,88 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, Mapping, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """Coalesces concurrent single-key loads into calls of a batch function.
+
+    `load(key)` queues the key and waits. The queue is dispatched from a
+    callback scheduled with call_soon when the first key arrives, i.e. after
+    every task that was ready in the same event-loop iteration had its turn,
+    so keys requested by concurrently running tasks end up in one call of
+    `batch_load(keys)`. Keys are deduplicated; a key missing from the mapping
+    it returns resolves to `default`, or to a new `default_factory()` for
+    mutable defaults such as lists. Errors of a batch are raised in every
+    caller that waited for it.
+
+    Usage:
+        loader = DataLoader(partial(fetch_9_courses_for_students, session))
+        a, b = await asyncio.gather(loader.load("Ann Lee"), loader.load("Bo Chan"))
+
+    Results are not remembered between batches, so a loader never serves
+    stale data: use one per unit of work (a request, a report).
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[K]], Awaitable[Mapping[K, V]]],
+        default: V = None,
+        max_batch_size: int | None = None,
+        default_factory: Callable[[], V] | None = None,
+    ):
+        if default is not None and default_factory is not None:
+            raise ValueError("Cannot specify both default and default_factory")
+        self.batch_load = batch_load
+        self.default = default
+        self.default_factory = default_factory
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self._queue: dict[K, asyncio.Future] = {}
+        # Strong references: the loop only keeps weak ones to tasks
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V:
+        future = self._queue.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            future = self._queue[key] = loop.create_future()
+        # A cancelled caller must not cancel the batch for the others
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[V]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self):
+        queue, self._queue = self._queue, {}
+        keys = list(queue)
+        size = self.max_batch_size or len(keys)
+        for start in range(0, len(keys), size):
+            batch = {key: queue[key] for key in keys[start : start + size]}
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[K, asyncio.Future]):
+        self.batches += 1
+        try:
+            values = await self.batch_load(list(batch))
+        except Exception as exc:  # pylint: disable=broad-except
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    # Retrieved by the callers still waiting, if any
+                    future.exception()
+            return
+        for key, future in batch.items():
+            if future.done():
+                continue
+            if key in values:
+                future.set_result(values[key])
+            elif self.default_factory is not None:
+                future.set_result(self.default_factory())
+            else:
+                future.set_result(self.default)
@@ -0,0 +1,279 @@
+import bisect
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, ParamSpec, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class StatementCounter:
+    """Collects the SQL statements sent to the database while it is active."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_statements(engine: AsyncEngine) -> Iterator[StatementCounter]:
+    """Count statements emitted through `engine` inside the `with` block.
+
+    Usage:
+        with count_statements(engine) as counter:
+            await session.execute(...)
+        assert counter.count == 2
+    """
+    counter = StatementCounter()
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(
+            sync_engine, "before_cursor_execute", counter._before_cursor_execute
+        )
+
+
+# Name of the query function whose statements are being executed; set by
+# @tag_query and read by QueryInstrumentation when a statement completes.
+current_query: ContextVar[Optional[str]] = ContextVar("current_query", default=None)
+
+UNTAGGED = "untagged"
+
+# Histogram bucket upper bounds (Prometheus `le`), +Inf is implied
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+slow_query_logger = logging.getLogger("src.db.slow_query")
+
+
+def tag_query(func: Callable[P, R]) -> Callable[P, R]:
+    """Attribute the statements executed by coroutine or async generator
+    function `func` to its name."""
+    name = func.__name__
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def generator_wrapper(*args, **kwargs):
+            # The generator runs in its consumer's context: tag each step
+            # only, so the consumer's own statements between steps are not
+            # attributed to `func`.
+            generator = func(*args, **kwargs)
+            try:
+                while True:
+                    token = current_query.set(name)
+                    try:
+                        item = await anext(generator)
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        current_query.reset(token)
+                    yield item
+            finally:
+                await generator.aclose()
+
+        return generator_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = current_query.set(name)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            current_query.reset(token)
+
+    return wrapper
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[tuple[str, int]]:
+        total = 0
+        bounds = [_format_number(bound) for bound in self.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            yield bound, total
+
+
+class QueryInstrumentation:
+    """Per-statement timing, row counts and slow-query logging for an engine.
+
+    Every statement is labelled with `current_query` (see @tag_query) and
+    its duration and row count are recorded in histograms per label. A
+    statement slower than `slow_query_ms` is logged to `src.db.slow_query`
+    as one JSON object. `render_prometheus()` exports the histograms in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = 500.0):
+        self.slow_query_ms = slow_query_ms
+        self.durations: dict[str, Histogram] = {}
+        self.rows: dict[str, Histogram] = {}
+        self.slow_queries: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def attach(self, engine: AsyncEngine):
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def detach(self, engine: AsyncEngine):
+        sync_engine = engine.sync_engine
+        event.remove(sync_engine, "before_cursor_execute", self._before_execute)
+        event.remove(sync_engine, "after_cursor_execute", self._after_execute)
+        event.remove(sync_engine, "handle_error", self._handle_error)
+
+    def reset(self):
+        with self._lock:
+            self.durations.clear()
+            self.rows.clear()
+            self.slow_queries.clear()
+            self.errors.clear()
+
+    def _before_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start_time"].pop()
+        query = current_query.get() or UNTAGGED
+        # -1 when the driver can't tell, e.g. for DDL
+        rowcount = cursor.rowcount if cursor.rowcount is not None else -1
+
+        with self._lock:
+            self._histogram(self.durations, query, DURATION_BUCKETS).observe(seconds)
+            if rowcount >= 0:
+                self._histogram(self.rows, query, ROW_BUCKETS).observe(rowcount)
+
+        duration_ms = seconds * 1000
+        if self.slow_query_ms is not None and duration_ms >= self.slow_query_ms:
+            with self._lock:
+                self.slow_queries[query] = self.slow_queries.get(query, 0) + 1
+            record = {
+                "event": "slow_query",
+                "query": query,
+                "duration_ms": round(duration_ms, 3),
+                "threshold_ms": self.slow_query_ms,
+                "rows": rowcount,
+                "executemany": executemany,
+                "statement": " ".join(statement.split()),
+            }
+            slow_query_logger.warning(json.dumps(record), extra={"slow_query": record})
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is None or exception_context.statement is None:
+            return
+        started = conn.info.get("query_start_time")
+        if started:
+            started.pop()
+        query = current_query.get() or UNTAGGED
+        with self._lock:
+            self.errors[query] = self.errors.get(query, 0) + 1
+
+    @staticmethod
+    def _histogram(
+        histograms: dict[str, Histogram], query: str, buckets: tuple[float, ...]
+    ) -> Histogram:
+        histogram = histograms.get(query)
+        if histogram is None:
+            histogram = histograms[query] = Histogram(buckets)
+        return histogram
+
+    def render_prometheus(self) -> str:
+        """The collected metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        with self._lock:
+            _render_histograms(
+                lines,
+                "db_statement_duration_seconds",
+                "Time spent executing SQL statements.",
+                self.durations,
+            )
+            _render_histograms(
+                lines,
+                "db_statement_rows",
+                "Rows returned or affected by SQL statements.",
+                self.rows,
+            )
+            _render_counters(
+                lines,
+                "db_slow_statements_total",
+                "SQL statements slower than the slow-query threshold.",
+                self.slow_queries,
+            )
+            _render_counters(
+                lines,
+                "db_statement_errors_total",
+                "SQL statements that raised an error.",
+                self.errors,
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _label(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'query="{escaped}"'
+
+
+def _render_histograms(
+    lines: list[str], name: str, help_text: str, histograms: dict[str, Histogram]
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for query, histogram in sorted(histograms.items()):
+        label = _label(query)
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+        lines.append(f"{name}_sum{{{label}}} {_format_number(histogram.sum)}")
+        lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+
+def _render_counters(
+    lines: list[str], name: str, help_text: str, counters: dict[str, int]
+):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for query, count in sorted(counters.items()):
+        lines.append(f"{name}{{{_label(query)}}} {count}")
+
+
+instrumentation = QueryInstrumentation()
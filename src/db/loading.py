@@ -0,0 +1,82 @@
+"""Explicit loading profiles for model relationships.
+
+Every relationship is mapped with `lazy="raise_on_sql"`, so touching one
+that was not loaded raises instead of silently emitting a query per
+object. Queries that need related objects opt in to a profile:
+
+    stmt = apply_profile(select(Group).filter_by(name=name), GROUP_ROSTER)
+    group = (await session.execute(stmt)).scalar_one()
+
+The load_* functions of src/queries.py load each profile's graph;
+`python -m src.benchmarks.loading` checks the statements they emit.
+"""
+
+from dataclasses import dataclass
+from typing import TypeVar
+
+from sqlalchemy import Select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+
+from .models import Grade, Group, Student, Subject, Teacher
+
+SelectT = TypeVar("SelectT", bound=Select)
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """A named object graph: the loader options needed to populate it."""
+
+    name: str
+    options: tuple[ORMOption, ...]
+
+
+# Group and its students (students' own relationships stay unloaded)
+GROUP_ROSTER = LoadProfile("group_roster", (selectinload(Group.students),))
+
+# Student with their group and every grade together with the grade's subject
+STUDENT_REPORT = LoadProfile(
+    "student_report",
+    (
+        joinedload(Student.group),
+        selectinload(Student.grades).joinedload(Grade.subject),
+    ),
+)
+
+# Teacher and the subjects they teach
+TEACHER_SUBJECTS = LoadProfile("teacher_subjects", (selectinload(Teacher.subjects),))
+
+# Subject with its teacher and every grade together with the grade's student
+SUBJECT_GRADEBOOK = LoadProfile(
+    "subject_gradebook",
+    (
+        joinedload(Subject.teacher),
+        selectinload(Subject.grades).joinedload(Grade.student),
+    ),
+)
+
+# Grade with the student and subject it belongs to
+GRADE_DETAILS = LoadProfile(
+    "grade_details", (joinedload(Grade.student), joinedload(Grade.subject))
+)
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        GROUP_ROSTER,
+        STUDENT_REPORT,
+        TEACHER_SUBJECTS,
+        SUBJECT_GRADEBOOK,
+        GRADE_DETAILS,
+    )
+}
+
+
+def apply_profile(stmt: SelectT, *profiles: LoadProfile | str) -> SelectT:
+    """Add the loader options of `profiles` (objects or names) to `stmt`."""
+    options = []
+    for profile in profiles:
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        options.extend(profile.options)
+    return stmt.options(*options)
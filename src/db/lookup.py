@@ -0,0 +1,254 @@
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from sqlalchemy import URL, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .query_cache import database_url, watch_writes
+
+# Names per IN (...) query; keeps the bound parameters far below the limits
+# of asyncpg (32767) and SQLite (32766).
+LOOKUP_CHUNK_SIZE = 5_000
+
+
+@dataclass
+class DimensionStats:
+    hits: int = 0
+    # Whole-table loads, and name queries of tables over max_rows
+    loads: int = 0
+    name_queries: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _Dimension:
+    # name -> ids, in least recently used order when not complete
+    ids: OrderedDict[str, tuple[int, ...]]
+    # Whether `ids` holds the whole table, so a missing name does not exist
+    complete: bool
+    expires_at: float
+
+
+class DimensionCache:
+    """Name -> ids of the dimension tables (students, teachers, subjects,
+    groups), so queries can filter grades on student_id/subject_id instead of
+    joining a table to translate a name.
+
+    A table is loaded whole with one query on first use, unless it has more
+    than `max_rows` rows; the names of such a table are then queried one at a
+    time and kept in an LRU of `max_rows` names, and the table is not read
+    whole again until it is invalidated. Names are not unique, hence
+    a tuple of ids per name (empty for a name that does not exist). Tables
+    are dropped when written through a watched engine and reloaded at the
+    latest `ttl` seconds after their load, which bounds how long writes by
+    other processes go unseen. Concurrent loads of a table share one query.
+    Tables are kept per database URL, so one process can query several
+    databases (e.g. a benchmark next to the application's).
+
+    Usage:
+        student_ids = await dimensions.ids(session, Student.fullname, "Ann Lee")
+        stmt = select(Grade).filter(Grade.student_id.in_(student_ids))
+    """
+
+    def __init__(
+        self,
+        max_rows: int = 100_000,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = DimensionStats()
+        # Keyed by (database URL, table)
+        self._tables: dict[tuple[URL, str], _Dimension] = {}
+        self._inflight: dict[tuple[URL, str], asyncio.Future] = {}
+        # Tables found over max_rows, not worth loading whole on expiry
+        self._oversized: set[tuple[URL, str]] = set()
+        # Bumped on every invalidation; loads that raced with a write see a
+        # different version afterwards and are not stored.
+        self._versions: dict[str, int] = {}
+
+    async def ids(
+        self,
+        db: AsyncSession | AsyncConnection,
+        name: InstrumentedAttribute,
+        value: str,
+    ) -> tuple[int, ...]:
+        """Ids of the rows whose `name` column equals `value`."""
+        return (await self.ids_of(db, name, [value]))[value]
+
+    async def ids_of(
+        self,
+        db: AsyncSession | AsyncConnection,
+        name: InstrumentedAttribute,
+        values: Iterable[str],
+    ) -> dict[str, tuple[int, ...]]:
+        """Ids of the rows whose `name` column equals each of `values`. The
+        names a table over max_rows does not hold are queried
+        LOOKUP_CHUNK_SIZE at a time."""
+        key = (database_url(db), name.class_.__tablename__)
+        dimension = self._tables.get(key)
+        if dimension is None or dimension.expires_at <= self.clock():
+            dimension = await self._load(db, name, key)
+        found: dict[str, tuple[int, ...]] = {}
+        missing = []
+        for value in values:
+            ids = dimension.ids.get(value)
+            if ids is not None or dimension.complete:
+                self.stats.hits += 1
+                if not dimension.complete:
+                    dimension.ids.move_to_end(value)
+                found[value] = ids or ()
+            else:
+                missing.append(value)
+        if missing:
+            found.update(await self._query_names(db, name, dimension, missing))
+        return found
+
+    async def _load(
+        self,
+        db: AsyncSession | AsyncConnection,
+        name: InstrumentedAttribute,
+        key: tuple[URL, str],
+    ) -> _Dimension:
+        table = key[1]
+        if key in self._oversized:
+            # Forget the names looked up so far without reading the table again
+            dimension = _Dimension(OrderedDict(), False, self.clock() + self.ttl)
+            self._tables[key] = dimension
+            return dimension
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        version = self._versions.get(table, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.stats.loads += 1
+            result = await db.execute(
+                select(name, name.class_.id)
+                .order_by(name.class_.id)
+                .limit(self.max_rows + 1)
+            )
+            ids: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+            rows = 0
+            for value, id_ in result:
+                ids[value] = ids.get(value, ()) + (id_,)
+                rows += 1
+            complete = rows <= self.max_rows
+            dimension = _Dimension(
+                ids if complete else OrderedDict(),
+                complete,
+                self.clock() + self.ttl,
+            )
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(dimension)
+            if self._versions.get(table, 0) == version:
+                self._tables[key] = dimension
+                if not complete:
+                    self._oversized.add(key)
+            return dimension
+        finally:
+            del self._inflight[key]
+
+    async def _query_names(
+        self,
+        db: AsyncSession | AsyncConnection,
+        name: InstrumentedAttribute,
+        dimension: _Dimension,
+        values: list[str],
+    ) -> dict[str, tuple[int, ...]]:
+        table = name.class_.__tablename__
+        version = self._versions.get(table, 0)
+        found: dict[str, tuple[int, ...]] = dict.fromkeys(values, ())
+        unique = sorted(found)
+        for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+            self.stats.name_queries += 1
+            result = await db.execute(
+                select(name, name.class_.id)
+                .where(name.in_(unique[start : start + LOOKUP_CHUNK_SIZE]))
+                .order_by(name.class_.id)
+            )
+            for value, id_ in result:
+                found[value] += (id_,)
+        if self._versions.get(table, 0) == version:
+            dimension.ids.update(found)
+            while len(dimension.ids) > self.max_rows:
+                dimension.ids.popitem(last=False)
+                self.stats.evictions += 1
+        return found
+
+    async def refresh(
+        self, db: AsyncSession | AsyncConnection, *names: InstrumentedAttribute
+    ):
+        """Reload the tables of `names` now, e.g. after writes made elsewhere."""
+        self.invalidate(*(name.class_.__tablename__ for name in names))
+        url = database_url(db)
+        for name in names:
+            await self._load(db, name, (url, name.class_.__tablename__))
+
+    def invalidate(self, *tables: str) -> int:
+        """Drop the names of `tables`, in every database; returns how many
+        tables were dropped."""
+        for table in tables:
+            self._versions[table] = self._versions.get(table, 0) + 1
+        self._oversized = {key for key in self._oversized if key[1] not in tables}
+        stale = [key for key in self._tables if key[1] in tables]
+        for key in stale:
+            del self._tables[key]
+        self.stats.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        self._tables.clear()
+        self._oversized.clear()
+
+    def memory_bytes(self) -> dict[str, int]:
+        """Approximate bytes held per cached table, summed over the databases:
+        the map, names and ids."""
+        sizes = {}
+        for (_, table), dimension in self._tables.items():
+            size = sys.getsizeof(dimension.ids)
+            for value, ids in dimension.ids.items():
+                size += sys.getsizeof(value) + sys.getsizeof(ids)
+                size += sum(sys.getsizeof(id_) for id_ in ids)
+            sizes[table] = sizes.get(table, 0) + size
+        return sizes
+
+    def render_prometheus(self) -> str:
+        """Cached names and memory per table in the Prometheus text format."""
+        names: dict[str, int] = {}
+        for (_, table), dimension in self._tables.items():
+            names[table] = names.get(table, 0) + len(dimension.ids)
+        lines = [
+            "# HELP dimension_cache_names Names held by the dimension cache.",
+            "# TYPE dimension_cache_names gauge",
+        ]
+        for table, count in sorted(names.items()):
+            lines.append(f'dimension_cache_names{{table="{table}"}} {count}')
+        lines += [
+            "# HELP dimension_cache_bytes Approximate memory held by the dimension cache.",
+            "# TYPE dimension_cache_bytes gauge",
+        ]
+        for table, size in sorted(self.memory_bytes().items()):
+            lines.append(f'dimension_cache_bytes{{table="{table}"}} {size}')
+        return "\n".join(lines) + "\n"
+
+    def watch(self, engine: AsyncEngine):
+        """Drop a table when it is written through `engine` (see QueryCache.watch)."""
+        watch_writes(engine, self.invalidate, "dimension_cache_written")
+
+
+dimensions = DimensionCache()
@@ -4,6 +4,8 @@ from .student_model import Student
 from .teacher_model import Teacher
 from .subject_model import Subject
 from .grade_model import Grade
+from .grade_aggregate_model import GradeAggregate
+from .grade_deletion_model import GradeDeletion
 
 __all__ = [
     "MinimalBase",
@@ -14,4 +16,6 @@ __all__ = [
     "Teacher",
     "Subject",
     "Grade",
+    "GradeAggregate",
+    "GradeDeletion",
 ]
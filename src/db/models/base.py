@@ -5,6 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncAttrs
 metadata_obj = MetaData()
 
 
+# Relationships are mapped with lazy="raise_on_sql": load them explicitly
+# through the profiles in src/db/loading.py.
 class MinimalBase(AsyncAttrs, DeclarativeBase):
     __abstract__ = True
     metadata = metadata_obj
@@ -13,4 +15,4 @@ class MinimalBase(AsyncAttrs, DeclarativeBase):
 class IDOrmModel(MinimalBase):
     __abstract__ = True
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
@@ -0,0 +1,131 @@
+from typing import TYPE_CHECKING
+from sqlalchemy import (
+    BigInteger,
+    DDL,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    cast,
+    event,
+    func,
+    literal_column,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from .base import MinimalBase
+
+# Forward declarations for type hinting
+if TYPE_CHECKING:
+    from .student_model import Student
+    from .subject_model import Subject
+
+
+class GradeAggregate(MinimalBase):
+    """Running sum and count of grades per student and subject.
+
+    Maintained by statement-level triggers on `grades` (see below), so every
+    write path, including COPY, keeps it current. Averages computed from it
+    cost O(students x subjects) instead of O(grades).
+    """
+
+    __tablename__ = "grade_aggregates"
+
+    student_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("students.id", ondelete="CASCADE"), primary_key=True
+    )
+    subject_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("subjects.id", ondelete="CASCADE"), primary_key=True
+    )
+    grade_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    grade_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    student: Mapped["Student"] = relationship(lazy="raise_on_sql")
+    subject: Mapped["Subject"] = relationship(lazy="raise_on_sql")
+
+    def __repr__(self):
+        return f"<GradeAggregate(student_id={self.student_id}, subject_id={self.subject_id}, grade_sum={self.grade_sum}, grade_count={self.grade_count})>"
+
+
+def student_subject_average():
+    """A student's average grade in a subject (one aggregate row), to 2
+    decimals. Indexed below: keep the expression as it is so the planner can
+    match queries against the index."""
+    return func.round(
+        cast(GradeAggregate.grade_sum, Numeric) / GradeAggregate.grade_count,
+        # Inlined: a bound parameter would not match the index expression
+        literal_column("2", Integer),
+    )
+
+
+# Leaderboards per subject (RANK() OVER (PARTITION BY subject_id ORDER BY
+# average DESC)) read it in window order, so no sort is needed, and the
+# included sums make that an index-only scan. Also serves the lookups by
+# subject_id.
+Index(
+    "ix_grade_aggregates_subject_id_avg_grade",
+    GradeAggregate.subject_id,
+    student_subject_average().desc(),
+    GradeAggregate.student_id,
+    postgresql_include=["grade_sum", "grade_count"],
+)
+
+
+# Transition tables can only be attached to single-event triggers, hence one
+# trigger per operation sharing a function that branches on TG_OP.
+GRADE_AGGREGATES_SYNC_FUNCTION = """
+CREATE OR REPLACE FUNCTION grade_aggregates_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- Emptied rows go first: a count of 0 would divide by zero in the
+        -- average index below
+        DELETE FROM grade_aggregates AS ga
+         USING (SELECT student_id, subject_id, COUNT(*) AS grade_count
+                  FROM old_rows GROUP BY student_id, subject_id) AS d
+         WHERE ga.student_id = d.student_id AND ga.subject_id = d.subject_id
+           AND ga.grade_count <= d.grade_count;
+        UPDATE grade_aggregates AS ga
+           SET grade_sum = ga.grade_sum - d.grade_sum,
+               grade_count = ga.grade_count - d.grade_count
+          FROM (SELECT student_id, subject_id, SUM(grade) AS grade_sum, COUNT(*) AS grade_count
+                  FROM old_rows GROUP BY student_id, subject_id) AS d
+         WHERE ga.student_id = d.student_id AND ga.subject_id = d.subject_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO grade_aggregates AS ga (student_id, subject_id, grade_sum, grade_count)
+        SELECT student_id, subject_id, SUM(grade), COUNT(*)
+          FROM new_rows GROUP BY student_id, subject_id
+        ON CONFLICT (student_id, subject_id) DO UPDATE
+           SET grade_sum = ga.grade_sum + EXCLUDED.grade_sum,
+               grade_count = ga.grade_count + EXCLUDED.grade_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+GRADE_AGGREGATES_TRIGGERS = (
+    "CREATE TRIGGER grades_aggregates_insert AFTER INSERT ON grades "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION grade_aggregates_sync()",
+    "CREATE TRIGGER grades_aggregates_update AFTER UPDATE ON grades "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION grade_aggregates_sync()",
+    "CREATE TRIGGER grades_aggregates_delete AFTER DELETE ON grades "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION grade_aggregates_sync()",
+)
+
+# Keep metadata.create_all() in line with the migration. Listening on the
+# metadata runs the DDL once both tables exist.
+for ddl in (GRADE_AGGREGATES_SYNC_FUNCTION, *GRADE_AGGREGATES_TRIGGERS):
+    event.listen(
+        MinimalBase.metadata, "after_create", DDL(ddl).execute_if(dialect="postgresql")
+    )
+event.listen(
+    MinimalBase.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS grade_aggregates_sync()").execute_if(
+        dialect="postgresql"
+    ),
+)
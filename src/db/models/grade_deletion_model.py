@@ -0,0 +1,23 @@
+from sqlalchemy import BigInteger, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import MinimalBase
+
+
+class GradeDeletion(MinimalBase):
+    """Tombstone of a deleted grade, written by a trigger on `grades` (see
+    grade_model.py) on Postgres.
+
+    `version` is the id of the deleting transaction, comparable with
+    grades.version, so readers that keep a copy of the grades can fetch the
+    deletions since their watermark (src/db/changes.py).
+    """
+
+    __tablename__ = "grade_deletions"
+
+    # Leading column: deletions are read by version range
+    version: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    grade_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    def __repr__(self):
+        return f"<GradeDeletion(grade_id={self.grade_id}, version={self.version})>"
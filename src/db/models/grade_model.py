@@ -1,6 +1,20 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import Integer, ForeignKey, DateTime, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Integer,
+    ForeignKey,
+    Identity,
+    DateTime,
+    Index,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+    event,
+    func,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
 import datetime
 
 from .base import IDOrmModel
@@ -11,8 +25,59 @@ if TYPE_CHECKING:
     from .subject_model import Subject
 
 
+# The 64-bit id of the current transaction. Transactions that have not
+# committed yet all have ids at or above the xmin of a snapshot, which makes
+# it a safe watermark for change capture (src/db/changes.py).
+TRANSACTION_VERSION = "pg_current_xact_id()::text::bigint"
+
+
+class TransactionVersion(FunctionElement):
+    """Default of grades.version: the writing transaction's id on Postgres."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(TransactionVersion)
+def _transaction_version(element, compiler, **kw):
+    # No change capture off Postgres
+    return "0"
+
+
+@compiles(TransactionVersion, "postgresql")
+def _postgresql_transaction_version(element, compiler, **kw):
+    return f"({TRANSACTION_VERSION})"
+
+
 class Grade(IDOrmModel):
     __tablename__ = "grades"
+    __table_args__ = (
+        # Covers per-subject averages and rankings without touching the heap
+        Index(
+            "ix_grades_subject_id_student_id_grade", "subject_id", "student_id", "grade"
+        ),
+        # Natural key of a grade, the conflict target of ingestion upserts
+        # (src/ingest.py); also serves per-student lookups (courses attended,
+        # averages by student)
+        UniqueConstraint(
+            "student_id",
+            "subject_id",
+            "date_received",
+            name="uq_grades_student_id_subject_id_date_received",
+        ),
+        # Grade sheets of a subject ordered by date
+        Index("ix_grades_subject_id_date_received", "subject_id", "date_received"),
+        # Changes since a watermark, see src/db/changes.py
+        Index("ix_grades_version", "version"),
+        # Monthly range partitions on Postgres, see src/db/partitions.py.
+        # Unique constraints of a partitioned table must include the
+        # partition key, hence the primary key (id, date_received).
+        {"postgresql_partition_by": "RANGE (date_received)"},
+    )
+    # Ids alone stay unique (one sequence), so they identify grades in the ORM
+    __mapper_args__ = {"primary_key": ["id"]}
+
+    id: Mapped[int] = mapped_column(Integer, Identity(), primary_key=True)
 
     student_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("students.id", ondelete="CASCADE"), nullable=False
@@ -22,11 +87,86 @@ class Grade(IDOrmModel):
     )
     grade: Mapped[int] = mapped_column(Integer, nullable=False)
     date_received: Mapped[datetime.datetime] = mapped_column(
-        DateTime, default=func.now(), nullable=False  # pylint: disable=not-callable
+        DateTime,
+        default=func.now(),  # pylint: disable=not-callable
+        primary_key=True,
     )
 
-    student: Mapped["Student"] = relationship(back_populates="grades", lazy="selectin")
-    subject: Mapped["Subject"] = relationship(back_populates="grades", lazy="selectin")
+    # Id of the transaction that last wrote the row (Postgres; 0 elsewhere)
+    version: Mapped[int] = mapped_column(
+        BigInteger, server_default=TransactionVersion(), nullable=False
+    )
+
+    student: Mapped["Student"] = relationship(
+        back_populates="grades", lazy="raise_on_sql"
+    )
+    subject: Mapped["Subject"] = relationship(
+        back_populates="grades", lazy="raise_on_sql"
+    )
 
     def __repr__(self):
         return f"<Grade(id={self.id}, student_id={self.student_id}, subject_id={self.subject_id}, grade={self.grade}, date_received='{self.date_received.isoformat() if self.date_received else None}')>"
+
+
+# Rows outside the monthly partitions land here, so inserts never fail
+event.listen(
+    Grade.__table__,
+    "after_create",
+    DDL("CREATE TABLE grades_default PARTITION OF grades DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+# Updates restamp the rows they change (a row trigger defined on the
+# partitioned table is cloned to every partition); deletions leave a
+# tombstone in grade_deletions. The statement-level trigger only fires for
+# statements on grades itself, so moving rows between partitions
+# (src/db/partitions.py) logs nothing.
+GRADE_VERSION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION grades_stamp_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := {TRANSACTION_VERSION};
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+GRADE_DELETIONS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION grades_log_deletions() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO grade_deletions (grade_id, version)
+    SELECT id, {TRANSACTION_VERSION} FROM old_rows
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+GRADE_CHANGE_TRIGGERS = (
+    "CREATE TRIGGER grades_stamp_version BEFORE UPDATE ON grades "
+    "FOR EACH ROW EXECUTE FUNCTION grades_stamp_version()",
+    "CREATE TRIGGER grades_log_deletions AFTER DELETE ON grades "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION grades_log_deletions()",
+)
+
+
+@compiles(PrimaryKeyConstraint, "sqlite")
+def _sqlite_grades_primary_key(constraint, compiler, **kw):
+    # SQLite has no partitioning; a single-column key keeps grades.id the
+    # auto-assigned rowid there.
+    if constraint.table is Grade.__table__:
+        return "PRIMARY KEY (id)"
+    return compiler.visit_primary_key_constraint(constraint, **kw)
+
+
+# On the metadata, so that grade_deletions exists when the triggers are made
+for ddl in (GRADE_VERSION_FUNCTION, GRADE_DELETIONS_FUNCTION, *GRADE_CHANGE_TRIGGERS):
+    event.listen(
+        Grade.metadata, "after_create", DDL(ddl).execute_if(dialect="postgresql")
+    )
+for function in ("grades_stamp_version", "grades_log_deletions"):
+    event.listen(
+        Grade.metadata,
+        "after_drop",
+        DDL(f"DROP FUNCTION IF EXISTS {function}()").execute_if(dialect="postgresql"),
+    )
@@ -17,7 +17,7 @@ class Group(IDOrmModel):
     )
 
     students: Mapped[List["Student"]] = relationship(
-        back_populates="group", lazy="selectin"
+        back_populates="group", lazy="raise_on_sql"
     )
 
     def __repr__(self):
@@ -1,5 +1,5 @@
 from typing import List, TYPE_CHECKING
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import String, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import IDOrmModel
@@ -12,16 +12,26 @@ if TYPE_CHECKING:
 
 class Student(IDOrmModel):
     __tablename__ = "students"
+    __table_args__ = (
+        # Students of a group in name order: queries 6 and 7 and the keyset
+        # pages of src/queries.py, which seek on (fullname, id)
+        Index("ix_students_group_id_fullname_id", "group_id", "fullname", "id"),
+    )
 
     fullname: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     group_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("groups.id", ondelete="SET NULL"), nullable=True
     )
 
-    group: Mapped["Group"] = relationship(back_populates="students", lazy="selectin")
+    group: Mapped["Group"] = relationship(
+        back_populates="students", lazy="raise_on_sql"
+    )
 
     grades: Mapped[List["Grade"]] = relationship(
-        back_populates="student", lazy="selectin", cascade="all, delete-orphan"
+        back_populates="student",
+        lazy="raise_on_sql",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
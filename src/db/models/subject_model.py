@@ -20,11 +20,14 @@ class Subject(IDOrmModel):
     )
 
     teacher: Mapped["Teacher"] = relationship(
-        back_populates="subjects", lazy="selectin"
+        back_populates="subjects", lazy="raise_on_sql"
     )
 
     grades: Mapped[List["Grade"]] = relationship(
-        back_populates="subject", lazy="selectin", cascade="all, delete-orphan"
+        back_populates="subject",
+        lazy="raise_on_sql",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     def __repr__(self):
@@ -15,7 +15,7 @@ class Teacher(IDOrmModel):
     fullname: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
 
     subjects: Mapped[List["Subject"]] = relationship(
-        back_populates="teacher", lazy="selectin"
+        back_populates="teacher", lazy="raise_on_sql"
     )
 
     def __repr__(self):
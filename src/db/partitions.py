@@ -0,0 +1,153 @@
+"""Monthly range partitions of `grades` by date_received (Postgres only).
+
+`grades` is PARTITION BY RANGE (date_received) with a DEFAULT partition that
+catches rows outside the monthly partitions, so inserts never fail; rows in
+the default partition are just never pruned. `ensure_grade_partitions`
+creates the monthly partitions of a date range ahead of time. Seeding and
+ingestion call it for the dates they write; to keep future months covered,
+run it periodically (e.g. from cron):
+
+    python -m src.db.partitions --months-ahead 3
+"""
+
+import argparse
+import asyncio
+import datetime
+import re
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+DEFAULT_PARTITION = "grades_default"
+MONTHS_AHEAD = 3
+
+# Serialises concurrent ensure_grade_partitions() calls (any constant works)
+_ADVISORY_LOCK_KEY = 0x67726164  # "grad"
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"grades_{month:%Y_%m}"
+
+
+def is_grade_partition(table_name: str) -> bool:
+    return table_name == DEFAULT_PARTITION or bool(
+        re.fullmatch(r"grades_\d{4}_\d{2}", table_name)
+    )
+
+
+async def grade_partitions(conn: AsyncConnection) -> set[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'grades'::regclass"
+        )
+    )
+    return set(result.scalars())
+
+
+async def _create_partition(
+    conn: AsyncConnection, name: str, lower: datetime.date, upper: datetime.date
+):
+    # Postgres refuses to create a partition for rows already sitting in the
+    # default partition. Building the partition as a plain table, moving the
+    # rows over and attaching it handles that, and ATTACH only takes a SHARE
+    # UPDATE EXCLUSIVE lock on grades where CREATE ... PARTITION OF needs an
+    # ACCESS EXCLUSIVE one. The statements target partitions directly, so the
+    # statement triggers of grades (grade_aggregates) do not fire: the rows
+    # are only moved.
+    bounds = {"lower": lower, "upper": upper}
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE grades INCLUDING DEFAULTS)"))
+    await conn.execute(
+        text(
+            f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds "
+            f"CHECK (date_received >= '{lower}' AND date_received < '{upper}')"
+        )
+    )
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE date_received >= :lower AND date_received < :upper "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    # The CHECK constraint lets ATTACH skip validating the moved rows
+    await conn.execute(
+        text(
+            f"ALTER TABLE grades ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+    await conn.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+
+
+async def ensure_grade_partitions(
+    conn: AsyncConnection, start: datetime.date, end: datetime.date
+) -> list[str]:
+    """Create the missing monthly partitions from the month of `start` to the
+    month of `end`, inclusive; returns their names. A no-op off Postgres."""
+    months = []
+    month, last = month_start(start), month_start(end)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return await ensure_month_partitions(conn, months)
+
+
+async def ensure_month_partitions(
+    conn: AsyncConnection, dates: Iterable[datetime.date]
+) -> list[str]:
+    """Create the missing monthly partitions of the months `dates` fall in,
+    and only those: dates years apart do not fill in the months between.
+    Returns their names. A no-op off Postgres."""
+    if conn.dialect.name != "postgresql":
+        return []
+    months = sorted({month_start(date) for date in dates})
+    if not months:
+        return []
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+    )
+    existing = await grade_partitions(conn)
+    created = []
+    for month in months:
+        name = partition_name(month)
+        if name not in existing:
+            await _create_partition(conn, name, month, add_months(month, 1))
+            created.append(name)
+    return created
+
+
+async def main(months_ahead: int):
+    from src.db.session import get_engine
+
+    engine = get_engine()
+    today = datetime.date.today()
+    try:
+        async with engine.begin() as conn:
+            created = await ensure_grade_partitions(
+                conn, today, add_months(month_start(today), months_ahead)
+            )
+    finally:
+        await engine.dispose()
+    print(f"Created {len(created)} grade partitions: {', '.join(created) or '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Create the monthly grades partitions up to N months ahead."
+    )
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    args = parser.parse_args()
+    asyncio.run(main(args.months_ahead))
@@ -0,0 +1,233 @@
+import asyncio
+import functools
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from sqlalchemy import URL, Engine, event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+# Tables whose contents are derived from another table by database triggers:
+# a write to the key also changes every table in the value.
+DERIVED_TABLES = {"grades": ("grade_aggregates",)}
+
+# (info_key, invalidate) of every watch_writes() call, per watched engine
+_Watcher = tuple[str, Callable[..., Any]]
+_watchers: weakref.WeakKeyDictionary[Engine, list[_Watcher]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def database_url(db: AsyncSession | AsyncConnection) -> URL:
+    """URL of the database `db` reads, part of the cache keys so that one
+    process can query several databases. Sessions on replicas name their
+    primary in `info["database_url"]`: they read the same data."""
+    if isinstance(db, AsyncConnection):
+        return db.sync_engine.url
+    return db.info.get("database_url") or db.get_bind().engine.url
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # Misses that awaited an identical in-flight load instead of querying
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    tables: frozenset[str] = field(default_factory=frozenset)
+
+
+class QueryCache:
+    """LRU cache with a TTL for the results of read-only query functions.
+
+    Concurrent misses on the same key share a single load (single-flight).
+    Entries are tagged with the tables they were read from and dropped when
+    any of those tables is written through a watched engine.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        # Bumped on every invalidation of a table; loads that raced with a
+        # write see a different version afterwards and are not stored.
+        self._versions: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        tables: Iterable[str] = (),
+        ttl: float | None = None,
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry.value
+            del self._entries[key]
+            self.stats.expirations += 1
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.stats.misses += 1
+        tables = frozenset(tables)
+        versions = {table: self._versions.get(table, 0) for table in tables}
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if all(self._versions.get(t, 0) == v for t, v in versions.items()):
+                self._store(key, value, tables, self.ttl if ttl is None else ttl)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key, value, tables, ttl):
+        self._entries[key] = _Entry(value, self.clock() + ttl, tables)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, *tables: str) -> int:
+        """Drop every entry read from any of `tables`; returns how many were dropped."""
+        affected = set(tables)
+        for table in tables:
+            affected.update(DERIVED_TABLES.get(table, ()))
+        for table in affected:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+        stale = [key for key, entry in self._entries.items() if entry.tables & affected]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def cached(self, *models, ttl: float | None = None):
+        """Decorate `async def func(session, *args)` to cache its result.
+
+        The key is the function, the database URL of the session and every
+        other argument, so arguments must be hashable. `models` are the ORM classes the query
+        reads; writes to their tables invalidate the cached results.
+        """
+        tables = frozenset(model.__tablename__ for model in models)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(session, *args, **kwargs):
+                key = (
+                    func.__qualname__,
+                    database_url(session),
+                    args,
+                    tuple(sorted(kwargs.items())),
+                )
+                return await self.get_or_load(
+                    key, lambda: func(session, *args, **kwargs), tables, ttl
+                )
+
+            wrapper.uncached = func
+            return wrapper
+
+        return decorator
+
+    def watch(self, engine: AsyncEngine):
+        """Invalidate on INSERT/UPDATE/DELETE executed through `engine`.
+
+        Covers ORM flushes, ORM bulk statements and Core DML. Entries are
+        dropped when the statement runs and again when its transaction
+        commits or rolls back, so reads racing with the write cannot
+        re-cache old data nor keep rows that were rolled back.
+        Writes that bypass SQLAlchemy (COPY) call `record_write()`.
+        """
+        watch_writes(engine, self.invalidate, "query_cache_written")
+
+
+def watch_writes(engine: AsyncEngine, invalidate: Callable[..., Any], info_key: str):
+    """Call `invalidate(table)` for each INSERT/UPDATE/DELETE executed through
+    `engine`, and `invalidate(*tables)` again when the transaction commits or
+    rolls back: reads on the writing connection see its uncommitted rows, so
+    what they cached is stale either way. `info_key` is where the written
+    tables are kept in the connection info."""
+    sync_engine = engine.sync_engine
+    _watchers.setdefault(sync_engine, []).append((info_key, invalidate))
+
+    @event.listens_for(sync_engine, "after_execute")
+    def _after_execute(conn, clauseelement, multiparams, params, options, result):
+        if getattr(clauseelement, "is_dml", False):
+            table = clauseelement.table.name
+            conn.info.setdefault(info_key, set()).add(table)
+            invalidate(table)
+
+    @event.listens_for(sync_engine, "commit")
+    def _commit(conn):
+        written = conn.info.pop(info_key, None)
+        if written:
+            invalidate(*written)
+
+    @event.listens_for(sync_engine, "rollback")
+    def _rollback(conn):
+        written = conn.info.pop(info_key, None)
+        if written:
+            invalidate(*written)
+
+    @event.listens_for(sync_engine, "rollback_savepoint")
+    def _rollback_savepoint(conn, name, context):
+        # The tables stay in the info: the outer transaction may have
+        # written them too and invalidates them again when it ends.
+        written = conn.info.get(info_key)
+        if written:
+            invalidate(*written)
+
+
+def record_write(conn: AsyncConnection, *tables: str):
+    """Report `tables` as written on `conn` by something the engine events
+    do not see, such as asyncpg's COPY: every cache watching the engine
+    drops them now and again when the transaction ends."""
+    sync_conn = conn.sync_connection
+    for info_key, invalidate in _watchers.get(sync_conn.engine, ()):
+        sync_conn.info.setdefault(info_key, set()).update(tables)
+        invalidate(*tables)
+
+
+query_cache = QueryCache()
@@ -0,0 +1,286 @@
+"""Routing of read-only work to replica databases.
+
+Reports and the demo queries read through `read_session()` (see
+src/db/session.py), which runs each session on one of the replica engines
+configured with DATABASE_REPLICA_URLS. Writes (seeding, ingestion, partition
+maintenance) keep using `get_engine()` and `get_session_factory()`, i.e. the
+primary. Without replicas, or when none can be reached, reads go to the
+primary as well.
+
+A replica is picked per session, by `strategy`:
+
+- "least_busy" (default): the replica with the fewest connections handed
+  out by this pool, ties taken in turn;
+- "round_robin": each replica in turn.
+
+A session takes its connection when it runs its first statement, so a
+session whose reads are all answered by the query cache holds none and does
+not count as busy. Health is checked when a connection is taken: a replica
+that cannot be
+connected to (pool_pre_ping also catches connections that died in the
+pool) is skipped for `retry_after` seconds, after which the next session
+tries it again. `check()` pings every replica at once, e.g. from a readiness
+probe:
+
+    python -m src.db.routing
+
+Replicas apply the primary's changes asynchronously, so a read that
+follows a write may not see it yet; read from `get_session_factory()` when
+that matters.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Connection, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.util import greenlet_spawn
+from sqlalchemy.util.concurrency import in_greenlet
+
+STRATEGIES = ("least_busy", "round_robin")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplicaStats:
+    # Connections handed out and failed attempts to connect
+    connections: int = 0
+    failures: int = 0
+    # Connections handed out and not returned yet
+    in_use: int = 0
+    # time.monotonic() until which the replica is skipped
+    down_until: float = 0.0
+
+
+def _label(engine: AsyncEngine) -> str:
+    return engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaPool:
+    """Hands out connections and sessions on replicas, falling back to the
+    primary.
+
+    Usage:
+        replicas = ReplicaPool(engine, [replica_engine], strategy="round_robin")
+        async with replicas.session(AsyncSessionFactory) as session:
+            await select_1_top_students(session)
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Sequence[AsyncEngine] = (),
+        *,
+        strategy: str = "least_busy",
+        retry_after: float = 30.0,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Replica strategy must be one of {', '.join(STRATEGIES)}, "
+                f"not {strategy!r}"
+            )
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self.stats = {replica: ReplicaStats() for replica in self.replicas}
+        # Connections given to the primary although replicas are configured
+        self.fallbacks = 0
+        self._next = 0
+
+    def _candidates(self) -> list[AsyncEngine]:
+        """The replicas not marked down, in the order to try them."""
+        count = len(self.replicas)
+        if not count:
+            return []
+        start, self._next = self._next, (self._next + 1) % count
+        now = time.monotonic()
+        candidates = [
+            replica
+            for replica in self.replicas[start:] + self.replicas[:start]
+            if self.stats[replica].down_until <= now
+        ]
+        if self.strategy == "least_busy":
+            # Stable sort: equally busy replicas keep their turn
+            candidates.sort(key=lambda replica: self.stats[replica].in_use)
+        return candidates
+
+    def _mark_down(self, replica: AsyncEngine, error: Exception):
+        stats = self.stats[replica]
+        stats.failures += 1
+        stats.down_until = time.monotonic() + self.retry_after
+        logger.warning(
+            "Replica %s is unavailable, skipping it for %.0f s: %s",
+            _label(replica),
+            self.retry_after,
+            error,
+        )
+
+    def _checkout(self) -> tuple[AsyncEngine, Connection]:
+        """A connection to a replica, or to the primary if none is
+        reachable, and its engine. Uses the sync API: runs in a greenlet."""
+        for replica in self._candidates():
+            stats = self.stats[replica]
+            try:
+                conn = replica.sync_engine.connect()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # Refused, timed out, authentication...: try the next one
+                self._mark_down(replica, error)
+                continue
+            stats.connections += 1
+            stats.in_use += 1
+            return replica, conn
+        if self.replicas:
+            self.fallbacks += 1
+        return self.primary, self.primary.sync_engine.connect()
+
+    def _checkin(self, engine: AsyncEngine):
+        if engine in self.stats:
+            self.stats[engine].in_use -= 1
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[AsyncConnection]:
+        """A connection to a replica, or to the primary if none is
+        reachable; used like `engine.connect()`."""
+        engine, sync_conn = await greenlet_spawn(self._checkout)
+        conn = AsyncConnection(engine, sync_conn)
+        try:
+            yield conn
+        finally:
+            self._checkin(engine)
+            await conn.close()
+
+    @asynccontextmanager
+    async def session(
+        self, factory: async_sessionmaker[AsyncSession]
+    ) -> AsyncIterator[AsyncSession]:
+        """A session of `factory` that takes a connection as `connect()`
+        does when it runs its first statement. Its cache entries are those
+        of the primary (see query_cache.database_url)."""
+        session = factory(
+            sync_session_class=_ReplicaSession,
+            replicas=self,
+            info={"database_url": self.primary.url},
+        )
+        try:
+            async with session:
+                yield session
+        finally:
+            await session.run_sync(_ReplicaSession.release)
+
+    async def check(self) -> dict[str, bool]:
+        """Ping every replica now; returns which ones answered. Replicas that
+        do not are marked down, those that do are used again at once."""
+
+        async def ping(replica: AsyncEngine) -> bool:
+            try:
+                async with replica.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                self._mark_down(replica, error)
+                return False
+            self.stats[replica].down_until = 0.0
+            return True
+
+        healthy = await asyncio.gather(*map(ping, self.replicas))
+        return {_label(replica): up for replica, up in zip(self.replicas, healthy)}
+
+    async def dispose(self):
+        """Close the pooled connections of the replicas (not the primary)."""
+        for replica in self.replicas:
+            await replica.dispose()
+
+    def render_prometheus(self) -> str:
+        """Connections and failures per replica in the Prometheus text format."""
+        now = time.monotonic()
+        metrics = (
+            (
+                "db_replica_connections_total",
+                "counter",
+                "Connections handed out by each replica.",
+                lambda stats: stats.connections,
+            ),
+            (
+                "db_replica_connect_failures_total",
+                "counter",
+                "Failed attempts to connect to each replica.",
+                lambda stats: stats.failures,
+            ),
+            (
+                "db_replica_up",
+                "gauge",
+                "1 unless the replica is skipped after a failure.",
+                lambda stats: int(stats.down_until <= now),
+            ),
+        )
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for replica, stats in self.stats.items():
+                lines.append(f'{name}{{replica="{_label(replica)}"}} {value(stats)}')
+        lines += [
+            "# HELP db_replica_fallbacks_total Reads sent to the primary for lack of a reachable replica.",
+            "# TYPE db_replica_fallbacks_total counter",
+            f"db_replica_fallbacks_total {self.fallbacks}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class _ReplicaSession(Session):
+    """Session of ReplicaPool.session(): takes its connection from the pool
+    on its first statement, and gives it back on release()."""
+
+    def __init__(self, *args, replicas: ReplicaPool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self._checked_out: tuple[AsyncEngine, Connection] | None = None
+
+    def get_bind(self, mapper=None, **kwargs):
+        if self._checked_out is None:
+            if not in_greenlet():
+                # Asked outside a statement, e.g. for the dialect: the
+                # primary's is that of the replicas
+                return super().get_bind(mapper, **kwargs)
+            self._checked_out = self.replicas._checkout()
+        return self._checked_out[1]
+
+    def release(self):
+        """Close the connection, once the session is closed."""
+        if self._checked_out is not None:
+            engine, conn = self._checked_out
+            self._checked_out = None
+            self.replicas._checkin(engine)
+            conn.close()
+
+
+async def main():
+    from src.db.session import dispose_engines, get_replicas
+
+    replicas = get_replicas()
+    try:
+        if not replicas.replicas:
+            print("No replicas configured (DATABASE_REPLICA_URLS).")
+            return True
+        health = await replicas.check()
+    finally:
+        await dispose_engines()
+    for replica, up in health.items():
+        print(f"{replica}: {'up' if up else 'DOWN'}")
+    return all(health.values())
+
+
+if __name__ == "__main__":
+    if not asyncio.run(main()):
+        sys.exit(1)
@@ -0,0 +1,156 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+from sqlalchemy.engine import make_url
+
+
+def _bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _optional_int(value: str) -> Optional[int]:
+    return int(value) if value.strip() else None
+
+
+def _optional_float(value: str) -> Optional[float]:
+    return float(value) if value.strip() else None
+
+
+def _urls(value: str) -> tuple[str, ...]:
+    return tuple(url.strip() for url in value.split(",") if url.strip())
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """Engine configuration, read from environment variables by `from_env()`."""
+
+    url: str
+    # Read-only copies of the database for read_session() (src/db/routing.py),
+    # the replica picked per session and seconds a failed replica is skipped
+    replica_urls: tuple[str, ...] = ()
+    replica_strategy: str = "least_busy"
+    replica_retry_seconds: float = 30.0
+    # Logging: echo prints every statement, log_level applies to sqlalchemy.engine
+    echo: bool = False
+    log_level: str = "WARNING"
+    # Connection pool
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    # asyncpg's own per-connection cache of prepared statements
+    statement_cache_size: int = 100
+    # SQLAlchemy's asyncpg dialect cache of prepared statements per connection
+    prepared_statement_cache_size: int = 100
+    # Client-side timeouts of a single command and of connecting, seconds
+    command_timeout: Optional[float] = None
+    connect_timeout: Optional[float] = None
+    # Server-side timeouts, milliseconds (Postgres statement_timeout and
+    # idle_in_transaction_session_timeout)
+    statement_timeout_ms: Optional[int] = None
+    idle_in_transaction_timeout_ms: Optional[int] = None
+    # In-process result cache of the query layer (src/db/query_cache.py)
+    query_cache_size: int = 1024
+    query_cache_ttl: float = 60.0
+    # Name -> id maps of the dimension tables (src/db/lookup.py): rows per
+    # table held in memory and seconds before a table is reloaded
+    dimension_cache_rows: int = 100_000
+    dimension_cache_ttl: float = 300.0
+    # Statement timing/row histograms and the slow-query log
+    # (src/db/instrumentation.py); None disables the slow-query log
+    instrumentation: bool = True
+    slow_query_ms: Optional[float] = 500.0
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "DatabaseSettings":
+        kwargs = {"url": environ.get("DATABASE_URL")}
+        for name, (attribute, parse) in ENVIRONMENT.items():
+            if name in environ:
+                kwargs[attribute] = parse(environ[name])
+        return cls(**kwargs)
+
+    @property
+    def is_asyncpg(self) -> bool:
+        return _is_asyncpg(self.url)
+
+    def engine_kwargs(self, url: Optional[str] = None) -> dict:
+        """Keyword arguments for `create_async_engine(url, ...)`, by default
+        for `settings.url`; replicas share the settings of the primary."""
+        kwargs = {"echo": self.echo, "pool_pre_ping": self.pool_pre_ping}
+
+        url = make_url(url or self.url)
+        # In-memory SQLite runs on a single static connection without a pool
+        if not (
+            url.get_backend_name() == "sqlite"
+            and url.database in (None, "", ":memory:")
+        ):
+            kwargs.update(
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_timeout=self.pool_timeout,
+                pool_recycle=self.pool_recycle,
+            )
+
+        if _is_asyncpg(url):
+            server_settings = {}
+            if self.statement_timeout_ms is not None:
+                server_settings["statement_timeout"] = str(self.statement_timeout_ms)
+            if self.idle_in_transaction_timeout_ms is not None:
+                server_settings["idle_in_transaction_session_timeout"] = str(
+                    self.idle_in_transaction_timeout_ms
+                )
+            kwargs["connect_args"] = {
+                "statement_cache_size": self.statement_cache_size,
+                "prepared_statement_cache_size": self.prepared_statement_cache_size,
+                "command_timeout": self.command_timeout,
+                "server_settings": server_settings,
+            }
+            if self.connect_timeout is not None:
+                # asyncpg waits 60 s by default
+                kwargs["connect_args"]["timeout"] = self.connect_timeout
+        return kwargs
+
+    def configure_logging(self):
+        logging.getLogger("sqlalchemy.engine").setLevel(self.log_level.upper())
+        if not logging.getLogger().handlers:
+            logging.basicConfig(
+                format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
+            )
+
+
+def _is_asyncpg(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "postgresql" and url.get_driver_name() == "asyncpg"
+
+
+# Environment variable -> (DatabaseSettings field, parser)
+ENVIRONMENT = {
+    "DATABASE_REPLICA_URLS": ("replica_urls", _urls),
+    "DB_REPLICA_STRATEGY": ("replica_strategy", str),
+    "DB_REPLICA_RETRY_SECONDS": ("replica_retry_seconds", float),
+    "DB_ECHO": ("echo", _bool),
+    "DB_LOG_LEVEL": ("log_level", str),
+    "DB_POOL_SIZE": ("pool_size", int),
+    "DB_MAX_OVERFLOW": ("max_overflow", int),
+    "DB_POOL_TIMEOUT": ("pool_timeout", float),
+    "DB_POOL_RECYCLE": ("pool_recycle", int),
+    "DB_POOL_PRE_PING": ("pool_pre_ping", _bool),
+    "DB_STATEMENT_CACHE_SIZE": ("statement_cache_size", int),
+    "DB_PREPARED_STATEMENT_CACHE_SIZE": ("prepared_statement_cache_size", int),
+    "DB_COMMAND_TIMEOUT": ("command_timeout", _optional_float),
+    "DB_CONNECT_TIMEOUT": ("connect_timeout", _optional_float),
+    "DB_STATEMENT_TIMEOUT_MS": ("statement_timeout_ms", _optional_int),
+    "DB_IDLE_IN_TRANSACTION_TIMEOUT_MS": (
+        "idle_in_transaction_timeout_ms",
+        _optional_int,
+    ),
+    "QUERY_CACHE_SIZE": ("query_cache_size", int),
+    "QUERY_CACHE_TTL": ("query_cache_ttl", float),
+    "DIMENSION_CACHE_ROWS": ("dimension_cache_rows", int),
+    "DIMENSION_CACHE_TTL": ("dimension_cache_ttl", float),
+    "DB_INSTRUMENTATION": ("instrumentation", _bool),
+    "DB_SLOW_QUERY_MS": ("slow_query_ms", _optional_float),
+}
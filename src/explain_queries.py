@@ -0,0 +1,113 @@
+"""EXPLAIN every demo query and fail if any plan scans `grades` sequentially.
+
+Each query function is run once against the current database, bypassing the
+query cache, while its SQL is captured. Then the captured statements are
+explained with sequential scans disabled: on small seeded databases Postgres
+picks a seq scan anyway, so what is checked is that an index path *exists*
+for every query. A remaining `Seq Scan on grades` means no index can serve
+the query, and a query that emitted no statement fails as well.
+
+    python -m src.explain_queries
+"""
+
+import asyncio
+import json
+import sys
+
+from sqlalchemy import event, text
+
+from src.db.partitions import is_grade_partition
+from src.db.session import get_engine, get_session_factory
+from src.my_select import build_query_runs
+from src.queries import fetch_example_row
+
+CHECKED_RELATION = "grades"
+SEQ_SCAN_NODES = {"Seq Scan", "Parallel Seq Scan"}
+
+
+def seq_scans(plan: dict, relation: str = CHECKED_RELATION) -> list[dict]:
+    """Return every sequential scan node on `relation` in a JSON plan tree.
+
+    Scans of a partition of grades count as scans of grades.
+    """
+    found = []
+    scanned = plan.get("Relation Name")
+    if relation == "grades" and scanned and is_grade_partition(scanned):
+        scanned = relation
+    if plan.get("Node Type") in SEQ_SCAN_NODES and scanned == relation:
+        found.append(plan)
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child, relation))
+    return found
+
+
+async def explain_query(session, fetch, args, kwargs) -> list[dict]:
+    """Run `fetch` once and return the JSON plans of the statements it emitted.
+
+    `fetch` must bypass the query cache: a cached answer emits nothing.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    sync_engine = get_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    try:
+        await fetch(session, *args, **kwargs)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    conn = await session.connection()
+    for statement, parameters in captured:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plans.append(plan[0]["Plan"])
+    return plans
+
+
+async def main() -> int:
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        print("EXPLAIN checks need PostgreSQL.")
+        return 2
+
+    failures = 0
+    session_factory = get_session_factory()
+    async with session_factory() as session:
+        examples = (await fetch_example_row.uncached(session))._asdict()
+        if not all(examples.values()):
+            print("The database is empty, seed it first.")
+            return 2
+
+        # Transaction-scoped, the session's transaction is already open
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        runs = build_query_runs(examples)
+        for run in runs:
+            fetch = getattr(run.fetch, "uncached", run.fetch)
+            plans = await explain_query(session, fetch, run.args, run.kwargs)
+            scans = [scan for plan in plans for scan in seq_scans(plan)]
+            if not plans:
+                failures += 1
+                print(f"FAIL {fetch.__name__}: no statement was captured")
+            elif scans:
+                failures += 1
+                print(f"FAIL {fetch.__name__}: sequential scan on '{CHECKED_RELATION}'")
+            else:
+                print(f"ok   {fetch.__name__}")
+
+    await engine.dispose()
+    print(
+        f"\n{failures} of {len(runs)} queries scan '{CHECKED_RELATION}' "
+        "sequentially or emitted no statement."
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
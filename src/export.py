@@ -0,0 +1,281 @@
+"""Export grades joined with students, groups and subjects for offline analytics.
+
+The join is streamed through a server-side cursor in chunks of
+`--chunk-size` rows and each chunk is appended to the output file before the
+next one is fetched, so memory stays constant whatever the size of the
+export. Grades of students without a group are exported too, with a null
+group. Parquet needs the optional pyarrow dependency
+(`poetry install --extras parquet`); without it the export is written as CSV.
+
+    python -m src.export --output grades.parquet --group AttorneyIdea-61 \\
+        --date-from 2025-01-01 --date-to 2026-01-01
+"""
+
+import argparse
+import asyncio
+import csv
+import datetime
+import importlib.util
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.db.instrumentation import tag_query
+from src.db.models import Grade, Group, Student, Subject
+from src.db.routing import ReplicaPool
+from src.db.session import dispose_engines, get_replicas
+
+# Optional, see the module docstring. Importing it takes longer than the rest
+# of the export, so only ParquetExportWriter does.
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+EXPORT_COLUMNS = (
+    "grade_id",
+    "student_id",
+    "student",
+    "group",
+    "subject",
+    "grade",
+    "date_received",
+)
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    """Empty name filters match everything; dates are [date_from, date_to)."""
+
+    groups: tuple[str, ...] = ()
+    subjects: tuple[str, ...] = ()
+    date_from: Optional[datetime.date] = None
+    date_to: Optional[datetime.date] = None
+
+
+@dataclass
+class ExportStats:
+    path: Path
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self):
+        return (
+            f"Exported {self.rows:,} rows to '{self.path}' "
+            f"({self.bytes / 1_000_000:,.1f} MB) in {self.seconds:.2f}s "
+            f"({self.rows_per_second:,.0f} rows/sec)."
+        )
+
+
+def grades_export_stmt(filters: ExportFilters) -> Select:
+    stmt = (
+        select(
+            Grade.id.label("grade_id"),
+            Student.id.label("student_id"),
+            Student.fullname.label("student"),
+            Group.name.label("group"),
+            Subject.name.label("subject"),
+            Grade.grade,
+            Grade.date_received,
+        )
+        .select_from(Grade)
+        .join(Student)
+        # Students without a group are exported with a null group
+        .outerjoin(Group)
+        .join(Subject)
+    )
+    if filters.groups:
+        stmt = stmt.filter(Group.name.in_(filters.groups))
+    if filters.subjects:
+        stmt = stmt.filter(Subject.name.in_(filters.subjects))
+    if filters.date_from is not None:
+        stmt = stmt.filter(Grade.date_received >= filters.date_from)
+    if filters.date_to is not None:
+        stmt = stmt.filter(Grade.date_received < filters.date_to)
+    return stmt
+
+
+class CsvExportWriter:
+    suffix = ".csv"
+
+    def __init__(self, path: Path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, rows: Sequence[tuple]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExportWriter:
+    """Appends every chunk as a row group of a single Parquet file."""
+
+    suffix = ".parquet"
+
+    def __init__(self, path: Path):
+        import pyarrow
+        import pyarrow.parquet
+
+        self.schema = pyarrow.schema(
+            [
+                ("grade_id", pyarrow.int64()),
+                ("student_id", pyarrow.int64()),
+                ("student", pyarrow.string()),
+                ("group", pyarrow.string()),
+                ("subject", pyarrow.string()),
+                ("grade", pyarrow.int16()),
+                ("date_received", pyarrow.timestamp("us")),
+            ]
+        )
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression="zstd"
+        )
+
+    def write(self, rows: Sequence[tuple]):
+        import pyarrow
+
+        columns = zip(*rows)
+        table = pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(column, type=field.type)
+                for column, field in zip(columns, self.schema)
+            ],
+            schema=self.schema,
+        )
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"csv": CsvExportWriter, "parquet": ParquetExportWriter}
+
+
+def resolve_format(path: Path, requested: str) -> str:
+    """'auto' picks the format from the file suffix, Parquet by default, and
+    falls back to CSV when pyarrow is not installed."""
+    if requested != "auto":
+        return requested
+    if path.suffix == CsvExportWriter.suffix:
+        return "csv"
+    return "parquet" if HAS_PYARROW else "csv"
+
+
+@tag_query
+async def stream_grade_rows(
+    engine: AsyncEngine | ReplicaPool, filters: ExportFilters, chunk_size: int
+):
+    """Yield the export rows in chunks of at most `chunk_size` rows, read
+    through `engine` or from one of the `replicas`."""
+    stmt = grades_export_stmt(filters).execution_options(yield_per=chunk_size)
+    async with engine.connect() as conn:
+        result = await conn.stream(stmt)
+        async for chunk in result.tuples().partitions():
+            yield chunk
+
+
+async def export_grades(
+    engine: AsyncEngine | ReplicaPool,
+    path: Path,
+    fmt: str = "auto",
+    filters: ExportFilters = ExportFilters(),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ExportStats:
+    fmt = resolve_format(path, fmt)
+    if fmt == "parquet" and not HAS_PYARROW:
+        raise RuntimeError(
+            "Parquet export needs pyarrow: poetry install --extras parquet"
+        )
+
+    started = time.perf_counter()
+    rows = 0
+    writer = WRITERS[fmt](path)
+    try:
+        async for chunk in stream_grade_rows(engine, filters, chunk_size):
+            writer.write(chunk)
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return ExportStats(path, rows, os.path.getsize(path), time.perf_counter() - started)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export grades with student, group and subject names."
+    )
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument(
+        "--format",
+        choices=("auto", "parquet", "csv"),
+        default="auto",
+        help="'auto' uses the --output suffix; Parquet unless it is .csv.",
+    )
+    parser.add_argument(
+        "--group",
+        action="append",
+        default=[],
+        help="Only this group; repeat for several.",
+    )
+    parser.add_argument(
+        "--subject",
+        action="append",
+        default=[],
+        help="Only this subject; repeat for several.",
+    )
+    parser.add_argument(
+        "--date-from",
+        type=datetime.date.fromisoformat,
+        help="First day included (YYYY-MM-DD).",
+    )
+    parser.add_argument(
+        "--date-to",
+        type=datetime.date.fromisoformat,
+        help="First day no longer included (YYYY-MM-DD).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows fetched from the server and written at a time.",
+    )
+    args = parser.parse_args()
+    if args.format == "parquet" and not HAS_PYARROW:
+        parser.error("--format parquet needs pyarrow: poetry install --extras parquet")
+    return args
+
+
+async def main(args: argparse.Namespace):
+    fmt = resolve_format(args.output, args.format)
+    output = args.output
+    if args.format == "auto" and fmt == "csv" and output.suffix != ".csv":
+        output = output.with_suffix(CsvExportWriter.suffix)
+        print(f"pyarrow is not installed, exporting CSV to '{output}'.")
+    filters = ExportFilters(
+        groups=tuple(args.group),
+        subjects=tuple(args.subject),
+        date_from=args.date_from,
+        date_to=args.date_to,
+    )
+    try:
+        stats = await export_grades(
+            get_replicas(), output, fmt, filters, args.chunk_size
+        )
+    finally:
+        await dispose_engines()
+    print(stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
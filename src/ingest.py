@@ -0,0 +1,444 @@
+"""Bulk ingestion of grade batches that reference students and subjects by name.
+
+Records are validated, their names resolved to ids in bulk through cached
+lookups (src/db/lookup.py) and written per batch with one
+INSERT ... ON CONFLICT statement on the natural key of a grade
+(student_id, subject_id, date_received): a grade delivered again replaces
+the stored one. Every batch runs in its own transaction and reports its own
+stats, rejected records included.
+
+    python -m src.ingest exam_grades.csv --batch-size 10000 --rejects rejected.csv
+
+The CSV needs the columns student_fullname, subject_name, grade and
+date_received (ISO 8601, UTC unless it has an offset).
+"""
+
+import argparse
+import asyncio
+import csv
+import datetime
+import itertools
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+)
+
+from sqlalchemy import (
+    ARRAY,
+    DateTime,
+    Integer,
+    and_,
+    bindparam,
+    func,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.db.aggregates import rebuild_grade_aggregates
+from src.db.instrumentation import tag_query
+from src.db.lookup import DimensionCache, dimensions
+from src.db.models import Grade, Student, Subject
+from src.db.partitions import ensure_month_partitions
+from src.db.query_cache import record_write
+from src.db.session import get_engine
+
+NATURAL_KEY = "uq_grades_student_id_subject_id_date_received"
+GRADE_COLUMNS = ("student_id", "subject_id", "grade", "date_received")
+
+
+class GradeRecord(NamedTuple):
+    student_fullname: str
+    subject_name: str
+    grade: int
+    # Naive datetimes are taken as UTC
+    date_received: datetime.datetime
+
+
+class RejectedRecord(NamedTuple):
+    record: GradeRecord
+    reason: str
+
+
+@dataclass(frozen=True)
+class IngestConfig:
+    batch_size: int = 10_000
+    grade_min: int = 0
+    grade_max: int = 100
+    # Grades dated further ahead than this are rejected (clock skew of the feed)
+    max_future: datetime.timedelta = datetime.timedelta(minutes=5)
+    # Grades dated more than this before now are rejected, unless
+    # `earliest_date` (naive UTC) is set; it is the bound then, e.g. to load
+    # an archive
+    max_age: datetime.timedelta = datetime.timedelta(days=10 * 365)
+    earliest_date: Optional[datetime.datetime] = None
+
+
+@dataclass
+class BatchStats:
+    """Outcome of one batch: received = written + unchanged + duplicates + rejected."""
+
+    batch: int
+    received: int
+    # Inserted or updated rows
+    written: int
+    # Already stored with the same grade
+    unchanged: int
+    # Superseded by a later record with the same key in the batch
+    duplicates: int
+    rejected: list[RejectedRecord] = field(default_factory=list)
+    # New rows among `written`; None where the database cannot tell
+    inserted: Optional[int] = None
+    seconds: float = 0.0
+
+    @property
+    def updated(self) -> Optional[int]:
+        return None if self.inserted is None else self.written - self.inserted
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.received / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self):
+        split = (
+            f" ({self.inserted:,} new, {self.updated:,} updated)"
+            if self.inserted is not None
+            else ""
+        )
+        return (
+            f"Batch {self.batch}: {self.received:,} records, {self.written:,} written"
+            f"{split}, {self.unchanged:,} unchanged, {self.duplicates:,} duplicates, "
+            f"{len(self.rejected):,} rejected in {self.seconds:.2f}s "
+            f"({self.rows_per_second:,.0f} records/sec)."
+        )
+
+
+def naive_utc(date: datetime.datetime) -> datetime.datetime:
+    """`date` as a naive UTC datetime; naive datetimes are taken as UTC."""
+    if date.tzinfo is None:
+        return date
+    return date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def validate(
+    record: GradeRecord, config: IngestConfig, now: datetime.datetime
+) -> tuple[Optional[str], Optional[datetime.datetime]]:
+    """(reason the record is rejected, None) or (None, its naive UTC date)."""
+    if not record.student_fullname:
+        return "missing student name", None
+    if not record.subject_name:
+        return "missing subject name", None
+    if not isinstance(record.grade, int) or isinstance(record.grade, bool):
+        return "grade is not an integer", None
+    if not config.grade_min <= record.grade <= config.grade_max:
+        return (
+            f"grade {record.grade} outside {config.grade_min}..{config.grade_max}",
+            None,
+        )
+    date = record.date_received
+    if not isinstance(date, datetime.datetime):
+        return "date_received is not a datetime", None
+    date = naive_utc(date)
+    if date > now + config.max_future:
+        return "date_received is in the future", None
+    earliest = config.earliest_date
+    if earliest is None:
+        earliest = now - config.max_age
+    if date < earliest:
+        return f"date_received before {earliest:%Y-%m-%d}", None
+    return None, date
+
+
+# INSERT ... SELECT FROM unnest(<4 arrays>): one statement and four bound
+# parameters per batch, whatever its size.
+_unnested = (
+    func.unnest(
+        bindparam("student_ids", type_=ARRAY(Integer)),
+        bindparam("subject_ids", type_=ARRAY(Integer)),
+        bindparam("grades", type_=ARRAY(Integer)),
+        bindparam("dates", type_=ARRAY(DateTime)),
+    )
+    .table_valued(*GRADE_COLUMNS)
+    .render_derived()
+)
+_pg_upsert = postgresql.insert(Grade).from_select(
+    GRADE_COLUMNS, select(*(_unnested.c[column] for column in GRADE_COLUMNS))
+)
+# Ids of the grades that already exist. All CTEs of a statement see the same
+# snapshot, so these are the rows as they were before the upsert. (The usual
+# RETURNING xmax = 0 is not available on the partitioned grades table.)
+_existing = (
+    select(Grade.id)
+    .join(
+        _unnested,
+        and_(
+            Grade.student_id == _unnested.c.student_id,
+            Grade.subject_id == _unnested.c.subject_id,
+            Grade.date_received == _unnested.c.date_received,
+        ),
+    )
+    .cte("existing")
+)
+_written = (
+    _pg_upsert.on_conflict_do_update(
+        constraint=NATURAL_KEY,
+        set_={"grade": _pg_upsert.excluded.grade},
+        # Unchanged rows are neither rewritten nor returned
+        where=Grade.grade.is_distinct_from(_pg_upsert.excluded.grade),
+    )
+    .returning(Grade.id)
+    .cte("written")
+)
+PG_UPSERT_STMT = select(_written.c.id.not_in(select(_existing.c.id)).label("inserted"))
+
+_sqlite_upsert = sqlite.insert(Grade)
+SQLITE_UPSERT_STMT = _sqlite_upsert.on_conflict_do_update(
+    index_elements=["student_id", "subject_id", "date_received"],
+    set_={"grade": _sqlite_upsert.excluded.grade},
+    where=Grade.grade.is_not(_sqlite_upsert.excluded.grade),
+)
+
+
+async def upsert_grades(
+    conn: AsyncConnection, rows: dict[tuple[int, int, datetime.datetime], int]
+) -> tuple[int, Optional[int]]:
+    """Write {(student_id, subject_id, date_received): grade}; returns
+    (rows written, rows inserted or None if unknown)."""
+    if not rows:
+        return 0, 0
+    if conn.dialect.name == "postgresql":
+        student_ids, subject_ids, dates = zip(*rows)
+        result = await conn.execute(
+            PG_UPSERT_STMT,
+            {
+                "student_ids": list(student_ids),
+                "subject_ids": list(subject_ids),
+                "grades": list(rows.values()),
+                "dates": list(dates),
+            },
+        )
+        inserted = result.scalars().all()
+        # The INSERT is a CTE of a SELECT, which the cache invalidation by
+        # statement type does not see
+        record_write(conn, Grade.__tablename__)
+        return len(inserted), sum(inserted)
+    if conn.dialect.name == "sqlite":
+        result = await conn.execute(
+            SQLITE_UPSERT_STMT,
+            [
+                dict(zip(GRADE_COLUMNS, (*key[:2], grade, key[2])))
+                for key, grade in rows.items()
+            ],
+        )
+        return result.rowcount, None
+    raise NotImplementedError(
+        f"Grade upserts are not implemented for {conn.dialect.name}"
+    )
+
+
+@tag_query
+async def ingest_grade_batch(
+    engine: AsyncEngine,
+    number: int,
+    records: list[GradeRecord],
+    config: IngestConfig,
+    names: DimensionCache,
+) -> BatchStats:
+    started = time.perf_counter()
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    stats = BatchStats(
+        batch=number, received=len(records), written=0, unchanged=0, duplicates=0
+    )
+
+    valid = []
+    for record in records:
+        reason, date = validate(record, config, now)
+        if reason:
+            stats.rejected.append(RejectedRecord(record, reason))
+        else:
+            valid.append((record, date))
+
+    if valid:
+        # Own transaction: its lock must not be held while the batch is written
+        async with engine.begin() as conn:
+            await ensure_month_partitions(conn, (date for _, date in valid))
+
+    async with engine.begin() as conn:
+        student_ids = await names.ids_of(
+            conn, Student.fullname, {record.student_fullname for record, _ in valid}
+        )
+        subject_ids = await names.ids_of(
+            conn, Subject.name, {record.subject_name for record, _ in valid}
+        )
+
+        rows: dict[tuple[int, int, datetime.datetime], int] = {}
+        for record, date in valid:
+            reason = _unresolved(
+                record,
+                student_ids[record.student_fullname],
+                subject_ids[record.subject_name],
+            )
+            if reason:
+                stats.rejected.append(RejectedRecord(record, reason))
+                continue
+            key = (
+                *student_ids[record.student_fullname],
+                *subject_ids[record.subject_name],
+                date,
+            )
+            if key in rows:
+                stats.duplicates += 1
+            rows[key] = record.grade
+
+        stats.written, stats.inserted = await upsert_grades(conn, rows)
+        stats.unchanged = len(rows) - stats.written
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def _unresolved(
+    record: GradeRecord, student_ids: tuple[int, ...], subject_ids: tuple[int, ...]
+) -> Optional[str]:
+    """Why the names of `record` do not resolve to one student and one
+    subject (names are not unique), or None."""
+    for ids, name, kind in (
+        (student_ids, record.student_fullname, "student"),
+        (subject_ids, record.subject_name, "subject"),
+    ):
+        if len(ids) > 1:
+            return f"ambiguous {kind} name '{name}'"
+        if not ids:
+            return f"unknown {kind} '{name}'"
+    return None
+
+
+async def _batches(
+    records: Iterable[GradeRecord] | AsyncIterable[GradeRecord], size: int
+) -> AsyncIterator[list[GradeRecord]]:
+    if isinstance(records, AsyncIterable):
+        batch = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    else:
+        iterator = iter(records)
+        while batch := list(itertools.islice(iterator, size)):
+            yield batch
+
+
+async def ingest_grade_batches(
+    engine: AsyncEngine,
+    records: Iterable[GradeRecord] | AsyncIterable[GradeRecord],
+    config: IngestConfig = IngestConfig(),
+    names: DimensionCache = dimensions,
+) -> AsyncIterator[BatchStats]:
+    """Ingest `records` in batches of `config.batch_size`, yielding the stats
+    of each batch once it is committed.
+
+    Student and subject names are resolved through `names`, the dimension
+    cache of the queries by default, which drops a table when it is written
+    through a watched engine.
+    """
+    number = 0
+    async for batch in _batches(records, config.batch_size):
+        number += 1
+        yield await ingest_grade_batch(engine, number, batch, config, names)
+
+    # grade_aggregates is kept up to date by triggers on Postgres only
+    if number and engine.dialect.name != "postgresql":
+        async with engine.begin() as conn:
+            await rebuild_grade_aggregates(conn)
+
+
+async def ingest_grades(
+    engine: AsyncEngine,
+    records: Iterable[GradeRecord] | AsyncIterable[GradeRecord],
+    config: IngestConfig = IngestConfig(),
+) -> list[BatchStats]:
+    return [stats async for stats in ingest_grade_batches(engine, records, config)]
+
+
+def read_csv_records(path: Path) -> Iterator[GradeRecord]:
+    """Records of a CSV file, read lazily. Unparsable grades and dates are
+    passed on as None, to be rejected by validation with the record."""
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            try:
+                grade = int(row["grade"])
+            except (TypeError, ValueError):
+                grade = None
+            try:
+                date = datetime.datetime.fromisoformat(row["date_received"])
+            except (TypeError, ValueError):
+                date = None
+            yield GradeRecord(row["student_fullname"], row["subject_name"], grade, date)
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = IngestConfig()
+    parser = argparse.ArgumentParser(description="Ingest grades from a CSV file.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--grade-min", type=int, default=defaults.grade_min)
+    parser.add_argument("--grade-max", type=int, default=defaults.grade_max)
+    parser.add_argument(
+        "--earliest-date",
+        type=datetime.datetime.fromisoformat,
+        help=(
+            "Reject grades dated before this (default: "
+            f"{defaults.max_age.days // 365} years before now)."
+        ),
+    )
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        help="Write rejected records with the reason to this CSV file.",
+    )
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace):
+    config = IngestConfig(
+        batch_size=args.batch_size,
+        grade_min=args.grade_min,
+        grade_max=args.grade_max,
+        earliest_date=args.earliest_date and naive_utc(args.earliest_date),
+    )
+    engine = get_engine()
+    batches = []
+    try:
+        async for stats in ingest_grade_batches(
+            engine, read_csv_records(args.path), config
+        ):
+            print(stats)
+            batches.append(stats)
+    finally:
+        await engine.dispose()
+
+    rejected = [rejection for stats in batches for rejection in stats.rejected]
+    print(
+        f"Ingested {sum(s.received for s in batches):,} records: "
+        f"{sum(s.written for s in batches):,} written, {len(rejected):,} rejected."
+    )
+    if args.rejects and rejected:
+        with open(args.rejects, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow((*GradeRecord._fields, "reason"))
+            writer.writerows((*record, reason) for record, reason in rejected)
+        print(f"Rejected records written to '{args.rejects}'.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
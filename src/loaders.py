@@ -0,0 +1,68 @@
+"""Per-session DataLoaders over the batched queries of src/queries.py.
+
+Report code keeps calling "one teacher at a time", but concurrently; the
+loaders turn the calls made in the same event-loop iteration into one
+batched query:
+
+    loaders = QueryLoaders(session)
+    courses = await asyncio.gather(
+        *(loaders.courses_by_teacher.load(name) for name in teacher_names)
+    )
+
+All loaders of one QueryLoaders share its session, which can only run one
+statement at a time, so their batches take turns on a lock.
+"""
+
+import asyncio
+import datetime
+from decimal import Decimal
+from functools import partial
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.dataloader import DataLoader
+from src.queries import (
+    fetch_5_courses_by_teachers,
+    fetch_8_avg_grade_by_teachers,
+    fetch_9_courses_for_students,
+    fetch_10_courses_for_students_by_teachers,
+)
+
+
+class QueryLoaders:
+    """Loaders of queries 5, 8, 9 and 10 for one session and date range."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        date_from: Optional[datetime.date] = None,
+        date_to: Optional[datetime.date] = None,
+    ):
+        self.session = session
+        self._lock = asyncio.Lock()
+        dates = {"date_from": date_from, "date_to": date_to}
+        self.courses_by_teacher: DataLoader[str, list[str]] = self._loader(
+            fetch_5_courses_by_teachers, default_factory=list
+        )
+        self.avg_grade_by_teacher: DataLoader[str, Optional[Decimal]] = self._loader(
+            fetch_8_avg_grade_by_teachers, **dates
+        )
+        self.courses_for_student: DataLoader[str, list[str]] = self._loader(
+            fetch_9_courses_for_students, default_factory=list, **dates
+        )
+        self.courses_for_student_by_teacher: DataLoader[tuple[str, str], list[str]] = (
+            self._loader(
+                fetch_10_courses_for_students_by_teachers, default_factory=list, **dates
+            )
+        )
+
+    def _loader(self, fetch, default_factory=None, **kwargs) -> DataLoader:
+        batch = partial(fetch, self.session, **kwargs)
+
+        async def batch_load(keys):
+            async with self._lock:
+                return await batch(keys)
+
+        return DataLoader(batch_load, default_factory=default_factory)
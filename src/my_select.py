@@ -1,353 +1,505 @@
+import argparse
 import asyncio
-from sqlalchemy import func, select, desc, and_
+import datetime
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models import Student, Grade, Subject, Teacher, Group
-from src.db.session import AsyncSessionFactory, engine
+from src.db.instrumentation import instrumentation
+from src.db.lookup import dimensions
+from src.db.session import dispose_engines, get_replicas, read_session
+from src.queries import (
+    fetch_1_top_students,
+    fetch_2_student_top_grade_for_subject,
+    fetch_3_avg_grade_in_group_for_subject,
+    fetch_4_overall_avg_grade,
+    fetch_5_courses_by_teacher,
+    fetch_6_students_in_group,
+    fetch_7_grades_in_group_for_subject,
+    fetch_8_avg_grade_by_teacher,
+    fetch_9_courses_for_student,
+    fetch_10_courses_for_student_by_teacher,
+    fetch_11_top_students_per_subject,
+    fetch_12_top_students_per_group,
+    fetch_example_row,
+    stream_6_students_in_group,
+    stream_7_grades_in_group_for_subject,
+)
+from src.renderers import RENDERERS, Renderer, TextRenderer, render_stream
+
+# Sessions (and so pooled connections) used at once by main(); stays within
+# the engine's default pool_size of 5.
+DEFAULT_CONCURRENCY = 5
+
+default_renderer = TextRenderer()
 
 
 # Query Functions
-async def select_1_top_students(session: AsyncSession, limit: int = 5):
+# select_N_* fetch the data through src/queries.py and render it. The ones
+# over grades only count the grades received in [date_from, date_to) when
+# given, which limits the scan to the partitions of that range.
+
+
+async def select_1_top_students(
+    session: AsyncSession,
+    limit: int = 5,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
     """Find the 5 students with the highest GPA in all subjects."""
-    print(f"\n--- Query 1: Top {limit} students by average grade ---")
-    stmt = (
-        select(
-            Student.fullname, func.round(func.avg(Grade.grade), 2).label("avg_grade")
-        )
-        .select_from(Grade)
-        .join(Student)
-        .group_by(Student.id)
-        .order_by(desc("avg_grade"))
-        .limit(limit)
+    students = await fetch_1_top_students(
+        session, limit, date_from=date_from, date_to=date_to
     )
-    result = await session.execute(stmt)
-    students = result.all()
-    for student in students:
-        print(f"{student.fullname}: Average Grade = {student.avg_grade}")
+    renderer.render(1, students, limit)
     return students
 
 
 async def select_2_student_top_grade_for_subject(
-    session: AsyncSession, subject_name: str
+    session: AsyncSession,
+    subject_name: str,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
 ):
     """Find the student with the highest GPA in a specific subject."""
-    print(
-        f"\n--- Query 2: Student with highest average grade for subject '{subject_name}' ---"
+    student = await fetch_2_student_top_grade_for_subject(
+        session, subject_name, date_from=date_from, date_to=date_to
     )
-    stmt = (
-        select(
-            Student.fullname, func.round(func.avg(Grade.grade), 2).label("avg_grade")
-        )
-        .select_from(Grade)
-        .join(Student)
-        .join(Subject)
-        .filter(Subject.name == subject_name)
-        .group_by(Student.id)
-        .order_by(desc("avg_grade"))
-        .limit(1)
-    )
-    result = await session.execute(stmt)
-    student = result.first()
-    if student:
-        print(
-            f"Student: {student.fullname}, Highest Avg Grade in {subject_name}: {student.avg_grade}"
-        )
-    else:
-        print(f"No student found or no grades for subject: {subject_name}")
+    renderer.render(2, student, subject_name)
     return student
 
 
 async def select_3_avg_grade_in_group_for_subject(
-    session: AsyncSession, subject_name: str, group_name: str
+    session: AsyncSession,
+    subject_name: str,
+    group_name: str,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
 ):
     """Find the average score in groups for a specific subject."""
-    print(
-        f"\n--- Query 3: Average grade in group '{group_name}' for subject '{subject_name}' ---"
+    avg_grade = await fetch_3_avg_grade_in_group_for_subject(
+        session, subject_name, group_name, date_from=date_from, date_to=date_to
     )
-    stmt = (
-        select(func.round(func.avg(Grade.grade), 2).label("avg_grade"))
-        .select_from(Grade)
-        .join(Student)
-        .join(Group)
-        .join(Subject)
-        .filter(and_(Subject.name == subject_name, Group.name == group_name))
-    )
-    result = await session.execute(stmt)
-    avg_grade = result.scalar_one_or_none()
-    if avg_grade is not None:
-        print(
-            f"Average grade for group '{group_name}' in '{subject_name}': {avg_grade}"
-        )
-    else:
-        print(f"No grades found for group '{group_name}' in subject '{subject_name}'.")
+    renderer.render(3, avg_grade, subject_name, group_name)
     return avg_grade
 
 
-async def select_4_overall_avg_grade(session: AsyncSession):
+async def select_4_overall_avg_grade(
+    session: AsyncSession,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
     """Find the average score on the cohort (across the entire grade table)."""
-    print(f"\n--- Query 4: Overall average grade across all grades ---")
-    stmt = select(
-        func.round(func.avg(Grade.grade), 2).label("overall_avg_grade")
-    ).select_from(Grade)
-    result = await session.execute(stmt)
-    overall_avg = result.scalar_one_or_none()
-    if overall_avg is not None:
-        print(f"Overall average grade: {overall_avg}")
-    else:
-        print("No grades found in the database.")
+    overall_avg = await fetch_4_overall_avg_grade(
+        session, date_from=date_from, date_to=date_to
+    )
+    renderer.render(4, overall_avg)
     return overall_avg
 
 
-async def select_5_courses_by_teacher(session: AsyncSession, teacher_fullname: str):
+async def select_5_courses_by_teacher(
+    session: AsyncSession, teacher_fullname: str, renderer: Renderer = default_renderer
+):
     """Find which courses a particular teacher teaches."""
-    print(f"\n--- Query 5: Courses taught by teacher '{teacher_fullname}' ---")
-    stmt = (
-        select(Subject.name).join(Teacher).filter(Teacher.fullname == teacher_fullname)
-    )
-    result = await session.execute(stmt)
-    courses = result.scalars().all()
-    if courses:
-        print(f"Teacher '{teacher_fullname}' teaches: {', '.join(courses)}")
-    else:
-        print(
-            f"No courses found for teacher '{teacher_fullname}' or teacher not found."
-        )
+    courses = await fetch_5_courses_by_teacher(session, teacher_fullname)
+    renderer.render(5, courses, teacher_fullname)
     return courses
 
 
-async def select_6_students_in_group(session: AsyncSession, group_name: str):
+async def select_6_students_in_group(
+    session: AsyncSession, group_name: str, renderer: Renderer = default_renderer
+):
     """Find a list of students in a specific group."""
-    print(f"\n--- Query 6: Students in group '{group_name}' ---")
-    stmt = (
-        select(Student.fullname)
-        .join(Group)
-        .filter(Group.name == group_name)
-        .order_by(Student.fullname)
-    )
-    result = await session.execute(stmt)
-    students = result.scalars().all()
-    if students:
-        print(f"Students in group '{group_name}':")
-        for s_name in students:
-            print(f"- {s_name}")
-    else:
-        print(f"No students found in group '{group_name}' or group not found.")
+    students = await fetch_6_students_in_group(session, group_name)
+    renderer.render(6, students, group_name)
     return students
 
 
 async def select_7_grades_in_group_for_subject(
-    session: AsyncSession, group_name: str, subject_name: str
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
 ):
     """Find student grades in a specific group for a specific subject."""
-    print(
-        f"\n--- Query 7: Grades of students in group '{group_name}' for subject '{subject_name}' ---"
+    grades_info = await fetch_7_grades_in_group_for_subject(
+        session, group_name, subject_name, date_from=date_from, date_to=date_to
     )
-    stmt = (
-        select(Student.fullname, Grade.grade, Grade.date_received)
-        .select_from(Grade)
-        .join(Student)
-        .join(Group)
-        .join(Subject)
-        .filter(and_(Group.name == group_name, Subject.name == subject_name))
-        .order_by(Student.fullname, Grade.date_received)
-    )
-    result = await session.execute(stmt)
-    grades_info = result.all()
-    if grades_info:
-        print(f"Grades in group '{group_name}' for subject '{subject_name}':")
-        for s_name, grade, date_rec in grades_info:
-            print(
-                f"- Student: {s_name}, Grade: {grade}, Date: {date_rec.strftime('%Y-%m-%d') if date_rec else 'N/A'}"
-            )
-    else:
-        print(f"No grades found for group '{group_name}' in subject '{subject_name}'.")
+    renderer.render(7, grades_info, group_name, subject_name)
     return grades_info
 
 
-async def select_8_avg_grade_by_teacher(session: AsyncSession, teacher_fullname: str):
+async def select_8_avg_grade_by_teacher(
+    session: AsyncSession,
+    teacher_fullname: str,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
     """Find the average grade given by a particular teacher in their subjects."""
-    print(f"\n--- Query 8: Average grade given by teacher '{teacher_fullname}' ---")
-    stmt = (
-        select(func.round(func.avg(Grade.grade), 2).label("avg_teacher_grade"))
-        .select_from(Grade)
-        .join(Subject)
-        .join(Teacher)
-        .filter(Teacher.fullname == teacher_fullname)
+    avg_grade = await fetch_8_avg_grade_by_teacher(
+        session, teacher_fullname, date_from=date_from, date_to=date_to
     )
-    result = await session.execute(stmt)
-    avg_grade = result.scalar_one_or_none()
-    if avg_grade is not None:
-        print(f"Average grade given by '{teacher_fullname}': {avg_grade}")
-    else:
-        print(
-            f"No grades found for subjects taught by '{teacher_fullname}' or teacher not found."
-        )
+    renderer.render(8, avg_grade, teacher_fullname)
     return avg_grade
 
 
-async def select_9_courses_for_student(session: AsyncSession, student_fullname: str):
+async def select_9_courses_for_student(
+    session: AsyncSession,
+    student_fullname: str,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
     """Find a list of courses taken by a particular student."""
-    print(f"\n--- Query 9: Courses attended by student '{student_fullname}' ---")
-    stmt = (
-        select(Subject.name)
-        .distinct()
-        .select_from(Grade)
-        .join(Subject)
-        .join(Student)
-        .filter(Student.fullname == student_fullname)
-        .order_by(Subject.name)
+    courses = await fetch_9_courses_for_student(
+        session, student_fullname, date_from=date_from, date_to=date_to
     )
-    result = await session.execute(stmt)
-    courses = result.scalars().all()
-    if courses:
-        print(
-            f"Student '{student_fullname}' attends (has grades in): {', '.join(courses)}"
-        )
-    else:
-        print(
-            f"No courses found for student '{student_fullname}' or student not found."
-        )
+    renderer.render(9, courses, student_fullname)
     return courses
 
 
 async def select_10_courses_for_student_by_teacher(
-    session: AsyncSession, student_fullname: str, teacher_fullname: str
+    session: AsyncSession,
+    student_fullname: str,
+    teacher_fullname: str,
+    renderer: Renderer = default_renderer,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
 ):
     """List of courses taught by a certain teacher to a certain student."""
-    print(
-        f"\n--- Query 10: Courses taught by '{teacher_fullname}' that '{student_fullname}' attends ---"
-    )
-    stmt = (
-        select(Subject.name)
-        .distinct()
-        .select_from(Grade)
-        .join(Student, Grade.student_id == Student.id)
-        .join(Subject, Grade.subject_id == Subject.id)
-        .join(Teacher, Subject.teacher_id == Teacher.id)
-        .filter(
-            and_(
-                Student.fullname == student_fullname,
-                Teacher.fullname == teacher_fullname,
-            )
-        )
-        .order_by(Subject.name)
+    courses = await fetch_10_courses_for_student_by_teacher(
+        session,
+        student_fullname,
+        teacher_fullname,
+        date_from=date_from,
+        date_to=date_to,
     )
-    result = await session.execute(stmt)
-    courses = result.scalars().all()
-    if courses:
-        print(
-            f"Student '{student_fullname}' attends courses by teacher '{teacher_fullname}': {', '.join(courses)}"
-        )
-    else:
-        print(
-            f"No such courses found for student '{student_fullname}' with teacher '{teacher_fullname}'."
-        )
+    renderer.render(10, courses, student_fullname, teacher_fullname)
     return courses
 
 
-async def fetch_example_data(session: AsyncSession):
-    """Fetches example data to use as parameters for other queries."""
-    print("\n--- Fetching example data for queries ---")
-    example_data = {
-        "subject_name": None,
-        "group_name": None,
-        "teacher_fullname": None,
-        "student_fullname": None,
-    }
-
-    result = await session.execute(select(Subject.name).limit(1))
-    subject = result.scalar_one_or_none()
-    if subject:
-        example_data["subject_name"] = subject
-    else:
-        print("Could not fetch an example subject.")
-
-    result = await session.execute(select(Group.name).limit(1))
-    group = result.scalar_one_or_none()
-    if group:
-        example_data["group_name"] = group
-    else:
-        print("Could not fetch an example group.")
-
-    result = await session.execute(select(Teacher.fullname).limit(1))
-    teacher = result.scalar_one_or_none()
-    if teacher:
-        example_data["teacher_fullname"] = teacher
-    else:
-        print("Could not fetch an example teacher.")
-
-    result = await session.execute(select(Student.fullname).limit(1))
-    student = result.scalar_one_or_none()
-    if student:
-        example_data["student_fullname"] = student
-    else:
-        print("Could not fetch an example student.")
+async def select_11_top_students_per_subject(
+    session: AsyncSession,
+    limit: int = 3,
+    ties: bool = True,
+    renderer: Renderer = default_renderer,
+):
+    """Find the top students of every subject, in one statement.
 
-    return example_data
+    With `ties`, students sharing the last place are all listed."""
+    rankings = await fetch_11_top_students_per_subject(session, limit, ties)
+    renderer.render(11, rankings, limit, ties)
+    return rankings
 
 
-async def main():
-    """Main function to demonstrate running the select queries."""
-    async with AsyncSessionFactory() as session:
-        examples = await fetch_example_data(session)
+async def select_12_top_students_per_group(
+    session: AsyncSession,
+    limit: int = 3,
+    ties: bool = True,
+    renderer: Renderer = default_renderer,
+):
+    """Find the top students of every group by average grade, in one statement.
 
-        await select_1_top_students(session)
+    With `ties`, students sharing the last place are all listed."""
+    rankings = await fetch_12_top_students_per_group(session, limit, ties)
+    renderer.render(12, rankings, limit, ties)
+    return rankings
 
-        if examples["subject_name"]:
-            await select_2_student_top_grade_for_subject(
-                session, examples["subject_name"]
-            )
-        else:
-            print("Skipping Query 2: No example subject name available.")
 
-        if examples["subject_name"] and examples["group_name"]:
-            await select_3_avg_grade_in_group_for_subject(
-                session, examples["subject_name"], examples["group_name"]
-            )
-        else:
-            print("Skipping Query 3: Missing example subject or group name.")
+EXAMPLE_DATA_MISSING = {
+    "subject_name": "Could not fetch an example subject.",
+    "group_name": "Could not fetch an example group.",
+    "teacher_fullname": "Could not fetch an example teacher.",
+    "student_fullname": "Could not fetch an example student.",
+}
 
-        await select_4_overall_avg_grade(session)
 
-        if examples["teacher_fullname"]:
-            await select_5_courses_by_teacher(session, examples["teacher_fullname"])
-        else:
-            print("Skipping Query 5: No example teacher name available.")
+async def fetch_example_data(
+    session: AsyncSession, renderer: Renderer = default_renderer
+) -> dict:
+    """Fetches example data to use as parameters for other queries."""
+    renderer.message("\n--- Fetching example data for queries ---")
+    example_data = (await fetch_example_row(session))._asdict()
+    for key, message in EXAMPLE_DATA_MISSING.items():
+        if not example_data[key]:
+            renderer.message(message)
+    return example_data
 
-        if examples["group_name"]:
-            await select_6_students_in_group(session, examples["group_name"])
-        else:
-            print("Skipping Query 6: No example group name available.")
 
-        if examples["group_name"] and examples["subject_name"]:
-            await select_7_grades_in_group_for_subject(
-                session, examples["group_name"], examples["subject_name"]
-            )
-        else:
-            print("Skipping Query 7: Missing example group or subject name.")
+@dataclass
+class QueryRun:
+    """One query of the demo: what to fetch and how long it took."""
+
+    label: str
+    number: int
+    fetch: Callable[..., Awaitable[Any]]
+    args: tuple = ()
+    # Keyword arguments of both `fetch` and `stream` (the date range)
+    kwargs: dict = field(default_factory=dict)
+    # Batched variant of `fetch`, for the queries that have one
+    stream: Optional[Callable[..., AsyncIterator[list]]] = None
+    # Set instead of running the query when example parameters are missing
+    skip_reason: Optional[str] = None
+    result: Any = None
+    seconds: float = 0.0
+
+
+def build_query_runs(
+    examples: dict,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> list[QueryRun]:
+    """The demo queries, parameterised with the fetched example data.
+
+    The queries over grades (all but 5, 6 and the leaderboards 11 and 12)
+    get the date range.
+    """
+    subject = examples["subject_name"]
+    group = examples["group_name"]
+    teacher = examples["teacher_fullname"]
+    student = examples["student_fullname"]
+    date_range = {"date_from": date_from, "date_to": date_to}
+
+    def run(number, fetch, args=(), missing=None, stream=None, kwargs=date_range):
+        # Queries without parameters always run
+        skip_reason = None if all(args) else missing
+        return QueryRun(
+            f"Query {number}",
+            number,
+            fetch,
+            args,
+            kwargs,
+            stream,
+            skip_reason=skip_reason,
+        )
+
+    return [
+        run(1, fetch_1_top_students),
+        run(
+            2,
+            fetch_2_student_top_grade_for_subject,
+            (subject,),
+            "Skipping Query 2: No example subject name available.",
+        ),
+        run(
+            3,
+            fetch_3_avg_grade_in_group_for_subject,
+            (subject, group),
+            "Skipping Query 3: Missing example subject or group name.",
+        ),
+        run(4, fetch_4_overall_avg_grade),
+        run(
+            5,
+            fetch_5_courses_by_teacher,
+            (teacher,),
+            "Skipping Query 5: No example teacher name available.",
+            kwargs={},
+        ),
+        run(
+            6,
+            fetch_6_students_in_group,
+            (group,),
+            "Skipping Query 6: No example group name available.",
+            stream=stream_6_students_in_group,
+            kwargs={},
+        ),
+        run(
+            7,
+            fetch_7_grades_in_group_for_subject,
+            (group, subject),
+            "Skipping Query 7: Missing example group or subject name.",
+            stream=stream_7_grades_in_group_for_subject,
+        ),
+        run(
+            8,
+            fetch_8_avg_grade_by_teacher,
+            (teacher,),
+            "Skipping Query 8: No example teacher name available.",
+        ),
+        run(
+            9,
+            fetch_9_courses_for_student,
+            (student,),
+            "Skipping Query 9: No example student name available.",
+        ),
+        run(
+            10,
+            fetch_10_courses_for_student_by_teacher,
+            (student, teacher),
+            "Skipping Query 10: Missing example student or teacher name.",
+        ),
+        run(11, fetch_11_top_students_per_subject, kwargs={}),
+        run(12, fetch_12_top_students_per_group, kwargs={}),
+    ]
+
+
+async def run_queries(runs: list[QueryRun], concurrency: int) -> float:
+    """Fetch every run on its own session, at most `concurrency` at a time.
+
+    Returns the end-to-end wall time; per-query times are set on the runs.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def execute(run: QueryRun):
+        async with semaphore:
+            started = time.perf_counter()
+            async with read_session() as session:
+                run.result = await run.fetch(session, *run.args, **run.kwargs)
+            run.seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    async with asyncio.TaskGroup() as group:
+        for run in runs:
+            if run.skip_reason is None:
+                group.create_task(execute(run))
+    return time.perf_counter() - started
+
+
+async def stream_query(run: QueryRun, renderer: Renderer):
+    """Render a run's rows batch by batch as they arrive from the server."""
+    started = time.perf_counter()
+    async with read_session() as session:
+        await render_stream(
+            renderer,
+            run.number,
+            run.stream(session, *run.args, **run.kwargs),
+            *run.args,
+        )
+    run.seconds = time.perf_counter() - started
 
-        if examples["teacher_fullname"]:
-            await select_8_avg_grade_by_teacher(session, examples["teacher_fullname"])
-        else:
-            print("Skipping Query 8: No example teacher name available.")
 
-        if examples["student_fullname"]:
-            await select_9_courses_for_student(session, examples["student_fullname"])
-        else:
-            print("Skipping Query 9: No example student name available.")
+async def main(
+    concurrency: int = DEFAULT_CONCURRENCY,
+    metrics: bool = False,
+    renderer: Renderer = default_renderer,
+    stream: bool = False,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+):
+    """Main function to demonstrate running the select queries.
+
+    With `stream`, the queries that have a stream_N_* variant are rendered
+    batch by batch after the others instead of being loaded whole.
+    """
+    try:
+        async with read_session() as session:
+            examples = await fetch_example_data(session, renderer)
+
+        runs = build_query_runs(examples, date_from, date_to)
+        streamed = [run for run in runs if stream and run.stream]
+        total_seconds = await run_queries(
+            [run for run in runs if run not in streamed], concurrency
+        )
 
-        if examples["student_fullname"] and examples["teacher_fullname"]:
-            await select_10_courses_for_student_by_teacher(
-                session, examples["student_fullname"], examples["teacher_fullname"]
-            )
-        else:
-            print("Skipping Query 10: Missing example student or teacher name.")
+        # Results are rendered in query order, whatever order they finished in
+        for run in runs:
+            if run.skip_reason:
+                renderer.message(run.skip_reason)
+            elif run in streamed:
+                await stream_query(run, renderer)
+                total_seconds += run.seconds
+            else:
+                renderer.render(run.number, run.result, *run.args)
+
+        renderer.message(f"\n--- Timings (concurrency {concurrency}) ---")
+        for run in runs:
+            if run.skip_reason is None:
+                streamed_note = " (streamed)" if run in streamed else ""
+                renderer.message(
+                    f"{run.label}: {run.seconds * 1000:.1f} ms{streamed_note}"
+                )
+        sequential = sum(run.seconds for run in runs)
+        renderer.message(
+            f"Total: {total_seconds * 1000:.1f} ms wall time "
+            f"({sequential * 1000:.1f} ms summed over queries)"
+        )
 
-    await engine.dispose()
-    print("\nQueries finished and database engine disposed.")
+        if metrics:
+            renderer.message("\n--- Statement metrics (Prometheus text format) ---")
+            renderer.message(instrumentation.render_prometheus().rstrip("\n"))
+            renderer.message(dimensions.render_prometheus().rstrip("\n"))
+            replicas = get_replicas()
+            if replicas.replicas:
+                renderer.message(replicas.render_prometheus().rstrip("\n"))
+    finally:
+        await dispose_engines()
+    renderer.message("\nQueries finished and database engine disposed.")
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the demo select queries.")
+    parser.add_argument(
+        "--concurrency",
+        type=positive_int,
+        default=DEFAULT_CONCURRENCY,
+        help="Queries running at the same time, each on its own session.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Print per-query statement timings and row counts at the end.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(RENDERERS),
+        default="text",
+        help="text for reading, json for one JSON object per result line.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the rows of queries 6 and 7 in batches instead of loading them whole.",
+    )
+    parser.add_argument(
+        "--date-from",
+        type=datetime.date.fromisoformat,
+        help="Only count grades received on or after this day (YYYY-MM-DD).",
+    )
+    parser.add_argument(
+        "--date-to",
+        type=datetime.date.fromisoformat,
+        help="Only count grades received before this day (YYYY-MM-DD).",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    print("Running 'select' script...")
-    asyncio.run(main())
-    print("'Select' script finished.")
+    args = parse_args()
+    renderer = RENDERERS[args.format]()
+    renderer.message("Running 'select' script...")
+    asyncio.run(
+        main(
+            args.concurrency,
+            args.metrics,
+            renderer,
+            args.stream,
+            args.date_from,
+            args.date_to,
+        )
+    )
+    renderer.message("'Select' script finished.")
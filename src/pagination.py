@@ -0,0 +1,76 @@
+"""Keyset (seek) pagination cursors for the list queries of src/queries.py.
+
+A page ends with a cursor holding the ORDER BY values of its last row, id
+included so the key is unique. The next page is read with
+`WHERE (order columns) > (cursor values)`, which an index on those columns
+serves by seeking to the cursor and reading `limit` rows. Page 1000 costs
+the same as page 1, where OFFSET would read and discard every row before
+the page. Rows inserted or deleted between two requests never shift a page.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON document
+that names the query it belongs to.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Generic, NamedTuple, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Rows per page when the caller does not ask for a page size
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not issued for this query or was tampered with."""
+
+
+class Page(NamedTuple, Generic[T]):
+    rows: list[T]
+    # Cursor of the following page, None on the last page
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and set(value) == {"dt"}:
+        return datetime.datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(query: str, key: Sequence[Any]) -> str:
+    """Cursor positioned after the row whose ORDER BY values are `key`."""
+    payload = json.dumps(
+        {"q": query, "k": [_encode_value(value) for value in key]},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(query: str, cursor: str, key_size: int) -> tuple:
+    """The ORDER BY values stored in `cursor`; InvalidCursor unless it is a
+    cursor of `query` holding `key_size` values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key = tuple(_decode_value(value) for value in payload["k"])
+        valid = payload["q"] == query and len(key) == key_size
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        valid = False
+    if not valid:
+        raise InvalidCursor(f"Not a valid cursor for {query}")
+    return key
+
+
+def check_page_size(limit: int) -> int:
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
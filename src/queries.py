@@ -0,0 +1,929 @@
+"""Data access for the demo queries: typed rows in, nothing printed.
+
+fetch_N_* load the whole result (cached in query_cache). The queries whose
+results grow with the data (6 and 7) also have stream_N_* variants that
+yield rows in batches from a server-side cursor, bypassing the cache, and
+page_N_* variants that return one page at a time with a keyset cursor
+(src/pagination.py). Presentation lives in src/renderers.py.
+
+The per-teacher and per-student queries (5, 8, 9 and 10) have batched
+variants (named in the plural) that take many names and return a dict keyed
+by name from one query per LOOKUP_CHUNK_SIZE names; src/loaders.py turns
+concurrent single-name calls into such batches.
+
+The queries over grades take an optional [date_from, date_to) range of
+date_received; grades is partitioned by month (src/db/partitions.py), so
+Postgres only scans the partitions of the range.
+
+The statements of the fetch_N_* and stream_N_* functions are built once,
+with bound parameters in place of the ids, dates and limits that change
+between calls, and reused: building a select() and its cache key again on
+every call costs several times more than finding its SQL in SQLAlchemy's
+compiled cache. A query whose SQL depends on its arguments (which ends of
+the date range are given, whether ties are kept) has one statement per
+variant. Equal SQL also lets asyncpg reuse the statement it prepared on the
+connection; `python -m src.benchmarks.statements` checks both.
+"""
+
+import datetime
+import functools
+from decimal import Decimal
+from typing import AsyncIterator, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from sqlalchemy import (
+    BindParameter,
+    Integer,
+    Select,
+    bindparam,
+    desc,
+    func,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.aggregates import average_grade, student_subject_average
+from src.db.instrumentation import tag_query
+from src.db.loading import (
+    GRADE_DETAILS,
+    GROUP_ROSTER,
+    STUDENT_REPORT,
+    SUBJECT_GRADEBOOK,
+    TEACHER_SUBJECTS,
+    apply_profile,
+)
+from src.db.lookup import LOOKUP_CHUNK_SIZE, dimensions
+from src.db.models import Student, Grade, GradeAggregate, Subject, Teacher, Group
+from src.db.query_cache import query_cache
+from src.pagination import (
+    DEFAULT_PAGE_SIZE,
+    Page,
+    check_page_size,
+    decode_cursor,
+    encode_cursor,
+)
+
+# Rows per batch fetched from the server by the stream_N_* functions
+DEFAULT_BATCH_SIZE = 1000
+
+# The ids a name filter stands for: resolved from the dimension cache
+# (src/db/lookup.py), or a SELECT of them to look them up in the statement
+Ids = Sequence[int] | Select[tuple[int]]
+
+# Bound parameters of the prebuilt statements, valued at execution
+DATE_FROM = bindparam("date_from")
+DATE_TO = bindparam("date_to")
+LIMIT = bindparam("limit", type_=Integer)
+GROUP_IDS = bindparam("group_ids", expanding=True)
+STUDENT_IDS = bindparam("student_ids", expanding=True)
+SUBJECT_IDS = bindparam("subject_ids", expanding=True)
+TEACHER_IDS = bindparam("teacher_ids", expanding=True)
+
+# DATE_FROM and DATE_TO, each None when that end of the range is open
+DateBounds = tuple[Optional[BindParameter], Optional[BindParameter]]
+
+
+# Result rows
+class StudentAverage(NamedTuple):
+    fullname: str
+    avg_grade: Optional[Decimal]
+
+
+class StudentGrade(NamedTuple):
+    fullname: str
+    grade: int
+    date_received: datetime.datetime
+
+
+class SubjectRank(NamedTuple):
+    subject_name: str
+    rank: int
+    fullname: str
+    avg_grade: Decimal
+
+
+class GroupRank(NamedTuple):
+    group_name: str
+    rank: int
+    fullname: str
+    avg_grade: Decimal
+
+
+class ExampleRow(NamedTuple):
+    """One example value per query parameter, None when the table is empty."""
+
+    subject_name: Optional[str]
+    group_name: Optional[str]
+    teacher_fullname: Optional[str]
+    student_fullname: Optional[str]
+
+
+def _as_datetime(value: datetime.date | BindParameter):
+    if isinstance(value, (datetime.datetime, BindParameter)):
+        return value
+    return datetime.datetime.combine(value, datetime.time())
+
+
+def date_received_in(
+    date_from: Optional[datetime.date | BindParameter],
+    date_to: Optional[datetime.date | BindParameter],
+) -> list:
+    """Conditions keeping the grades received in [date_from, date_to), for
+    dates or for DATE_FROM and DATE_TO."""
+    conditions = []
+    if date_from is not None:
+        conditions.append(Grade.date_received >= _as_datetime(date_from))
+    if date_to is not None:
+        conditions.append(Grade.date_received < _as_datetime(date_to))
+    return conditions
+
+
+def date_bounds(
+    date_from: Optional[datetime.date], date_to: Optional[datetime.date]
+) -> tuple[DateBounds, dict]:
+    """The DateBounds of a prebuilt statement for [date_from, date_to), and
+    the values of its parameters."""
+    params = {}
+    if date_from is not None:
+        params["date_from"] = _as_datetime(date_from)
+    if date_to is not None:
+        params["date_to"] = _as_datetime(date_to)
+    bounds = (
+        DATE_FROM if date_from is not None else None,
+        DATE_TO if date_to is not None else None,
+    )
+    return bounds, params
+
+
+def grade_average_source(
+    date_from: Optional[datetime.date | BindParameter],
+    date_to: Optional[datetime.date | BindParameter],
+):
+    """(table, average expression, conditions) for averaging grades.
+
+    grade_aggregates only holds all-time totals, so averages over a date
+    range are computed from grades themselves.
+    """
+    conditions = date_received_in(date_from, date_to)
+    if not conditions:
+        return GradeAggregate, average_grade(), conditions
+    return Grade, func.round(func.avg(Grade.grade), 2), conditions
+
+
+# Query Functions
+@functools.cache
+def top_students_stmt(bounds: DateBounds) -> Select[tuple[str, Decimal]]:
+    source, average, conditions = grade_average_source(*bounds)
+    return (
+        select(Student.fullname, average.label("avg_grade"))
+        .select_from(source)
+        .join(Student)
+        .filter(*conditions)
+        .group_by(Student.id)
+        .order_by(desc("avg_grade"))
+        .limit(LIMIT)
+    )
+
+
+@query_cache.cached(Grade, GradeAggregate, Student)
+@tag_query
+async def fetch_1_top_students(
+    session: AsyncSession,
+    limit: int = 5,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> list[StudentAverage]:
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(
+        top_students_stmt(bounds), {**params, "limit": limit}
+    )
+    return list(map(StudentAverage._make, result.tuples()))
+
+
+@functools.cache
+def student_top_grade_for_subject_stmt(
+    bounds: DateBounds,
+) -> Select[tuple[str, Decimal]]:
+    source, average, conditions = grade_average_source(*bounds)
+    return (
+        select(Student.fullname, average.label("avg_grade"))
+        .select_from(source)
+        .join(Student)
+        .filter(source.subject_id.in_(SUBJECT_IDS), *conditions)
+        .group_by(Student.id)
+        .order_by(desc("avg_grade"))
+        .limit(1)
+    )
+
+
+@query_cache.cached(Grade, GradeAggregate, Student, Subject)
+@tag_query
+async def fetch_2_student_top_grade_for_subject(
+    session: AsyncSession,
+    subject_name: str,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Optional[StudentAverage]:
+    subject_ids = await dimensions.ids(session, Subject.name, subject_name)
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(
+        student_top_grade_for_subject_stmt(bounds),
+        {**params, "subject_ids": subject_ids},
+    )
+    row = result.tuples().first()
+    return StudentAverage._make(row) if row else None
+
+
+@functools.cache
+def avg_grade_in_group_for_subject_stmt(bounds: DateBounds) -> Select[tuple[Decimal]]:
+    source, average, conditions = grade_average_source(*bounds)
+    return (
+        select(average.label("avg_grade"))
+        .select_from(source)
+        .join(Student)
+        .filter(
+            source.subject_id.in_(SUBJECT_IDS),
+            Student.group_id.in_(GROUP_IDS),
+            *conditions,
+        )
+    )
+
+
+@query_cache.cached(Grade, GradeAggregate, Student, Group, Subject)
+@tag_query
+async def fetch_3_avg_grade_in_group_for_subject(
+    session: AsyncSession,
+    subject_name: str,
+    group_name: str,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Optional[Decimal]:
+    subject_ids = await dimensions.ids(session, Subject.name, subject_name)
+    group_ids = await dimensions.ids(session, Group.name, group_name)
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(
+        avg_grade_in_group_for_subject_stmt(bounds),
+        {**params, "subject_ids": subject_ids, "group_ids": group_ids},
+    )
+    return result.scalar_one_or_none()
+
+
+@functools.cache
+def overall_avg_grade_stmt(bounds: DateBounds) -> Select[tuple[Decimal]]:
+    source, average, conditions = grade_average_source(*bounds)
+    return (
+        select(average.label("overall_avg_grade"))
+        .select_from(source)
+        .filter(*conditions)
+    )
+
+
+@query_cache.cached(Grade, GradeAggregate)
+@tag_query
+async def fetch_4_overall_avg_grade(
+    session: AsyncSession,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Optional[Decimal]:
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(overall_avg_grade_stmt(bounds), params)
+    return result.scalar_one_or_none()
+
+
+COURSES_BY_TEACHER_STMT = select(Subject.name).filter(
+    Subject.teacher_id.in_(TEACHER_IDS)
+)
+
+
+@query_cache.cached(Subject, Teacher)
+@tag_query
+async def fetch_5_courses_by_teacher(
+    session: AsyncSession, teacher_fullname: str
+) -> list[str]:
+    teacher_ids = await dimensions.ids(session, Teacher.fullname, teacher_fullname)
+    result = await session.execute(
+        COURSES_BY_TEACHER_STMT, {"teacher_ids": teacher_ids}
+    )
+    return list(result.scalars())
+
+
+def students_in_group_stmt(group_ids: Ids) -> Select[tuple[str]]:
+    """Query 6 for the ids of a group name (see src/db/lookup.py)."""
+    return (
+        select(Student.fullname)
+        .filter(Student.group_id.in_(group_ids))
+        .order_by(Student.fullname, Student.id)
+    )
+
+
+STUDENTS_IN_GROUP_STMT = students_in_group_stmt(GROUP_IDS)
+
+
+@query_cache.cached(Student, Group)
+@tag_query
+async def fetch_6_students_in_group(
+    session: AsyncSession, group_name: str
+) -> list[str]:
+    group_ids = await dimensions.ids(session, Group.name, group_name)
+    result = await session.execute(STUDENTS_IN_GROUP_STMT, {"group_ids": group_ids})
+    return list(result.scalars())
+
+
+@tag_query
+async def stream_6_students_in_group(
+    session: AsyncSession, group_name: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[list[str]]:
+    group_ids = await dimensions.ids(session, Group.name, group_name)
+    result = await session.stream_scalars(
+        STUDENTS_IN_GROUP_STMT,
+        {"group_ids": group_ids},
+        execution_options={"yield_per": batch_size},
+    )
+    async for batch in result.partitions():
+        yield batch
+
+
+@tag_query
+async def page_6_students_in_group(
+    session: AsyncSession,
+    group_name: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Page[str]:
+    """One page of query 6; pass the returned next_cursor to get the next."""
+    group_ids = await dimensions.ids(session, Group.name, group_name)
+    stmt = (
+        students_in_group_stmt(group_ids)
+        .add_columns(Student.id)
+        .limit(check_page_size(limit) + 1)
+    )
+    if cursor is not None:
+        after = decode_cursor("page_6", cursor, 2)
+        # Seeks in ix_students_group_id_fullname_id
+        stmt = stmt.filter(tuple_(Student.fullname, Student.id) > after)
+    rows = (await session.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor("page_6", tuple(rows[-1]))
+    return Page([fullname for fullname, _ in rows], next_cursor)
+
+
+def grades_in_group_for_subject_stmt(
+    group_ids: Ids,
+    subject_ids: Ids,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Select[tuple[str, int, datetime.datetime]]:
+    """Query 7 for the ids of a group and a subject name (see src/db/lookup.py)."""
+    return (
+        select(Student.fullname, Grade.grade, Grade.date_received)
+        .select_from(Grade)
+        .join(Student)
+        .filter(
+            Student.group_id.in_(group_ids),
+            Grade.subject_id.in_(subject_ids),
+            *date_received_in(date_from, date_to),
+        )
+        .order_by(Student.fullname, Student.id, Grade.date_received, Grade.id)
+    )
+
+
+@functools.cache
+def _grades_in_group_for_subject_stmt(
+    bounds: DateBounds,
+) -> Select[tuple[str, int, datetime.datetime]]:
+    return grades_in_group_for_subject_stmt(GROUP_IDS, SUBJECT_IDS, *bounds)
+
+
+async def _grades_in_group_for_subject_params(
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    date_from: Optional[datetime.date],
+    date_to: Optional[datetime.date],
+) -> tuple[Select[tuple[str, int, datetime.datetime]], dict]:
+    bounds, params = date_bounds(date_from, date_to)
+    params["group_ids"] = await dimensions.ids(session, Group.name, group_name)
+    params["subject_ids"] = await dimensions.ids(session, Subject.name, subject_name)
+    return _grades_in_group_for_subject_stmt(bounds), params
+
+
+@query_cache.cached(Grade, Student, Group, Subject)
+@tag_query
+async def fetch_7_grades_in_group_for_subject(
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> list[StudentGrade]:
+    stmt, params = await _grades_in_group_for_subject_params(
+        session, group_name, subject_name, date_from, date_to
+    )
+    result = await session.execute(stmt, params)
+    return list(map(StudentGrade._make, result.tuples()))
+
+
+@tag_query
+async def stream_7_grades_in_group_for_subject(
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> AsyncIterator[list[StudentGrade]]:
+    stmt, params = await _grades_in_group_for_subject_params(
+        session, group_name, subject_name, date_from, date_to
+    )
+    result = await session.stream(
+        stmt, params, execution_options={"yield_per": batch_size}
+    )
+    async for batch in result.tuples().partitions():
+        yield list(map(StudentGrade._make, batch))
+
+
+@functools.cache
+def avg_grade_by_teacher_stmt(bounds: DateBounds) -> Select[tuple[Decimal]]:
+    source, average, conditions = grade_average_source(*bounds)
+    return (
+        select(average.label("avg_teacher_grade"))
+        .select_from(source)
+        .join(Subject)
+        .filter(Subject.teacher_id.in_(TEACHER_IDS), *conditions)
+    )
+
+
+@query_cache.cached(Grade, GradeAggregate, Subject, Teacher)
+@tag_query
+async def fetch_8_avg_grade_by_teacher(
+    session: AsyncSession,
+    teacher_fullname: str,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Optional[Decimal]:
+    teacher_ids = await dimensions.ids(session, Teacher.fullname, teacher_fullname)
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(
+        avg_grade_by_teacher_stmt(bounds), {**params, "teacher_ids": teacher_ids}
+    )
+    return result.scalar_one_or_none()
+
+
+@functools.cache
+def courses_for_student_stmt(
+    bounds: DateBounds, by_teacher: bool = False
+) -> Select[tuple[str]]:
+    """Query 9, or query 10 when `by_teacher`."""
+    conditions = [Grade.student_id.in_(STUDENT_IDS)]
+    if by_teacher:
+        conditions.append(Subject.teacher_id.in_(TEACHER_IDS))
+    return (
+        select(Subject.name)
+        .distinct()
+        .select_from(Grade)
+        .join(Subject)
+        .filter(*conditions, *date_received_in(*bounds))
+        .order_by(Subject.name)
+    )
+
+
+@query_cache.cached(Grade, Subject, Student)
+@tag_query
+async def fetch_9_courses_for_student(
+    session: AsyncSession,
+    student_fullname: str,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> list[str]:
+    student_ids = await dimensions.ids(session, Student.fullname, student_fullname)
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(
+        courses_for_student_stmt(bounds), {**params, "student_ids": student_ids}
+    )
+    return list(result.scalars())
+
+
+@query_cache.cached(Grade, Student, Subject, Teacher)
+@tag_query
+async def fetch_10_courses_for_student_by_teacher(
+    session: AsyncSession,
+    student_fullname: str,
+    teacher_fullname: str,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> list[str]:
+    student_ids = await dimensions.ids(session, Student.fullname, student_fullname)
+    teacher_ids = await dimensions.ids(session, Teacher.fullname, teacher_fullname)
+    bounds, params = date_bounds(date_from, date_to)
+    result = await session.execute(
+        courses_for_student_stmt(bounds, by_teacher=True),
+        {**params, "student_ids": student_ids, "teacher_ids": teacher_ids},
+    )
+    return list(result.scalars())
+
+
+def grades_in_group_for_subject_page_stmt(
+    group_name: str,
+    subject_name: str,
+    limit: int,
+    after: Optional[tuple] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    lateral: bool = True,
+) -> Select[tuple[str, int, datetime.datetime, int, int]]:
+    """Rows of query 7 following the key `after` (fullname, student id,
+    date_received, grade id), plus the student and grade ids of each row.
+
+    With `lateral` (Postgres), students are read in key order from
+    ix_students_group_id_fullname_id and each one's grades are looked up
+    with a LATERAL subquery, so reading stops after `limit` rows. A plain
+    join lets the planner hash the whole group and sort it for every page.
+
+    Names are looked up with subqueries, not with the cached ids of
+    src/db/lookup.py: given constant ids, Postgres re-plans the statement for
+    every page, and planning the LATERAL over all the grades partitions
+    costs several times more than executing it.
+    """
+    group_ids = select(Group.id).filter(Group.name == group_name)
+    subject_ids = select(Subject.id).filter(Subject.name == subject_name)
+    key = (Student.fullname, Student.id, Grade.date_received, Grade.id)
+    if not lateral:
+        stmt = grades_in_group_for_subject_stmt(
+            group_ids, subject_ids, date_from, date_to
+        ).add_columns(Student.id, Grade.id)
+        if after is not None:
+            stmt = stmt.filter(tuple_(*key) > after)
+        return stmt.limit(limit)
+
+    students = select(Student.id, Student.fullname).filter(
+        # Group names are unique; a constant group_id lets the index
+        # provide the (fullname, id) order
+        Student.group_id
+        == group_ids.scalar_subquery()
+    )
+    if after is not None:
+        students = students.filter(
+            tuple_(Student.fullname, Student.id) >= tuple(after[:2])
+        )
+    students = students.subquery("group_students")
+    grades = select(Grade.id, Grade.grade, Grade.date_received).filter(
+        Grade.student_id == students.c.id,
+        Grade.subject_id.in_(subject_ids),
+        *date_received_in(date_from, date_to),
+    )
+    if after is not None:
+        grades = grades.filter(
+            tuple_(students.c.fullname, students.c.id, Grade.date_received, Grade.id)
+            > after
+        )
+    grades = (
+        grades.order_by(Grade.date_received, Grade.id)
+        .limit(limit)
+        .lateral("student_grades")
+    )
+    return (
+        select(
+            students.c.fullname,
+            grades.c.grade,
+            grades.c.date_received,
+            students.c.id,
+            grades.c.id,
+        )
+        .select_from(students)
+        .join(grades, true())
+        .order_by(
+            students.c.fullname, students.c.id, grades.c.date_received, grades.c.id
+        )
+        .limit(limit)
+    )
+
+
+@tag_query
+async def page_7_grades_in_group_for_subject(
+    session: AsyncSession,
+    group_name: str,
+    subject_name: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Page[StudentGrade]:
+    """One page of query 7; pass the returned next_cursor to get the next."""
+    after = None if cursor is None else decode_cursor("page_7", cursor, 4)
+    stmt = grades_in_group_for_subject_page_stmt(
+        group_name,
+        subject_name,
+        check_page_size(limit) + 1,
+        after,
+        date_from,
+        date_to,
+        lateral=session.get_bind().dialect.name == "postgresql",
+    )
+    rows = (await session.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        fullname, _, date_received, student_id, grade_id = rows[-1]
+        next_cursor = encode_cursor(
+            "page_7", (fullname, student_id, date_received, grade_id)
+        )
+    return Page([StudentGrade._make(row[:3]) for row in rows], next_cursor)
+
+
+def _rank_over(partition_by, average, tie_breaker, ties: bool):
+    """RANK() gives equal averages the same rank, so a top N keeps everyone
+    tied for place N; ROW_NUMBER() cuts at exactly N, breaking ties by
+    `tie_breaker`."""
+    if ties:
+        return func.rank().over(partition_by=partition_by, order_by=average.desc())
+    return func.row_number().over(
+        partition_by=partition_by, order_by=(average.desc(), tie_breaker)
+    )
+
+
+@functools.cache
+def top_students_per_subject_stmt(
+    ties: bool,
+) -> Select[tuple[str, int, str, Decimal]]:
+    average = student_subject_average()
+    # Served in window order by ix_grade_aggregates_subject_id_avg_grade
+    ranked = select(
+        GradeAggregate.subject_id,
+        GradeAggregate.student_id,
+        average.label("avg_grade"),
+        _rank_over(
+            GradeAggregate.subject_id, average, GradeAggregate.student_id, ties
+        ).label("rank"),
+    ).subquery("ranked")
+    return (
+        select(Subject.name, ranked.c.rank, Student.fullname, ranked.c.avg_grade)
+        .select_from(ranked)
+        .join(Subject, Subject.id == ranked.c.subject_id)
+        .join(Student, Student.id == ranked.c.student_id)
+        .filter(ranked.c.rank <= LIMIT)
+        .order_by(Subject.name, Subject.id, ranked.c.rank, Student.fullname)
+    )
+
+
+@query_cache.cached(GradeAggregate, Student, Subject)
+@tag_query
+async def fetch_11_top_students_per_subject(
+    session: AsyncSession, limit: int = 3, ties: bool = True
+) -> list[SubjectRank]:
+    """The `limit` best students of every subject, in one statement."""
+    result = await session.execute(
+        top_students_per_subject_stmt(ties), {"limit": limit}
+    )
+    return list(map(SubjectRank._make, result.tuples()))
+
+
+@functools.cache
+def top_students_per_group_stmt(ties: bool) -> Select[tuple[str, int, str, Decimal]]:
+    average = average_grade()
+    # Windows are computed after GROUP BY, over the per-student averages
+    ranked = (
+        select(
+            Student.group_id,
+            Student.fullname,
+            average.label("avg_grade"),
+            _rank_over(Student.group_id, average, Student.id, ties).label("rank"),
+        )
+        .select_from(GradeAggregate)
+        .join(Student)
+        .group_by(Student.id)
+        .subquery("ranked")
+    )
+    return (
+        select(Group.name, ranked.c.rank, ranked.c.fullname, ranked.c.avg_grade)
+        .select_from(ranked)
+        .join(Group, Group.id == ranked.c.group_id)
+        .filter(ranked.c.rank <= LIMIT)
+        .order_by(Group.name, ranked.c.rank, ranked.c.fullname)
+    )
+
+
+@query_cache.cached(GradeAggregate, Student, Group)
+@tag_query
+async def fetch_12_top_students_per_group(
+    session: AsyncSession, limit: int = 3, ties: bool = True
+) -> list[GroupRank]:
+    """The `limit` students of every group with the best average over all
+    their subjects, in one statement."""
+    result = await session.execute(top_students_per_group_stmt(ties), {"limit": limit})
+    return list(map(GroupRank._make, result.tuples()))
+
+
+# Batched variants of the per-teacher and per-student queries. Every name
+# asked for is a key of the result, with the same value the single-name
+# query returns for it ([] or None when nothing matches).
+def _chunks(keys: Iterable, size: int = LOOKUP_CHUNK_SIZE) -> Iterator[list]:
+    keys = list(dict.fromkeys(keys))
+    for start in range(0, len(keys), size):
+        yield keys[start : start + size]
+
+
+@tag_query
+async def fetch_5_courses_by_teachers(
+    session: AsyncSession, teacher_fullnames: Iterable[str]
+) -> dict[str, list[str]]:
+    courses = {name: [] for name in teacher_fullnames}
+    for names in _chunks(courses):
+        stmt = (
+            select(Teacher.fullname, Subject.name)
+            .join(Teacher)
+            .filter(Teacher.fullname.in_(names))
+            .order_by(Teacher.fullname, Subject.id)
+        )
+        for teacher, subject in await session.execute(stmt):
+            courses[teacher].append(subject)
+    return courses
+
+
+@tag_query
+async def fetch_8_avg_grade_by_teachers(
+    session: AsyncSession,
+    teacher_fullnames: Iterable[str],
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> dict[str, Optional[Decimal]]:
+    averages = dict.fromkeys(teacher_fullnames)
+    source, average, conditions = grade_average_source(date_from, date_to)
+    for names in _chunks(averages):
+        stmt = (
+            select(Teacher.fullname, average)
+            .select_from(source)
+            .join(Subject)
+            .join(Teacher)
+            .filter(Teacher.fullname.in_(names), *conditions)
+            .group_by(Teacher.fullname)
+        )
+        averages.update((await session.execute(stmt)).tuples().all())
+    return averages
+
+
+@tag_query
+async def fetch_9_courses_for_students(
+    session: AsyncSession,
+    student_fullnames: Iterable[str],
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> dict[str, list[str]]:
+    courses = {name: [] for name in student_fullnames}
+    for names in _chunks(courses):
+        stmt = (
+            select(Student.fullname, Subject.name)
+            .distinct()
+            .select_from(Grade)
+            .join(Subject)
+            .join(Student)
+            .filter(Student.fullname.in_(names), *date_received_in(date_from, date_to))
+            .order_by(Student.fullname, Subject.name)
+        )
+        for student, subject in await session.execute(stmt):
+            courses[student].append(subject)
+    return courses
+
+
+@tag_query
+async def fetch_10_courses_for_students_by_teachers(
+    session: AsyncSession,
+    pairs: Iterable[tuple[str, str]],
+    *,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> dict[tuple[str, str], list[str]]:
+    """Keyed by (student_fullname, teacher_fullname)."""
+    courses = {pair: [] for pair in pairs}
+    for chunk in _chunks(courses):
+        # Filtered on (student, teacher) row values: an IN on each name
+        # would also match the cross combinations
+        stmt = (
+            select(Student.fullname, Teacher.fullname, Subject.name)
+            .distinct()
+            .select_from(Grade)
+            .join(Subject)
+            .join(Student)
+            .join(Teacher)
+            .filter(
+                tuple_(Student.fullname, Teacher.fullname).in_(chunk),
+                *date_received_in(date_from, date_to),
+            )
+            .order_by(Student.fullname, Teacher.fullname, Subject.name)
+        )
+        for student, teacher, subject in await session.execute(stmt):
+            courses[student, teacher].append(subject)
+    return courses
+
+
+# Object graphs, each loaded with a profile of src/db/loading.py in a fixed
+# number of statements (checked by src/benchmarks/loading.py). Not cached:
+# the objects belong to the session.
+GROUP_ROSTER_STMT = apply_profile(
+    select(Group).filter(Group.name == bindparam("group_name")), GROUP_ROSTER
+)
+STUDENT_REPORT_STMT = apply_profile(
+    select(Student).filter(Student.id == bindparam("student_id")), STUDENT_REPORT
+)
+TEACHER_SUBJECTS_STMT = apply_profile(
+    select(Teacher).filter(Teacher.id == bindparam("teacher_id")), TEACHER_SUBJECTS
+)
+SUBJECT_GRADEBOOK_STMT = apply_profile(
+    select(Subject).filter(Subject.id == bindparam("subject_id")), SUBJECT_GRADEBOOK
+)
+GRADE_DETAILS_STMT = apply_profile(
+    select(Grade)
+    .filter(Grade.id.in_(bindparam("grade_ids", expanding=True)))
+    .order_by(Grade.id),
+    GRADE_DETAILS,
+)
+
+
+@tag_query
+async def load_group_roster(session: AsyncSession, group_name: str) -> Optional[Group]:
+    """The group with its students."""
+    result = await session.execute(GROUP_ROSTER_STMT, {"group_name": group_name})
+    return result.scalar_one_or_none()
+
+
+@tag_query
+async def load_student_report(
+    session: AsyncSession, student_id: int
+) -> Optional[Student]:
+    """The student with their group and their grades with the subjects."""
+    result = await session.execute(STUDENT_REPORT_STMT, {"student_id": student_id})
+    return result.scalar_one_or_none()
+
+
+@tag_query
+async def load_teacher_subjects(
+    session: AsyncSession, teacher_id: int
+) -> Optional[Teacher]:
+    """The teacher with the subjects they teach."""
+    result = await session.execute(TEACHER_SUBJECTS_STMT, {"teacher_id": teacher_id})
+    return result.scalar_one_or_none()
+
+
+@tag_query
+async def load_subject_gradebook(
+    session: AsyncSession, subject_id: int
+) -> Optional[Subject]:
+    """The subject with its teacher and its grades with the students."""
+    result = await session.execute(SUBJECT_GRADEBOOK_STMT, {"subject_id": subject_id})
+    return result.scalar_one_or_none()
+
+
+@tag_query
+async def load_grade_details(
+    session: AsyncSession, grade_ids: Sequence[int]
+) -> list[Grade]:
+    """The grades, in id order, with their students and subjects."""
+    result = await session.execute(GRADE_DETAILS_STMT, {"grade_ids": list(grade_ids)})
+    return list(result.scalars())
+
+
+# One row with an example value per parameter, fetched in a single round trip.
+# Ordered by id so the examples do not depend on the physical row order.
+EXAMPLE_DATA_STMT = select(
+    select(Subject.name)
+    .order_by(Subject.id)
+    .limit(1)
+    .scalar_subquery()
+    .label("subject_name"),
+    select(Group.name)
+    .order_by(Group.id)
+    .limit(1)
+    .scalar_subquery()
+    .label("group_name"),
+    select(Teacher.fullname)
+    .order_by(Teacher.id)
+    .limit(1)
+    .scalar_subquery()
+    .label("teacher_fullname"),
+    select(Student.fullname)
+    .order_by(Student.id)
+    .limit(1)
+    .scalar_subquery()
+    .label("student_fullname"),
+)
+
+
+@query_cache.cached(Subject, Group, Teacher, Student)
+@tag_query
+async def fetch_example_row(session: AsyncSession) -> ExampleRow:
+    result = await session.execute(EXAMPLE_DATA_STMT)
+    return ExampleRow._make(result.tuples().one())
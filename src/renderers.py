@@ -0,0 +1,263 @@
+"""Presentation of the demo query results (see src/queries.py for the data).
+
+A renderer gets each result with the parameters it was queried with.
+Results of streamed queries arrive in batches through start_stream(),
+stream_rows() and end_stream(); `render_stream()` drives that sequence.
+"""
+
+import datetime
+import json
+import sys
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Protocol, TextIO
+
+
+class Renderer(Protocol):
+    def message(self, text: str) -> None:
+        """Progress and diagnostics that are not a query result."""
+
+    def render(self, query: int, result: Any, *params: Any) -> None:
+        """A fully loaded result of query number `query`."""
+
+    def start_stream(self, query: int, *params: Any) -> None: ...
+
+    def stream_rows(self, query: int, rows: list, offset: int, *params: Any) -> None:
+        """A batch of rows; `offset` rows were rendered before it."""
+
+    def end_stream(self, query: int, count: int, *params: Any) -> None: ...
+
+
+async def render_stream(
+    renderer: Renderer, query: int, batches: AsyncIterator[list], *params: Any
+) -> int:
+    """Render `batches` as they arrive; returns the number of rows."""
+    renderer.start_stream(query, *params)
+    count = 0
+    async for rows in batches:
+        renderer.stream_rows(query, rows, count, *params)
+        count += len(rows)
+    renderer.end_stream(query, count, *params)
+    return count
+
+
+def _format_date(value) -> str:
+    return value.strftime("%Y-%m-%d") if value else "N/A"
+
+
+class TextRenderer:
+    """The human-readable console output of `python -m src.my_select`."""
+
+    def __init__(self, out: TextIO = None):
+        self.out = out
+
+    def _print(self, text: str = ""):
+        print(text, file=self.out or sys.stdout)
+
+    def message(self, text: str):
+        self._print(text)
+
+    def render(self, query: int, result: Any, *params: Any):
+        getattr(self, f"query_{query}")(result, *params)
+
+    # Queries listed one row per line, so they can be streamed:
+    # number -> (heading, intro, row format, message when empty)
+    def _listing(
+        self, query: int, *params: Any
+    ) -> tuple[str, str, Callable[[Any], str], str]:
+        if query == 6:
+            (group_name,) = params
+            return (
+                f"\n--- Query 6: Students in group '{group_name}' ---",
+                f"Students in group '{group_name}':",
+                lambda s_name: f"- {s_name}",
+                f"No students found in group '{group_name}' or group not found.",
+            )
+        if query == 7:
+            group_name, subject_name = params
+            return (
+                f"\n--- Query 7: Grades of students in group '{group_name}' for subject '{subject_name}' ---",
+                f"Grades in group '{group_name}' for subject '{subject_name}':",
+                lambda row: f"- Student: {row.fullname}, Grade: {row.grade}, Date: {_format_date(row.date_received)}",
+                f"No grades found for group '{group_name}' in subject '{subject_name}'.",
+            )
+        raise ValueError(f"Query {query} is not rendered as a listing")
+
+    def start_stream(self, query: int, *params: Any):
+        self._print(self._listing(query, *params)[0])
+
+    def stream_rows(self, query: int, rows: list, offset: int, *params: Any):
+        _, intro, line, _ = self._listing(query, *params)
+        if rows and offset == 0:
+            self._print(intro)
+        for row in rows:
+            self._print(line(row))
+
+    def end_stream(self, query: int, count: int, *params: Any):
+        if count == 0:
+            self._print(self._listing(query, *params)[3])
+
+    def _render_listing(self, query: int, rows: list, *params: Any):
+        self.start_stream(query, *params)
+        self.stream_rows(query, rows, 0, *params)
+        self.end_stream(query, len(rows), *params)
+
+    def query_1(self, students, limit: int = 5):
+        self._print(f"\n--- Query 1: Top {limit} students by average grade ---")
+        for student in students:
+            self._print(f"{student.fullname}: Average Grade = {student.avg_grade}")
+
+    def query_2(self, student, subject_name: str):
+        self._print(
+            f"\n--- Query 2: Student with highest average grade for subject '{subject_name}' ---"
+        )
+        if student:
+            self._print(
+                f"Student: {student.fullname}, Highest Avg Grade in {subject_name}: {student.avg_grade}"
+            )
+        else:
+            self._print(f"No student found or no grades for subject: {subject_name}")
+
+    def query_3(self, avg_grade, subject_name: str, group_name: str):
+        self._print(
+            f"\n--- Query 3: Average grade in group '{group_name}' for subject '{subject_name}' ---"
+        )
+        if avg_grade is not None:
+            self._print(
+                f"Average grade for group '{group_name}' in '{subject_name}': {avg_grade}"
+            )
+        else:
+            self._print(
+                f"No grades found for group '{group_name}' in subject '{subject_name}'."
+            )
+
+    def query_4(self, overall_avg):
+        self._print("\n--- Query 4: Overall average grade across all grades ---")
+        if overall_avg is not None:
+            self._print(f"Overall average grade: {overall_avg}")
+        else:
+            self._print("No grades found in the database.")
+
+    def query_5(self, courses, teacher_fullname: str):
+        self._print(
+            f"\n--- Query 5: Courses taught by teacher '{teacher_fullname}' ---"
+        )
+        if courses:
+            self._print(f"Teacher '{teacher_fullname}' teaches: {', '.join(courses)}")
+        else:
+            self._print(
+                f"No courses found for teacher '{teacher_fullname}' or teacher not found."
+            )
+
+    def query_6(self, students, group_name: str):
+        self._render_listing(6, students, group_name)
+
+    def query_7(self, grades_info, group_name: str, subject_name: str):
+        self._render_listing(7, grades_info, group_name, subject_name)
+
+    def query_8(self, avg_grade, teacher_fullname: str):
+        self._print(
+            f"\n--- Query 8: Average grade given by teacher '{teacher_fullname}' ---"
+        )
+        if avg_grade is not None:
+            self._print(f"Average grade given by '{teacher_fullname}': {avg_grade}")
+        else:
+            self._print(
+                f"No grades found for subjects taught by '{teacher_fullname}' or teacher not found."
+            )
+
+    def query_9(self, courses, student_fullname: str):
+        self._print(
+            f"\n--- Query 9: Courses attended by student '{student_fullname}' ---"
+        )
+        if courses:
+            self._print(
+                f"Student '{student_fullname}' attends (has grades in): {', '.join(courses)}"
+            )
+        else:
+            self._print(
+                f"No courses found for student '{student_fullname}' or student not found."
+            )
+
+    def query_10(self, courses, student_fullname: str, teacher_fullname: str):
+        self._print(
+            f"\n--- Query 10: Courses taught by '{teacher_fullname}' that '{student_fullname}' attends ---"
+        )
+        if courses:
+            self._print(
+                f"Student '{student_fullname}' attends courses by teacher '{teacher_fullname}': {', '.join(courses)}"
+            )
+        else:
+            self._print(
+                f"No such courses found for student '{student_fullname}' with teacher '{teacher_fullname}'."
+            )
+
+    def _leaderboards(self, rows, board: str):
+        current = None
+        for row in rows:
+            if row[0] != current:
+                current = row[0]
+                self._print(f"{board} '{current}':")
+            self._print(
+                f"  {row.rank}. {row.fullname}: Average Grade = {row.avg_grade}"
+            )
+
+    def query_11(self, rankings, limit: int = 3, ties: bool = True):
+        self._print(f"\n--- Query 11: Top {limit} students per subject ---")
+        if rankings:
+            self._leaderboards(rankings, "Subject")
+        else:
+            self._print("No grades found in the database.")
+
+    def query_12(self, rankings, limit: int = 3, ties: bool = True):
+        self._print(f"\n--- Query 12: Top {limit} students per group ---")
+        if rankings:
+            self._leaderboards(rankings, "Group")
+        else:
+            self._print("No grades found for students in groups.")
+
+
+def to_jsonable(value: Any) -> Any:
+    """Result rows as JSON-compatible values: named tuples become objects,
+    decimals strings (to keep their precision) and datetimes ISO 8601."""
+    if hasattr(value, "_asdict"):
+        return {key: to_jsonable(item) for key, item in value._asdict().items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+class JsonLinesRenderer:
+    """One JSON object per line: a result, or for streamed queries one per row
+    followed by a summary. Messages go to stderr to keep the output parseable.
+    """
+
+    def __init__(self, out: TextIO = None):
+        self.out = out
+
+    def _write(self, record: dict):
+        print(json.dumps(record), file=self.out or sys.stdout)
+
+    def message(self, text: str):
+        print(text.strip(), file=sys.stderr)
+
+    def render(self, query: int, result: Any, *params: Any):
+        self._write(
+            {"query": query, "params": list(params), "result": to_jsonable(result)}
+        )
+
+    def start_stream(self, query: int, *params: Any):
+        pass
+
+    def stream_rows(self, query: int, rows: list, offset: int, *params: Any):
+        for row in rows:
+            self._write({"query": query, "row": to_jsonable(row)})
+
+    def end_stream(self, query: int, count: int, *params: Any):
+        self._write({"query": query, "params": list(params), "rows": count})
+
+
+RENDERERS = {"text": TextRenderer, "json": JsonLinesRenderer}
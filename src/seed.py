@@ -1,26 +1,26 @@
+import argparse
 import asyncio
+import os
 import random
 import datetime
-from faker import Faker
 
-from src.db.session import AsyncSessionFactory, engine
+from src.db.aggregates import rebuild_grade_aggregates
+from src.db.partitions import ensure_grade_partitions
+from src.db.session import get_engine, get_session_factory
 from src.db.models import Student, Group, Teacher, Subject, Grade
+from src.seeding import SeedConfig, seed_data_bulk, seed_data_parallel
 
-fake = Faker()
-# Config for Seeding
-NUMBER_OF_STUDENTS = random.randint(30, 50)
-NUMBER_OF_GROUPS = 3
-NUMBER_OF_SUBJECTS = random.randint(5, 8)
-NUMBER_OF_TEACHERS = random.randint(3, 5)
-MAX_GRADES_PER_STUDENT = 20
 
+async def seed_data(config: SeedConfig):
+    from faker import Faker  # slow to import, see src/seeding/generators.py
 
-async def seed_data():
-    async with AsyncSessionFactory() as session:
+    fake = Faker()
+    session_factory = get_session_factory()
+    async with session_factory() as session:
         async with session.begin():
             # Create Groups
             groups = []
-            for _ in range(1, NUMBER_OF_GROUPS + 1):
+            for _ in range(1, config.groups + 1):
                 group_name = f"{fake.word().capitalize()}{fake.word().capitalize()}-{random.randint(10,99)}"
                 group = Group(name=group_name)
                 groups.append(group)
@@ -30,7 +30,7 @@ async def seed_data():
 
             # Create Teachers
             teachers = []
-            for _ in range(NUMBER_OF_TEACHERS):
+            for _ in range(config.teachers):
                 teacher = Teacher(fullname=fake.name())
                 teachers.append(teacher)
             session.add_all(teachers)
@@ -45,7 +45,7 @@ async def seed_data():
                 )
             else:
                 subject_names = set()
-                while len(subjects) < NUMBER_OF_SUBJECTS:
+                while len(subjects) < config.subjects:
                     name = fake.catch_phrase().capitalize()
                     if name not in subject_names:
                         subject_names.add(name)
@@ -62,7 +62,7 @@ async def seed_data():
                     "No groups available to assign to students. Skipping student creation."
                 )
             else:
-                for _ in range(NUMBER_OF_STUDENTS):
+                for _ in range(config.students):
                     student = Student(fullname=fake.name(), group=random.choice(groups))
                     students.append(student)
                 session.add_all(students)
@@ -74,7 +74,7 @@ async def seed_data():
             if students and subjects:
                 for student in students:
                     num_grades_for_this_student = random.randint(
-                        1, MAX_GRADES_PER_STUDENT
+                        1, config.max_grades_per_student
                     )
                     for _ in range(num_grades_for_this_student):
                         selected_subject = random.choice(subjects)
@@ -105,7 +105,7 @@ async def seed_data():
         print("Seeding transaction complete (committed or rolled back).")
 
 
-async def run_seeding():
+async def run_seeding(config: SeedConfig, mode: str = "orm", workers: int = 1):
     """Main function to run the seeding process and clean up engine resources."""
     # Clear existing data for future seeding
     # async with AsyncSessionFactory() as session:
@@ -119,12 +119,83 @@ async def run_seeding():
     #         await session.execute(text("TRUNCATE TABLE groups RESTART IDENTITY CASCADE;"))
     #     print("Old data cleared.")
 
-    await seed_data()
+    engine = get_engine()
+    if mode == "parallel" and engine.dialect.name != "postgresql":
+        print("Parallel seeding needs PostgreSQL, falling back to bulk mode.")
+        mode = "bulk"
+
+    # Monthly grades partitions covering the generated dates (Postgres only)
+    async with engine.begin() as conn:
+        await ensure_grade_partitions(conn, config.start_date, config.end_date)
+
+    if mode == "parallel":
+        for stats in await seed_data_parallel(engine, config, workers):
+            print(stats)
+    elif mode == "bulk":
+        for stats in await seed_data_bulk(engine, config):
+            print(stats)
+    else:
+        await seed_data(config)
+
+    if engine.dialect.name != "postgresql":
+        # Only Postgres maintains grade_aggregates with triggers
+        async with engine.begin() as conn:
+            await rebuild_grade_aggregates(conn)
     print("Data seeding function finished.")
 
     await engine.dispose()
 
 
+def parse_args() -> argparse.Namespace:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(
+        description="Populate the database with fake data."
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("orm", "bulk", "parallel"),
+        default="orm",
+        help=(
+            "'orm' adds ORM objects in one transaction, 'bulk' streams rows in chunks, "
+            "'parallel' runs the bulk load from several worker processes."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for the parallel mode.",
+    )
+    parser.add_argument("--students", type=int, default=defaults.students)
+    parser.add_argument("--groups", type=int, default=defaults.groups)
+    parser.add_argument("--subjects", type=int, default=defaults.subjects)
+    parser.add_argument("--teachers", type=int, default=defaults.teachers)
+    parser.add_argument(
+        "--max-grades-per-student", type=int, default=defaults.max_grades_per_student
+    )
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Make bulk-generated data reproducible."
+    )
+    parser.add_argument(
+        "--grade-distribution",
+        choices=("uniform", "normal"),
+        default=defaults.grade_distribution,
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(run_seeding())
+    args = parse_args()
+    config = SeedConfig(
+        students=args.students,
+        groups=args.groups,
+        subjects=args.subjects,
+        teachers=args.teachers,
+        max_grades_per_student=args.max_grades_per_student,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        grade_distribution=args.grade_distribution,
+    )
+    asyncio.run(run_seeding(config, args.mode, args.workers))
     print("Seeder script finished.")
@@ -0,0 +1,20 @@
+from .config import SeedConfig
+from .loader import LoadStats, load_rows, reserve_ids
+from .generators import ColumnBatch, ColumnGenerator, NamePool, to_records
+from .bulk import seed_data_bulk
+from .parallel import Partition, partition_students, seed_data_parallel
+
+__all__ = [
+    "SeedConfig",
+    "LoadStats",
+    "load_rows",
+    "reserve_ids",
+    "ColumnBatch",
+    "ColumnGenerator",
+    "NamePool",
+    "to_records",
+    "seed_data_bulk",
+    "Partition",
+    "partition_students",
+    "seed_data_parallel",
+]
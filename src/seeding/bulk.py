@@ -0,0 +1,136 @@
+from typing import Iterator, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.db.models import Grade, Group, Student, Subject, Teacher
+from .config import SeedConfig
+from .generators import ColumnGenerator, to_records
+from .loader import LoadStats, load_rows, reserve_ids
+
+STUDENT_COLUMNS = ("id", "fullname", "group_id")
+GRADE_COLUMNS = ("student_id", "subject_id", "grade", "date_received")
+
+
+def _chunked(rows: Sequence[tuple], chunk_size: int) -> Iterator[Sequence[tuple]]:
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start : start + chunk_size]
+
+
+def _unique_values(factory, count: int) -> list[str]:
+    values: set[str] = set()
+    while len(values) < count:
+        values.add(factory())
+    return sorted(values)
+
+
+def student_chunks(
+    generator: ColumnGenerator, first_id: int, count: int, group_ids: Sequence[int]
+) -> Iterator[list[tuple]]:
+    chunk_size = generator.config.chunk_size
+    for start in range(first_id, first_id + count, chunk_size):
+        student_ids = np.arange(start, min(start + chunk_size, first_id + count))
+        yield to_records(generator.students(student_ids, group_ids), STUDENT_COLUMNS)
+
+
+def grade_chunks(
+    generator: ColumnGenerator, first_id: int, count: int, subject_ids: Sequence[int]
+) -> Iterator[list[tuple]]:
+    for student_ids in generator.student_blocks(first_id, count):
+        yield to_records(generator.grades(student_ids, subject_ids), GRADE_COLUMNS)
+
+
+async def seed_dimensions(
+    engine: AsyncEngine, config: SeedConfig, generator: ColumnGenerator
+) -> tuple[list[int], list[int], list[LoadStats]]:
+    """Load groups, teachers and subjects; returns group ids, subject ids and stats."""
+    from faker import Faker  # slow to import, see NamePool
+
+    fake = Faker()
+    fake.seed_instance(config.seed)
+    rng = generator.rng
+    stats = []
+
+    async with engine.begin() as conn:
+        first_id = await reserve_ids(conn, Group.__table__, config.groups)
+        group_ids = list(range(first_id, first_id + config.groups))
+        group_names = _unique_values(
+            lambda: f"{fake.word().capitalize()}{fake.word().capitalize()}-{fake.random_int(10, 99)}",
+            config.groups,
+        )
+        stats.append(
+            await load_rows(
+                conn,
+                Group.__table__,
+                ("id", "name"),
+                _chunked(list(zip(group_ids, group_names)), config.chunk_size),
+            )
+        )
+
+    async with engine.begin() as conn:
+        first_id = await reserve_ids(conn, Teacher.__table__, config.teachers)
+        teacher_ids = list(range(first_id, first_id + config.teachers))
+        teacher_names = generator.names(config.teachers).tolist()
+        stats.append(
+            await load_rows(
+                conn,
+                Teacher.__table__,
+                ("id", "fullname"),
+                _chunked(list(zip(teacher_ids, teacher_names)), config.chunk_size),
+            )
+        )
+
+    async with engine.begin() as conn:
+        first_id = await reserve_ids(conn, Subject.__table__, config.subjects)
+        subject_ids = list(range(first_id, first_id + config.subjects))
+        subject_names = _unique_values(
+            lambda: fake.catch_phrase().capitalize(), config.subjects
+        )
+        subject_teachers = rng.choice(teacher_ids, size=config.subjects).tolist()
+        stats.append(
+            await load_rows(
+                conn,
+                Subject.__table__,
+                ("id", "name", "teacher_id"),
+                _chunked(
+                    list(zip(subject_ids, subject_names, subject_teachers)),
+                    config.chunk_size,
+                ),
+            )
+        )
+
+    return group_ids, subject_ids, stats
+
+
+async def seed_data_bulk(engine: AsyncEngine, config: SeedConfig) -> list[LoadStats]:
+    """Seed the database by streaming generated rows in chunks.
+
+    Rows are written with COPY on Postgres and executemany elsewhere, each
+    table in its own transaction. Primary keys are reserved up front so
+    students and grades can reference them without a round trip per row.
+    """
+    generator = ColumnGenerator(config)
+    group_ids, subject_ids, stats = await seed_dimensions(engine, config, generator)
+
+    async with engine.begin() as conn:
+        first_id = await reserve_ids(conn, Student.__table__, config.students)
+        stats.append(
+            await load_rows(
+                conn,
+                Student.__table__,
+                STUDENT_COLUMNS,
+                student_chunks(generator, first_id, config.students, group_ids),
+            )
+        )
+
+    async with engine.begin() as conn:
+        stats.append(
+            await load_rows(
+                conn,
+                Grade.__table__,
+                GRADE_COLUMNS,
+                grade_chunks(generator, first_id, config.students, subject_ids),
+            )
+        )
+
+    return stats
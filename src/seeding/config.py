@@ -0,0 +1,47 @@
+import datetime
+import random
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+
+def _today_utc() -> datetime.datetime:
+    """Midnight of the current UTC day, as a naive datetime."""
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@dataclass
+class SeedConfig:
+    """Sizes and value distributions of the dataset produced by the seeders."""
+
+    students: int = field(default_factory=lambda: random.randint(30, 50))
+    groups: int = 3
+    subjects: int = field(default_factory=lambda: random.randint(5, 8))
+    teachers: int = field(default_factory=lambda: random.randint(3, 5))
+    max_grades_per_student: int = 20
+    # Rows sent to the database per COPY / executemany round trip (bulk mode only)
+    chunk_size: int = 50_000
+
+    # Generator settings (bulk mode only). The same seed produces the same data.
+    seed: Optional[int] = None
+    grade_min: int = 60
+    grade_max: int = 100
+    # "uniform" over [grade_min, grade_max], or "normal" clipped to that range
+    grade_distribution: Literal["uniform", "normal"] = "uniform"
+    grade_mean: float = 82.0
+    grade_stddev: float = 10.0
+    # Grades are spread over `history_days` days before `end_date`
+    history_days: int = 730
+    end_date: datetime.datetime = field(default_factory=_today_utc)
+    # Number of distinct fake names shared by students and teachers
+    name_pool_size: int = 10_000
+
+    @property
+    def expected_grades(self) -> int:
+        """Average number of grades produced for this config."""
+        return self.students * (self.max_grades_per_student + 1) // 2
+
+    @property
+    def start_date(self) -> datetime.datetime:
+        """Earliest possible date of a generated grade."""
+        return self.end_date - datetime.timedelta(days=self.history_days)
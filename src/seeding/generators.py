@@ -0,0 +1,109 @@
+import datetime
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from .config import SeedConfig
+
+# A batch of generated rows, one array per column
+ColumnBatch = dict[str, np.ndarray]
+
+
+def to_records(batch: ColumnBatch, columns: Sequence[str]) -> list[tuple]:
+    """Turn a column batch into the row tuples expected by `load_rows`."""
+    return list(zip(*(batch[column].tolist() for column in columns)))
+
+
+class NamePool:
+    """Fake full names generated once and sampled by index afterwards.
+
+    Faker costs tens of microseconds per name, so instead of calling it for
+    every student and teacher a fixed pool is built up front and reused.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        # Imported here: Faker takes longer to import than the rest of the
+        # seeding package and nothing else needs it
+        from faker import Faker
+
+        fake = Faker()
+        fake.seed_instance(seed)
+        self.names = np.array([fake.name() for _ in range(size)], dtype=object)
+
+    def __len__(self):
+        return len(self.names)
+
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        return self.names[rng.integers(0, len(self.names), size=count)]
+
+
+class ColumnGenerator:
+    """Vectorized generator of student and grade columns.
+
+    Every value is drawn from one `numpy.random.Generator`, so the whole
+    dataset is reproducible from `config.seed`. Generators created with
+    different `stream` numbers draw independent values from the same seed,
+    which lets parallel workers generate disjoint parts of one dataset.
+    """
+
+    def __init__(
+        self,
+        config: SeedConfig,
+        name_pool: Optional[NamePool] = None,
+        stream: int = 0,
+    ):
+        self.config = config
+        self.rng = np.random.default_rng(
+            np.random.SeedSequence(config.seed, spawn_key=(stream,) if stream else ())
+        )
+        self.name_pool = name_pool or NamePool(config.name_pool_size, config.seed)
+
+    def names(self, count: int) -> np.ndarray:
+        return self.name_pool.sample(self.rng, count)
+
+    def students(
+        self, student_ids: np.ndarray, group_ids: Sequence[int]
+    ) -> ColumnBatch:
+        return {
+            "id": student_ids,
+            "fullname": self.names(len(student_ids)),
+            "group_id": self.rng.choice(np.asarray(group_ids), size=len(student_ids)),
+        }
+
+    def grades(
+        self, student_ids: np.ndarray, subject_ids: Sequence[int]
+    ) -> ColumnBatch:
+        config = self.config
+        per_student = self.rng.integers(
+            1, config.max_grades_per_student + 1, size=len(student_ids)
+        )
+        total = int(per_student.sum())
+
+        if config.grade_distribution == "normal":
+            grades = np.clip(
+                np.rint(self.rng.normal(config.grade_mean, config.grade_stddev, total)),
+                config.grade_min,
+                config.grade_max,
+            ).astype(np.int64)
+        else:
+            grades = self.rng.integers(
+                config.grade_min, config.grade_max + 1, size=total
+            )
+
+        history = np.timedelta64(datetime.timedelta(days=config.history_days), "us")
+        offsets = self.rng.integers(0, history.astype(np.int64), size=total)
+        dates = np.datetime64(config.end_date, "us") - offsets.astype("timedelta64[us]")
+
+        return {
+            "student_id": np.repeat(student_ids, per_student),
+            "subject_id": self.rng.choice(np.asarray(subject_ids), size=total),
+            "grade": grades,
+            "date_received": dates,
+        }
+
+    def student_blocks(self, first_id: int, count: int) -> Iterator[np.ndarray]:
+        """Split a student id range into blocks yielding about one chunk of grades each."""
+        average_grades = (self.config.max_grades_per_student + 1) / 2
+        block_size = max(1, int(self.config.chunk_size / average_grades))
+        for start in range(first_id, first_id + count, block_size):
+            yield np.arange(start, min(start + block_size, first_id + count))
@@ -0,0 +1,91 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.db.query_cache import record_write
+
+
+@dataclass
+class LoadStats:
+    """Throughput of a single bulk load into one table."""
+
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def __str__(self):
+        return (
+            f"Loaded {self.rows:,} rows into '{self.table}' in {self.seconds:.2f}s "
+            f"({self.rows_per_second:,.0f} rows/sec)."
+        )
+
+
+def uses_copy(conn: AsyncConnection) -> bool:
+    """COPY is only available when talking to Postgres through asyncpg."""
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg"
+
+
+async def load_rows(
+    conn: AsyncConnection,
+    table: Table,
+    columns: Sequence[str],
+    chunks: Iterable[Sequence[tuple]],
+) -> LoadStats:
+    """Stream chunks of row tuples into `table`.
+
+    On asyncpg every chunk goes through `copy_records_to_table`, everywhere
+    else through a Core `insert()` executemany. Only one chunk is held in
+    memory at a time, so callers should pass a generator. Either way the
+    cached reads of `table` are invalidated.
+    """
+    started = time.perf_counter()
+    total = 0
+
+    if uses_copy(conn):
+        raw_connection = await conn.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        for chunk in chunks:
+            await driver_connection.copy_records_to_table(
+                table.name,
+                records=chunk,
+                columns=list(columns),
+                schema_name=table.schema,
+            )
+            total += len(chunk)
+        record_write(conn, table.name)
+    else:
+        stmt = insert(table)
+        for chunk in chunks:
+            await conn.execute(stmt, [dict(zip(columns, row)) for row in chunk])
+            total += len(chunk)
+
+    return LoadStats(table.name, total, time.perf_counter() - started)
+
+
+async def reserve_ids(conn: AsyncConnection, table: Table, count: int) -> int:
+    """Reserve `count` consecutive primary keys of `table`, returns the first one.
+
+    Rows loaded with explicit ids from the reserved range can be referenced by
+    other tables before they are written, without reading the ids back.
+    """
+    if count <= 0:
+        raise ValueError("count must be positive")
+    if conn.dialect.name == "postgresql":
+        result = await conn.execute(
+            text(
+                "SELECT setval(seq, nextval(seq) + :count - 1) "
+                "FROM pg_get_serial_sequence(:table, 'id') AS seq"
+            ),
+            {"table": table.name, "count": count},
+        )
+        return result.scalar_one() - count + 1
+
+    result = await conn.execute(select(func.coalesce(func.max(table.c.id), 0)))
+    return result.scalar_one() + 1
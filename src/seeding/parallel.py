@@ -0,0 +1,219 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from src.db.models import Grade, Student
+from .bulk import (
+    GRADE_COLUMNS,
+    STUDENT_COLUMNS,
+    grade_chunks,
+    seed_dimensions,
+    student_chunks,
+)
+from .config import SeedConfig
+from .generators import ColumnGenerator
+from .loader import LoadStats, load_rows, reserve_ids
+
+# Tables written by the workers; their secondary indexes and foreign keys are
+# dropped for the duration of the load and rebuilt once afterwards.
+PARTITIONED_TABLES = (Student.__tablename__, Grade.__tablename__)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A contiguous range of student ids loaded by one worker, grades included."""
+
+    index: int
+    first_student_id: int
+    students: int
+
+
+@dataclass
+class DeferredDDL:
+    """Indexes and foreign keys dropped before a parallel load."""
+
+    indexes: list[tuple[str, str]]
+    foreign_keys: list[tuple[str, str, str]]
+
+
+def partition_students(first_id: int, count: int, partitions: int) -> list[Partition]:
+    """Split `count` student ids starting at `first_id` into near-equal ranges."""
+    partitions = max(1, min(partitions, count))
+    size, remainder = divmod(count, partitions)
+    result = []
+    start = first_id
+    for index in range(partitions):
+        students = size + (1 if index < remainder else 0)
+        result.append(Partition(index, start, students))
+        start += students
+    return result
+
+
+async def drop_deferred_ddl(
+    conn: AsyncConnection, tables: Sequence[str]
+) -> DeferredDDL:
+    """Drop secondary indexes and foreign keys of `tables`, returning their DDL.
+
+    Primary keys and unique constraints are kept. The definitions are read
+    from the Postgres catalog, so they are recreated exactly as they were.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+            "FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid::regclass::text = ANY(:tables)"
+        ),
+        {"tables": list(tables)},
+    )
+    foreign_keys = [tuple(row) for row in result]
+
+    result = await conn.execute(
+        text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = ANY(:tables) "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE contype IN ('p', 'u'))"
+        ),
+        {"tables": list(tables)},
+    )
+    indexes = [tuple(row) for row in result]
+
+    for table, name, _ in foreign_keys:
+        await conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    for name, _ in indexes:
+        await conn.execute(text(f'DROP INDEX "{name}"'))
+
+    return DeferredDDL(indexes=indexes, foreign_keys=foreign_keys)
+
+
+async def restore_deferred_ddl(conn: AsyncConnection, ddl: DeferredDDL) -> None:
+    for _, definition in ddl.indexes:
+        # The catalog defines indexes of a partitioned table (grades) ON ONLY
+        # the parent; without ONLY they are built on every partition too.
+        await conn.execute(text(definition.replace(" ON ONLY ", " ON ", 1)))
+    for table, name, definition in ddl.foreign_keys:
+        await conn.execute(
+            text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+        )
+    for table in PARTITIONED_TABLES:
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def _load_partition(
+    database_url: str,
+    config: SeedConfig,
+    partition: Partition,
+    group_ids: list[int],
+    subject_ids: list[int],
+) -> list[LoadStats]:
+    engine = create_async_engine(database_url)
+    generator = ColumnGenerator(config, stream=partition.index + 1)
+    stats = []
+    try:
+        async with engine.begin() as conn:
+            stats.append(
+                await load_rows(
+                    conn,
+                    Student.__table__,
+                    STUDENT_COLUMNS,
+                    student_chunks(
+                        generator,
+                        partition.first_student_id,
+                        partition.students,
+                        group_ids,
+                    ),
+                )
+            )
+        async with engine.begin() as conn:
+            stats.append(
+                await load_rows(
+                    conn,
+                    Grade.__table__,
+                    GRADE_COLUMNS,
+                    grade_chunks(
+                        generator,
+                        partition.first_student_id,
+                        partition.students,
+                        subject_ids,
+                    ),
+                )
+            )
+    finally:
+        await engine.dispose()
+    return stats
+
+
+def _seed_partition(*args) -> list[LoadStats]:
+    """Worker process entry point, every worker runs its own loop and engine."""
+    return asyncio.run(_load_partition(*args))
+
+
+async def seed_data_parallel(
+    engine: AsyncEngine, config: SeedConfig, workers: int
+) -> list[LoadStats]:
+    """Seed students and grades from `workers` processes in parallel.
+
+    Dimension tables are loaded first from this process. Student ids are then
+    reserved in one block and split into one range per worker; each worker
+    generates and loads its students together with their grades. Indexes and
+    foreign keys of those tables are rebuilt once all workers are done.
+    """
+    database_url = engine.url.render_as_string(hide_password=False)
+    generator = ColumnGenerator(config)
+    group_ids, subject_ids, stats = await seed_dimensions(engine, config, generator)
+
+    async with engine.begin() as conn:
+        first_id = await reserve_ids(conn, Student.__table__, config.students)
+    partitions = partition_students(first_id, config.students, workers)
+
+    async with engine.begin() as conn:
+        deferred = await drop_deferred_ddl(conn, PARTITIONED_TABLES)
+
+    try:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(
+            max_workers=len(partitions), mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        pool,
+                        _seed_partition,
+                        database_url,
+                        config,
+                        partition,
+                        group_ids,
+                        subject_ids,
+                    )
+                    for partition in partitions
+                )
+            )
+        elapsed = time.perf_counter() - started
+        for partition, partition_stats in zip(partitions, results):
+            for partition_stat in partition_stats:
+                print(f"Partition {partition.index}: {partition_stat}")
+    finally:
+        rebuild_started = time.perf_counter()
+        async with engine.begin() as conn:
+            await restore_deferred_ddl(conn, deferred)
+        print(
+            f"Rebuilt {len(deferred.indexes)} indexes and {len(deferred.foreign_keys)} "
+            f"foreign keys in {time.perf_counter() - rebuild_started:.2f}s."
+        )
+
+    for table in PARTITIONED_TABLES:
+        rows = sum(
+            stat.rows
+            for partition_stats in results
+            for stat in partition_stats
+            if stat.table == table
+        )
+        stats.append(LoadStats(table, rows, elapsed))
+
+    return stats
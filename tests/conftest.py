@@ -0,0 +1,64 @@
+"""A small seeded in-memory SQLite database for the regression tests.
+
+The tests drive their coroutines with the `run` fixture, so they need
+neither Postgres nor an asyncio plugin for pytest.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from src.db.aggregates import rebuild_grade_aggregates
+from src.db.lookup import dimensions
+from src.db.models import metadata_obj
+from src.db.query_cache import query_cache
+from src.queries import fetch_example_row
+from src.seeding import SeedConfig, seed_data_bulk
+
+SEED_CONFIG = SeedConfig(
+    students=60, groups=3, subjects=6, teachers=3, max_grades_per_student=10, seed=1
+)
+
+
+@pytest.fixture(scope="module")
+def run():
+    """Runs a coroutine to completion; one event loop per test module."""
+    with asyncio.Runner() as runner:
+        yield runner.run
+
+
+@pytest.fixture(scope="module")
+def engine(run):
+    # One connection shared by every checkout, or each would get its own
+    # empty in-memory database
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata_obj.create_all)
+        await seed_data_bulk(engine, SEED_CONFIG)
+        async with engine.begin() as conn:
+            await rebuild_grade_aggregates(conn)
+
+    run(seed())
+    # Every module's database has the same URL: drop what an earlier one cached
+    query_cache.clear()
+    dimensions.clear()
+    yield engine
+    run(engine.dispose())
+
+
+@pytest.fixture(scope="module")
+def session_factory(engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture(scope="module")
+def examples(run, session_factory) -> dict:
+    async def fetch():
+        async with session_factory() as session:
+            return (await fetch_example_row.uncached(session))._asdict()
+
+    return run(fetch())
@@ -0,0 +1,53 @@
+"""Statements emitted by the load_* functions (see src/benchmarks/loading.py)."""
+
+import pytest
+
+from src.benchmarks.loading import CHECKS, fetch_examples
+from src.db.instrumentation import count_statements
+
+
+@pytest.fixture(scope="module")
+def profile_examples(run, session_factory):
+    async def fetch():
+        async with session_factory() as session:
+            return await fetch_examples(session)
+
+    examples = run(fetch())
+    assert examples is not None
+    return examples
+
+
+@pytest.mark.parametrize("check", CHECKS, ids=lambda check: check.profile.name)
+def test_load_emits_the_expected_statements(
+    run, engine, session_factory, profile_examples, check
+):
+    async def load_and_walk():
+        # A new session, so nothing comes from the identity map
+        async with session_factory() as session:
+            with count_statements(engine) as loading:
+                graph = await check.load(session, profile_examples)
+            with count_statements(engine) as walking:
+                # lazy="raise_on_sql" raises for a relationship not loaded
+                objects = check.walk(graph)
+        return loading.count, walking.count, objects
+
+    loaded, walked, objects = run(load_and_walk())
+    assert loaded == check.statements
+    assert walked == 0
+    assert objects > 1
+
+
+def test_count_statements_counts_only_inside_the_block(run, engine, session_factory):
+    check = CHECKS[0]
+
+    async def count():
+        async with session_factory() as session:
+            examples = await fetch_examples(session)
+            with count_statements(engine) as counter:
+                await check.load(session, examples)
+            await check.load(session, examples)
+        return counter
+
+    counter = run(count())
+    assert counter.count == check.statements
+    assert all(statement.startswith("SELECT") for statement in counter.statements)
@@ -0,0 +1,49 @@
+"""Repeated calls of the demo queries reuse their compiled statements (see
+src/benchmarks/statements.py)."""
+
+import pytest
+
+from src.benchmarks.statements import measure, record_statements
+from src.my_select import build_query_runs
+from src.queries import fetch_4_overall_avg_grade
+
+
+@pytest.fixture(scope="module")
+def query_runs(examples):
+    runs = build_query_runs(examples)
+    assert not [run.skip_reason for run in runs if run.skip_reason]
+    return runs
+
+
+@pytest.mark.parametrize("number", range(1, 13), ids=lambda number: f"query_{number}")
+def test_repeated_call_hits_the_compiled_cache(
+    run, engine, session_factory, query_runs, number
+):
+    query_run = next(
+        query_run for query_run in query_runs if query_run.number == number
+    )
+
+    async def call_repeatedly():
+        async with engine.connect() as conn:
+            async with session_factory(bind=conn) as session:
+                return await measure(conn, session, query_run, repeat=3)
+
+    stats = run(call_repeatedly())
+    assert stats.statements >= 1
+    assert stats.compiled == 0
+    # SQLite does not prepare statements on the server
+    assert stats.prepared is None
+
+
+def test_cached_call_emits_no_statement(run, engine, session_factory):
+    async def call_twice():
+        async with engine.connect() as conn:
+            async with session_factory(bind=conn) as session:
+                first = await fetch_4_overall_avg_grade(session)
+                with record_statements(conn) as recorder:
+                    second = await fetch_4_overall_avg_grade(session)
+        return first, second, recorder
+
+    first, second, recorder = run(call_twice())
+    assert second == first
+    assert recorder.statements == 0